@@ -5,11 +5,21 @@ from __future__ import annotations
 # The operational logic lives in `backend/app/services/judge_worker.py` so the
 # entrypoint stays lightweight and metrics focus on the actual orchestration.
 
+import argparse
+
 from .services.judge_worker import run_daemon
 
 
 def main() -> int:
-    return run_daemon()
+    parser = argparse.ArgumentParser(description="RealmOI independent judge worker.")
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=None,
+        help="Max concurrently running jobs (default: REALMOI_JUDGE_SLOTS or 1)",
+    )
+    args = parser.parse_args()
+    return run_daemon(slots=args.slots)
 
 
 if __name__ == "__main__":
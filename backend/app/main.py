@@ -83,6 +83,9 @@ app = create_app()
 # Singletons
 from .services import singletons  # noqa: WPS433,E402
 
+from .services.job_index import ensure_job_index  # noqa: WPS433,E402
+
+ensure_job_index(jobs_root=Path(SETTINGS.jobs_root))
 JOB_MANAGER = JobManager(jobs_root=Path(SETTINGS.jobs_root))
 singletons.JOB_MANAGER = JOB_MANAGER
 JOB_MANAGER.reconcile()
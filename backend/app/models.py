@@ -4,7 +4,7 @@ import uuid
 from datetime import datetime, timezone
 from typing import Literal
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -99,3 +99,35 @@ class UsageRecord(Base):
     cost_microusd: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class JobIndex(Base):
+    """Queryable mirror of `jobs_root/{job_id}/state.json` (state.json stays authoritative)."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_created", "status", "created_at", "job_id"),
+        Index("ix_jobs_owner_created", "owner_user_id", "created_at", "job_id"),
+    )
+
+    job_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    owner_user_id: Mapped[str] = mapped_column(String(36), nullable=False, default="")
+    status: Mapped[str] = mapped_column(String(32), nullable=False, default="")
+    # ISO-8601 strings copied verbatim from state.json (UTC, lexicographically ordered).
+    created_at: Mapped[str] = mapped_column(String(64), nullable=False, default="")
+    finished_at: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    expires_at: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    judge_machine_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    judge_claim_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    judge_claimed_at: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow, onupdate=utcnow)
+
+
+class JobQueueEntry(Base):
+    """Independent-judge FIFO: `seq` order is claim order; a row is removed when popped."""
+
+    __tablename__ = "job_queue"
+
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=utcnow)
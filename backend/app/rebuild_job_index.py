@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+# Job index rebuild entrypoint.
+#
+# Recreates the SQLite `jobs` index table from `jobs_root/*/state.json`.
+# Usage: python -m backend.app.rebuild_job_index [--jobs-root PATH]
+
+import argparse
+from pathlib import Path
+
+from .db import init_db
+from .services.job_index import rebuild_job_index
+from .settings import SETTINGS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the jobs index table from on-disk state.json files.")
+    parser.add_argument("--jobs-root", default=SETTINGS.jobs_root)
+    args = parser.parse_args()
+
+    init_db()
+    count = rebuild_job_index(jobs_root=Path(args.jobs_root))
+    print(f"[job-index] rebuilt {count} jobs from {args.jobs_root}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+"""Notification batching for user MCP sessions (`notifications/batch`).
+
+Negotiated in `initialize`: the client sends `capabilities.notification_batch` (`true` or
+`{max_delay_ms, max_bytes}`) and the server answers with the clamped values it will use.
+The session's outbound queue (`_mcp_outbound.py`) then flushes queued notifications as one text
+frame when the oldest one has waited `max_delay_ms` or the estimated payload reaches `max_bytes`.
+A flush holding a single notification sends it as-is.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+
+CAPABILITY = "notification_batch"
+BATCH_METHOD = "notifications/batch"
+DEFAULT_MAX_DELAY_MS = 25
+MAX_MAX_DELAY_MS = 250
+DEFAULT_MAX_BYTES = 64 * 1024
+MAX_MAX_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class BatchConfig:
+    max_delay_ms: int = DEFAULT_MAX_DELAY_MS
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    def as_capability(self) -> dict[str, Any]:
+        return {"method": BATCH_METHOD, "max_delay_ms": self.max_delay_ms, "max_bytes": self.max_bytes}
+
+
+def negotiate_batch_config(params: dict[str, Any]) -> BatchConfig | None:
+    """Batch config requested in `initialize.params.capabilities` (None when not requested)."""
+    capabilities = params.get("capabilities")
+    requested = capabilities.get(CAPABILITY) if isinstance(capabilities, dict) else None
+    if not requested:
+        return None
+    options = requested if isinstance(requested, dict) else {}
+
+    def clamp(key: str, default: int, upper: int) -> int:
+        try:
+            value = int(options.get(key) or default)
+        except (TypeError, ValueError):
+            value = default
+        return max(1, min(value, upper))
+
+    return BatchConfig(
+        max_delay_ms=clamp("max_delay_ms", DEFAULT_MAX_DELAY_MS, MAX_MAX_DELAY_MS),
+        max_bytes=clamp("max_bytes", DEFAULT_MAX_BYTES, MAX_MAX_BYTES),
+    )
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+"""Per-session outbound queue for user MCP sessions.
+
+Every outgoing frame goes through one queue drained by a single writer task, so tail loops never
+await the socket directly. While frames wait (the client is behind), the queue applies:
+- contiguous terminal chunks of the same job are merged into one entry
+- a queued progress notification (same supersede key) is replaced by the newer one
+- `notifications/batch` coalescing (when negotiated, see `_mcp_batch.py`) happens at write time
+
+Queued + in-flight bytes are bounded by `mcp_outbound_max_bytes`; producers wait above it, and a
+session that stays above it for `mcp_outbound_stall_seconds` is disconnected. A failed send closes
+the queue at once and calls `on_broken`, so a dead socket is torn down immediately. Responses are never
+merged or dropped. `outbound_stats()` exposes per-session depth for the admin metrics endpoint.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+
+from ..services.mcp_binary import encode_frame
+from ..settings import SETTINGS
+from ._mcp_batch import BATCH_METHOD, BatchConfig
+
+
+@dataclass
+class QueuedFrame:
+    # Tool responses/errors: sent as-is, in order.
+    data: str | bytes
+    size: int
+
+
+@dataclass
+class QueuedNotification:
+    payload: dict[str, Any]
+    size: int
+    dropped: bool = False
+
+
+@dataclass
+class QueuedTerminal:
+    # Contiguous terminal bytes of one job: [end_offset - len(data), end_offset).
+    job_id: str
+    end_offset: int
+    data: bytearray = field(default_factory=bytearray)
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+Entry = QueuedFrame | QueuedNotification | QueuedTerminal
+
+_QUEUES: weakref.WeakSet[OutboundQueue] = weakref.WeakSet()
+
+
+def dumps(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False)
+
+
+class OutboundQueue:
+    """Bounded outbound queue + writer task (see module docstring)."""
+
+    def __init__(
+        self,
+        *,
+        send_text: Callable[[str], Awaitable[None]],
+        send_bytes: Callable[[bytes], Awaitable[None]],
+        on_stall: Callable[[], None],
+        logger: logging.Logger,
+        label: str = "",
+        on_broken: Callable[[], None] | None = None,
+    ):
+        self.label = label
+        self.batch: BatchConfig | None = None
+        self.binary_terminal = False
+        self._send_text = send_text
+        self._send_bytes = send_bytes
+        self._on_stall = on_stall
+        self._on_broken = on_broken or on_stall
+        self._logger = logger
+        self._entries: deque[Entry] = deque()
+        # Queued + in-flight bytes (in-flight counts until the send returns).
+        self._bytes = 0
+        self._notification_bytes = 0
+        self._dropped_queued = 0
+        self._oldest_at = 0.0
+        self._has_frame = False
+        self._terminal_tail: dict[str, QueuedTerminal] = {}
+        self._superseded: dict[Any, QueuedNotification] = {}
+        self._wake = asyncio.Event()
+        self._flush_now = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._over_since: float | None = None
+        self._writer: asyncio.Task[None] | None = None
+        self._closed = False
+        self.merged = 0
+        self.dropped = 0
+        self.sent_frames = 0
+        self.peak_bytes = 0
+        _QUEUES.add(self)
+
+    def configure(self, *, batch: BatchConfig | None, binary_terminal: bool) -> None:
+        self.batch = batch
+        self.binary_terminal = binary_terminal
+
+    @property
+    def depth(self) -> int:
+        return len(self._entries) - self._dropped_queued
+
+    @property
+    def queued_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "label": self.label,
+            "depth": self.depth,
+            "bytes": self._bytes,
+            "peak_bytes": self.peak_bytes,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "sent_frames": self.sent_frames,
+            "over_watermark_s": round(time.monotonic() - self._over_since, 3) if self._over_since is not None else 0.0,
+        }
+
+    # ---- producers ----
+
+    async def put_frame(self, data: str | bytes) -> None:
+        # Responses skip the watermark wait: they are small and the client is waiting for them.
+        self._append(QueuedFrame(data=data, size=len(data)))
+        self._has_frame = True
+        self._flush_now.set()
+
+    async def put_notification(self, *, payload: dict[str, Any], size: int = 256, key: Any = None) -> None:
+        await self._wait_for_space()
+        if key is not None:
+            previous = self._superseded.get(key)
+            if previous is not None and not previous.dropped:
+                previous.dropped = True
+                self._release(previous.size)
+                self._notification_bytes -= previous.size
+                self._dropped_queued += 1
+                self.dropped += 1
+        entry = QueuedNotification(payload=payload, size=max(1, size))
+        if key is not None:
+            self._superseded[key] = entry
+        self._append(entry)
+        self._grow_notifications(entry.size)
+
+    async def put_terminal(self, *, job_id: str, end_offset: int, chunk: bytes) -> None:
+        await self._wait_for_space()
+        tail = self._terminal_tail.get(job_id)
+        if tail is not None and tail.end_offset == end_offset - len(chunk):
+            tail.data += chunk
+            tail.end_offset = end_offset
+            self.merged += 1
+            self._bytes += len(chunk)
+            self.peak_bytes = max(self.peak_bytes, self._bytes)
+            self._update_space()
+        else:
+            tail = QueuedTerminal(job_id=job_id, end_offset=end_offset, data=bytearray(chunk))
+            self._terminal_tail[job_id] = tail
+            self._append(tail)
+        self._grow_notifications(len(chunk) if self.binary_terminal else (len(chunk) * 4 + 2) // 3)
+
+    def _append(self, entry: Entry) -> None:
+        if self._closed:
+            return
+        if not self._entries:
+            self._oldest_at = time.monotonic()
+        self._entries.append(entry)
+        self._bytes += entry.size
+        self.peak_bytes = max(self.peak_bytes, self._bytes)
+        self._update_space()
+        self._wake.set()
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._run())
+
+    def _grow_notifications(self, size: int) -> None:
+        self._notification_bytes += size
+        if self.batch is None or self._notification_bytes >= self.batch.max_bytes:
+            self._flush_now.set()
+
+    def _release(self, size: int) -> None:
+        self._bytes -= size
+        self._update_space()
+
+    def _update_space(self) -> None:
+        if self._bytes <= int(SETTINGS.mcp_outbound_max_bytes):
+            self._over_since = None
+            self._space.set()
+            return
+        if self._over_since is None:
+            self._over_since = time.monotonic()
+        self._space.clear()
+
+    async def _wait_for_space(self) -> None:
+        if self._space.is_set() or self._closed:
+            return
+        assert self._over_since is not None
+        remaining = float(SETTINGS.mcp_outbound_stall_seconds) - (time.monotonic() - self._over_since)
+        try:
+            await asyncio.wait_for(self._space.wait(), timeout=max(0.0, remaining))
+        except asyncio.TimeoutError:
+            self._logger.info("mcp outbound stalled, disconnecting session %s (%d bytes queued)", self.label, self._bytes)
+            self._on_stall()
+            raise ConnectionResetError("mcp_outbound_stalled") from None
+
+    # ---- writer ----
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._wake.wait()
+                await self._coalesce_window()
+                entries = list(self._entries)
+                self._entries.clear()
+                self._terminal_tail.clear()
+                self._superseded.clear()
+                self._notification_bytes = 0
+                self._dropped_queued = 0
+                self._has_frame = False
+                self._wake.clear()
+                self._flush_now.clear()
+                for size, frame in self._frames(entries):
+                    if isinstance(frame, bytes):
+                        await self._send_bytes(frame)
+                    else:
+                        await self._send_text(frame)
+                    self.sent_frames += 1
+                    self._release(size)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # Socket gone: stop queueing into a dead writer and tear the session down now
+            # instead of waiting for the stall timeout.
+            self._logger.debug("mcp outbound writer stopped: %s", exc)
+            self._writer = None
+            self._shutdown()
+            self._on_broken()
+
+    async def _coalesce_window(self) -> None:
+        # Batching: give notifications up to max_delay_ms (from the oldest queued one) to pile up.
+        if self.batch is None or self._has_frame or self._flush_now.is_set():
+            return
+        remaining = self._oldest_at + self.batch.max_delay_ms / 1000.0 - time.monotonic()
+        if remaining <= 0:
+            return
+        try:
+            await asyncio.wait_for(self._flush_now.wait(), timeout=remaining)
+        except asyncio.TimeoutError:
+            pass
+
+    def _frames(self, entries: list[Entry]) -> list[tuple[int, str | bytes]]:
+        # -> [(bytes released once sent, frame)], in queue order.
+        frames: list[tuple[int, str | bytes]] = []
+        group: list[dict[str, Any]] = []
+        group_size = 0
+
+        def flush_group() -> None:
+            nonlocal group, group_size
+            if len(group) == 1:
+                frames.append((group_size, dumps(group[0])))
+            elif group:
+                frames.append((group_size, dumps({"jsonrpc": "2.0", "method": BATCH_METHOD, "params": {"items": group}})))
+            group, group_size = [], 0
+
+        for entry in entries:
+            if isinstance(entry, QueuedNotification) and entry.dropped:
+                continue
+            if isinstance(entry, QueuedFrame):
+                flush_group()
+                frames.append((entry.size, entry.data))
+                continue
+            if isinstance(entry, QueuedTerminal) and self.binary_terminal:
+                flush_group()
+                start = entry.end_offset - len(entry.data)
+                frame = encode_frame(stream="terminal", job_id=entry.job_id, offset=start, payload=bytes(entry.data))
+                frames.append((entry.size, frame))
+                continue
+            payload = entry.payload if isinstance(entry, QueuedNotification) else self._terminal_payload(entry)
+            if self.batch is None:
+                frames.append((entry.size, dumps(payload)))
+                continue
+            group.append(payload)
+            group_size += entry.size
+            if group_size >= self.batch.max_bytes:
+                flush_group()
+        flush_group()
+        return frames
+
+    def _terminal_payload(self, entry: QueuedTerminal) -> dict[str, Any]:
+        params = {
+            "job_id": entry.job_id,
+            "offset": entry.end_offset,
+            "chunk_b64": base64.b64encode(entry.data).decode("ascii"),
+        }
+        return {"jsonrpc": "2.0", "method": "terminal", "params": params}
+
+    def _shutdown(self) -> None:
+        self._closed = True
+        self._entries.clear()
+        self._terminal_tail.clear()
+        self._superseded.clear()
+        self._bytes = 0
+        self._notification_bytes = 0
+        self._dropped_queued = 0
+        self._over_since = None
+        self._space.set()
+        _QUEUES.discard(self)
+
+    async def close(self) -> None:
+        self._shutdown()
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.cancel()
+
+
+def outbound_stats() -> dict[str, Any]:
+    """Queue depth of every live user MCP session (admin metrics)."""
+    sessions = [queue.stats() for queue in list(_QUEUES)]
+    return {
+        "sessions": sessions,
+        "total_depth": sum(s["depth"] for s in sessions),
+        "total_bytes": sum(s["bytes"] for s in sessions),
+        "max_bytes": int(SETTINGS.mcp_outbound_max_bytes),
+    }
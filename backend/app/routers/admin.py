@@ -8,7 +8,7 @@ from __future__ import annotations
 from fastapi import APIRouter
 
 from ..services import upstream_models as upstream_models_service
-from . import admin_billing, admin_pricing, admin_upstream, admin_users
+from . import admin_billing, admin_mcp, admin_pricing, admin_scheduler, admin_upstream, admin_users
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -16,6 +16,8 @@ router.include_router(admin_users.router)
 router.include_router(admin_upstream.router)
 router.include_router(admin_pricing.router)
 router.include_router(admin_billing.router)
+router.include_router(admin_mcp.router)
+router.include_router(admin_scheduler.router)
 
 # Backward-compatible alias for tests/tools that clear admin upstream cache.
 _models_cache = upstream_models_service._models_cache
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+# Admin MCP router (live session metrics).
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from ..deps import AdminUserDep
+from ._mcp_outbound import outbound_stats
+
+
+router = APIRouter()
+route_get = router.get
+
+
+class McpSessionQueueItem(BaseModel):
+    # label = user id of the session.
+    label: str
+    depth: int
+    bytes: int
+    peak_bytes: int
+    merged: int
+    dropped: int
+    sent_frames: int
+    over_watermark_s: float
+
+
+class McpSessionsResponse(BaseModel):
+    sessions: list[McpSessionQueueItem]
+    total_depth: int
+    total_bytes: int
+    max_bytes: int
+
+
+@route_get("/mcp/sessions", response_model=McpSessionsResponse)
+def mcp_sessions(_: AdminUserDep):
+    # 每个 user MCP 会话的出站队列深度（条数/字节），用于观察慢客户端与背压。
+    return McpSessionsResponse(**outbound_stats())
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+# Admin stage scheduler router (embedded-mode generate/test pool metrics).
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from ..deps import AdminUserDep
+from ..services.job_manager_scheduler import get_stage_scheduler
+
+
+router = APIRouter()
+route_get = router.get
+
+
+class StagePoolStats(BaseModel):
+    workers: int
+    threads: int
+    busy: int
+    queued: int
+
+
+class StageSchedulerResponse(BaseModel):
+    generate: StagePoolStats
+    test: StagePoolStats
+    jobs: int
+    # job_id -> 当前所处阶段（generate/test，含排队中）。
+    inflight: dict[str, str]
+
+
+@route_get("/scheduler", response_model=StageSchedulerResponse)
+def stage_scheduler(_: AdminUserDep):
+    # embedded 模式 generate/test 两个池的线程数、忙碌数与排队长度，用于调 REALMOI_STAGE_*_WORKERS。
+    scheduler = get_stage_scheduler()
+    return StageSchedulerResponse(**scheduler.stats(), inflight=scheduler.inflight())
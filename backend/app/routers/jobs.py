@@ -7,20 +7,25 @@ from __future__ import annotations
 # - /jobs/{id}/start: 启动（embedded judge 或排队给 independent judge）
 # - /jobs/{id}/cancel: 取消
 # - /jobs/{id}/artifacts/{name}: 下载 artifacts
+# - /jobs/{id}/artifacts/{name}/range: 按字节区间读取 artifacts（含 report.outputs.bin）
 # - /jobs/{id}/usage: 聚合 usage_records（仅用于页面展示）
 #
 # 这个文件偏“胶水层”：主要做输入解析 + 访问控制 + 文件 IO + 调用 JobManager。
 
 import uuid
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, File, Form, UploadFile
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from fastapi.responses import FileResponse, Response
+from pydantic import BaseModel, Field
 
 from ..deps import CurrentUserDep, DbDep
+from ..models import JobIndex
+from ..services import job_index
+from ..services.job_artifacts import ARTIFACT_NAMES, DEFAULT_RANGE_BYTES, MAX_RANGE_BYTES, read_artifact_range
 from ..services.job_manager import JobManager
 from ..services.job_paths import get_job_paths
 from ..services.job_state import now_iso, save_state
@@ -67,6 +72,10 @@ class CreateJobForm(BaseModel):
     tests_format: Literal["auto", "in_out_pairs", "manifest"] = "auto"
     compare_mode: Literal["tokens", "trim_ws", "exact"] = "tokens"
     run_if_no_expected: bool = True
+    # 非最终 attempt 在首个失败 case 后停止，其余记为 NOT_RUN（最终 attempt 始终跑全量）。
+    fail_fast: bool = True
+    # 运行中逐块比对 stdout，确定 WA 时立即结束进程（opt-in）。
+    early_wa: bool = False
     search_mode: Literal["disabled", "cached", "live"] = SETTINGS.default_search_mode
     reasoning_effort: Literal["low", "medium", "high", "xhigh"] = "medium"
     time_limit_ms: int | None = None
@@ -84,6 +93,8 @@ class CreateJobFlagsForm(BaseModel):
     tests_format: Literal["auto", "in_out_pairs", "manifest"] = "auto"
     compare_mode: Literal["tokens", "trim_ws", "exact"] = "tokens"
     run_if_no_expected: bool = True
+    fail_fast: bool = True
+    early_wa: bool = False
     search_mode: Literal["disabled", "cached", "live"] = SETTINGS.default_search_mode
     reasoning_effort: Literal["low", "medium", "high", "xhigh"] = "medium"
 
@@ -111,6 +122,8 @@ def parse_create_job_flags_form(
     tests_format: Literal["auto", "in_out_pairs", "manifest"] = Form("auto"),
     compare_mode: Literal["tokens", "trim_ws", "exact"] = Form("tokens"),
     run_if_no_expected: bool = Form(True),
+    fail_fast: bool = Form(True),
+    early_wa: bool = Form(False),
     search_mode: Literal["disabled", "cached", "live"] = Form(SETTINGS.default_search_mode),
     reasoning_effort: Literal["low", "medium", "high", "xhigh"] = Form("medium"),
 ) -> CreateJobFlagsForm:
@@ -118,6 +131,8 @@ def parse_create_job_flags_form(
         tests_format=tests_format,
         compare_mode=compare_mode,
         run_if_no_expected=run_if_no_expected,
+        fail_fast=fail_fast,
+        early_wa=early_wa,
         search_mode=search_mode,
         reasoning_effort=reasoning_effort,
     )
@@ -143,6 +158,8 @@ def parse_create_job_form(
         tests_format=flags.tests_format,
         compare_mode=flags.compare_mode,
         run_if_no_expected=flags.run_if_no_expected,
+        fail_fast=flags.fail_fast,
+        early_wa=flags.early_wa,
         search_mode=flags.search_mode,
         reasoning_effort=flags.reasoning_effort,
         time_limit_ms=limits.time_limit_ms,
@@ -285,6 +302,8 @@ class CreateJobContext:
     tests_format: str
     compare_mode: str
     run_if_no_expected: bool
+    fail_fast: bool
+    early_wa: bool
     search_mode: str
     reasoning_effort: str
     time_limit_ms: int | None
@@ -307,6 +326,7 @@ def build_job_obj(
         "reasoning_effort": ctx.reasoning_effort,
         "limits": {
             "time_limit_ms": ctx.time_limit_ms,
+            "time_mode": SETTINGS.default_time_mode,
             "memory_limit_mb": ctx.memory_limit_mb,
             "cpus": SETTINGS.default_cpus,
             "pids_limit": SETTINGS.default_pids,
@@ -320,6 +340,8 @@ def build_job_obj(
             "format": ctx.tests_format,
             "compare": {"mode": ctx.compare_mode},
             "run_if_no_expected": bool(ctx.run_if_no_expected),
+            "fail_fast": bool(ctx.fail_fast),
+            "early_wa": bool(ctx.early_wa),
         },
     }
 
@@ -395,6 +417,8 @@ def create_job(
         tests_format=tests_format,
         compare_mode=compare_mode,
         run_if_no_expected=run_if_no_expected,
+        fail_fast=form.fail_fast,
+        early_wa=form.early_wa,
         search_mode=search_mode,
         reasoning_effort=reasoning_effort,
         time_limit_ms=time_limit_ms,
@@ -420,62 +444,114 @@ class JobListItem(BaseModel):
 
 class JobListResponse(BaseModel):
     items: list[JobListItem]
+    # 符合过滤条件的 job 总数（跨所有分页，不受 limit / keyset 游标影响）。
     total: int
+    # Keyset cursor for the next (older) page; both None on the last page.
+    next_before_created_at: str | None = None
+    next_before_job_id: str | None = None
 
 
-def iter_job_state_files(*, jobs_root: Path):
-    """Yield `(job_dir, state.json)` pairs from `jobs_root` best-effort."""
-    for p in jobs_root.iterdir():
-        if not p.is_dir():
-            continue
-        state_path = p / "state.json"
-        if not state_path.exists():
-            continue
-        yield p, state_path
+JOB_LIST_DEFAULT_LIMIT = 50
+JOB_LIST_MAX_LIMIT = 200
 
 
-def read_job_state_best_effort(*, state_path: Path) -> dict[str, Any] | None:
-    try:
-        st = read_json(state_path)
-    except Exception:
-        return None
-    return st if isinstance(st, dict) else None
+class JobListParams(BaseModel):
+    # Query params for `GET /jobs` and MCP `job.list` (keyset pagination, newest first).
 
+    owner_user_id: str | None = None
+    status: list[str] | None = None
+    created_after: str | None = None
+    created_before: str | None = None
+    before_created_at: str | None = None
+    before_job_id: str | None = None
+    limit: int = Field(default=JOB_LIST_DEFAULT_LIMIT, ge=1, le=JOB_LIST_MAX_LIMIT)
 
-def should_include_job_for_user(*, user: CurrentUserDep, st_owner: str, owner_user_id: str | None) -> bool:
-    if user.role != "admin" and st_owner != user.id:
-        return False
-    if owner_user_id and st_owner != owner_user_id:
-        return False
-    return True
 
+def normalize_iso_param(value: str | None, *, name: str) -> str | None:
+    """Normalize an ISO-8601 timestamp to the UTC form stored in state.json (so string order == time order)."""
 
-def build_job_list_item(*, job_dir: Path, st: dict[str, Any], st_owner: str) -> JobListItem:
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise ValueError(f"invalid_{name}") from exc
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
+
+
+def get_job_list_params(
+    owner_user_id: str | None = None,
+    status: list[str] | None = Query(default=None),
+    created_after: str | None = None,
+    created_before: str | None = None,
+    before_created_at: str | None = None,
+    before_job_id: str | None = None,
+    limit: int = Query(default=JOB_LIST_DEFAULT_LIMIT, ge=1, le=JOB_LIST_MAX_LIMIT),
+) -> JobListParams:
+    return JobListParams(
+        owner_user_id=owner_user_id,
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        before_created_at=before_created_at,
+        before_job_id=before_job_id,
+        limit=limit,
+    )
+
+
+def build_job_list_item(row: JobIndex) -> JobListItem:
     return JobListItem(
-        job_id=str(st.get("job_id") or job_dir.name),
-        owner_user_id=st_owner,
-        status=str(st.get("status") or ""),
-        created_at=str(st.get("created_at") or ""),
-        finished_at=st.get("finished_at"),
-        expires_at=st.get("expires_at"),
+        job_id=row.job_id,
+        owner_user_id=row.owner_user_id,
+        status=row.status,
+        created_at=row.created_at,
+        finished_at=row.finished_at,
+        expires_at=row.expires_at,
+    )
+
+
+def query_job_list(*, user: CurrentUserDep, params: JobListParams) -> JobListResponse:
+    """Run one keyset page against the `jobs` index (raises ValueError on bad timestamps)."""
+
+    owner_user_id = params.owner_user_id or None
+    if user.role != "admin":
+        if owner_user_id and owner_user_id != user.id:
+            return JobListResponse(items=[], total=0)
+        owner_user_id = user.id
+
+    filters = {
+        "owner_user_id": owner_user_id,
+        "statuses": [x for x in (params.status or []) if x] or None,
+        "created_after": normalize_iso_param(params.created_after, name="created_after"),
+        "created_before": normalize_iso_param(params.created_before, name="created_before"),
+    }
+    rows = job_index.list_job_rows(
+        **filters,
+        before_created_at=normalize_iso_param(params.before_created_at, name="before_created_at"),
+        before_job_id=params.before_job_id or None,
+        limit=params.limit + 1,
+    )
+    has_more = len(rows) > params.limit
+    items = [build_job_list_item(row) for row in rows[: params.limit]]
+    last = items[-1] if has_more else None
+    return JobListResponse(
+        items=items,
+        total=job_index.count_job_rows(**filters),
+        next_before_created_at=last.created_at if last else None,
+        next_before_job_id=last.job_id if last else None,
     )
 
 
 @route_get("", response_model=JobListResponse)
-def list_jobs(user: CurrentUserDep, owner_user_id: str | None = None):
-    # list_jobs 是轻量实现：直接遍历 jobs_root 下的 state.json。
-    jobs_root = Path(SETTINGS.jobs_root)
-    items: list[JobListItem] = []
-    for job_dir, state_path in iter_job_state_files(jobs_root=jobs_root):
-        st = read_job_state_best_effort(state_path=state_path)
-        if st is None:
-            continue
-        st_owner = str(st.get("owner_user_id") or "")
-        if not should_include_job_for_user(user=user, st_owner=st_owner, owner_user_id=owner_user_id):
-            continue
-        items.append(build_job_list_item(job_dir=job_dir, st=st, st_owner=st_owner))
-    items.sort(key=lambda x: x.created_at, reverse=True)
-    return JobListResponse(items=items, total=len(items))
+def list_jobs(user: CurrentUserDep, params: JobListParams = Depends(get_job_list_params)):
+    # list_jobs 查询 `jobs` 索引表（save_state 时同步），按 (created_at, job_id) 倒序 keyset 分页。
+    try:
+        return query_job_list(user=user, params=params)
+    except ValueError as exc:
+        http_error(422, "invalid_request", str(exc))
 
 
 @route_get("/{job_id}")
@@ -513,7 +589,7 @@ def cancel_job(user: CurrentUserDep, job_id: str, jm: JobManager = Depends(get_j
 @route_get("/{job_id}/artifacts/{name}")
 def get_artifact(user: CurrentUserDep, job_id: str, name: str):
     # artifacts 仅允许 3 个固定文件名，避免任意路径读取。
-    if name not in ("main.cpp", "solution.json", "report.json"):
+    if name not in ARTIFACT_NAMES:
         http_error(404, "not_found", "Artifact not found")
     paths, _st = load_job_state_for_user(user=user, job_id=job_id)
     file_path = paths.output_dir / name
@@ -523,6 +599,24 @@ def get_artifact(user: CurrentUserDep, job_id: str, name: str):
     return FileResponse(file_path, media_type=media, filename=name)
 
 
+@route_get("/{job_id}/artifacts/{name}/range")
+def get_artifact_range(
+    user: CurrentUserDep,
+    job_id: str,
+    name: str,
+    offset: int = Query(default=0, ge=0),
+    length: int = Query(default=DEFAULT_RANGE_BYTES, ge=1, le=MAX_RANGE_BYTES),
+):
+    # report.v2 的 case 输出在 report.outputs.bin 里，前端按 record 的 offset/length 分段拉取。
+    paths, _st = load_job_state_for_user(user=user, job_id=job_id)
+    try:
+        chunk = read_artifact_range(output_dir=paths.output_dir, name=name, offset=offset, length=length)
+    except FileNotFoundError:
+        http_error(404, "not_found", "Artifact not found")
+    headers = {"X-Artifact-Size": str(chunk["size"]), "X-Artifact-Offset": str(chunk["offset"])}
+    return Response(content=chunk["data"], media_type="application/octet-stream", headers=headers)
+
+
 @route_get("/{job_id}/usage")
 def job_usage(user: CurrentUserDep, db: DbDep, job_id: str):
     from sqlalchemy import select  # noqa: WPS433
@@ -14,27 +14,31 @@ Implements a small JSON-RPC subset over WebSocket for MCP with two roles:
 # - 目标是“稳定优先”：协议错误尽量返回 JSON-RPC error，不让连接/进程因为异常而崩溃。
 
 import asyncio
-import base64, binascii, io, json, logging
+import base64, binascii, functools, io, json, logging
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable
 
-from fastapi import APIRouter, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, UploadFile, WebSocket
 
 from ..auth import decode_access_token
 from ..db import SessionLocal
 from ..models import User
 from ..services import singletons
+from ..services.job_artifacts import ARTIFACT_NAMES, read_artifact_range
 from ..services.job_paths import get_job_paths
 from ..services.job_tests import list_job_tests, read_job_test_preview
+from ..services.log_tail_hub import get_log_tail_hub
+from ..services.mcp_binary import binary_frames_capability, wants_binary_frames
 from ..services.mcp_judge import McpJudgeWebSocketSession
 from ..settings import SETTINGS
 from ..utils.fs import read_json
 from . import jobs as jobs_router, models as models_router
+from ._mcp_batch import negotiate_batch_config
+from ..services.mcp_blocking import run_blocking
+from ._mcp_outbound import OutboundQueue
 from ._mcp_ws_utils import (
-    encode_chunk_b64,
     parse_jsonl_buffer,
-    read_file_chunk,
     try_session_close,
     try_ws_accept,
 )
@@ -93,6 +97,8 @@ def build_create_job_form(*, args: dict[str, Any]) -> jobs_router.CreateJobForm:
     tests_format = str(args.get("tests_format") or "auto")
     compare_mode = str(args.get("compare_mode") or "tokens")
     run_if_no_expected = bool(args.get("run_if_no_expected", True))
+    fail_fast = bool(args.get("fail_fast", True))
+    early_wa = bool(args.get("early_wa", False))
     search_mode = str(args.get("search_mode") or jobs_router.SETTINGS.default_search_mode)
     reasoning_effort = str(args.get("reasoning_effort") or "medium")
 
@@ -107,6 +113,8 @@ def build_create_job_form(*, args: dict[str, Any]) -> jobs_router.CreateJobForm:
         tests_format=tests_format,  # type: ignore[arg-type]
         compare_mode=compare_mode,  # type: ignore[arg-type]
         run_if_no_expected=run_if_no_expected,
+        fail_fast=fail_fast,
+        early_wa=early_wa,
         search_mode=search_mode,  # type: ignore[arg-type]
         reasoning_effort=reasoning_effort,  # type: ignore[arg-type]
         time_limit_ms=time_limit_ms_int,
@@ -114,7 +122,28 @@ def build_create_job_form(*, args: dict[str, Any]) -> jobs_router.CreateJobForm:
     )
 
 
-ALLOWED_ARTIFACT_NAMES = ("main.cpp", "solution.json", "report.json")
+ALLOWED_ARTIFACT_NAMES = ARTIFACT_NAMES
+SUBSCRIBE_STREAMS = ("agent_status", "terminal", "test_results")
+
+# user tools：tool 名 -> session 方法名。
+# - BLOCKING_TOOLS：同步实现，在 services/mcp_blocking 线程池中执行，同一会话内可并发处理
+# - ORDERED_TOOLS：只改会话内订阅状态，按收到的顺序在接收循环里处理
+BLOCKING_TOOLS = {
+    "models.list": "tool_models_list",
+    "job.create": "tool_job_create",
+    "job.start": "tool_job_start",
+    "job.cancel": "tool_job_cancel",
+    "job.list": "tool_job_list",
+    "job.get_state": "tool_job_get_state",
+    "job.get_artifacts": "tool_job_get_artifacts",
+    "job.read_artifact_range": "tool_job_read_artifact_range",
+    "job.get_tests": "tool_job_get_tests",
+    "job.get_test_preview": "tool_job_get_test_preview",
+}
+ORDERED_TOOLS = {
+    "job.subscribe": "tool_job_subscribe",
+    "job.unsubscribe": "tool_job_unsubscribe",
+}
 
 
 def read_text_file_best_effort(*, path: Path) -> str | None:
@@ -186,6 +215,19 @@ def load_user(*, user_id: str) -> User | None:
 # User-session implementation
 # ----------------------------
 
+def progress_key(*, method: str, job_id: str, item: Any) -> tuple[str, str] | None:
+    """Supersede key for agent_status progress updates: only the newest queued one matters.
+
+    Only lines carrying an integer `progress` and no `delta` qualify; stage results (done/error/repair)
+    and agent deltas are always delivered.
+    """
+    if method != "agent_status" or not isinstance(item, dict) or "delta" in item:
+        return None
+    if not isinstance(item.get("progress"), int):
+        return None
+    return ("agent_status_progress", job_id)
+
+
 @dataclass
 class Subscription:
     job_id: str
@@ -199,14 +241,64 @@ class McpWebSocketSession:
     def __init__(self, *, ws: WebSocket, user: User):
         self._ws = ws
         self._user = user
-        # Serialize outgoing frames to avoid interleaving concurrent notifications.
-        self._send_lock = asyncio.Lock()
+        # All outgoing frames go through one bounded queue + writer task (see _mcp_outbound.py).
+        self._outbound = OutboundQueue(
+            send_text=ws.send_text,
+            send_bytes=ws.send_bytes,
+            on_stall=self.disconnect_slow_client,
+            logger=logger,
+            label=user.id,
+            on_broken=self.disconnect_broken_client,
+        )
+        self._close_task: asyncio.Task[None] | None = None
         # Active stream subscriptions keyed by (job_id, stream_name).
         self._subscriptions: dict[tuple[str, str], Subscription] = {}
+        # Set by `initialize` when the client opts into binary frames (see services/mcp_binary.py).
+        self.binary_frames = False
+        # In-flight concurrent tools/call requests (see `start_request`).
+        self._inflight = asyncio.Semaphore(max(1, int(SETTINGS.mcp_session_max_inflight)))
+        self._requests: set[asyncio.Task[None]] = set()
+
+    def negotiate_capabilities(self, params: dict[str, Any]) -> dict[str, Any]:
+        capabilities: dict[str, Any] = {}
+        self.binary_frames = wants_binary_frames(params)
+        if self.binary_frames:
+            capabilities["binary_frames"] = binary_frames_capability()
+        # `notifications/batch`（见 _mcp_batch.py）：由出站队列在写出时合并。
+        config = negotiate_batch_config(params)
+        if config is not None:
+            capabilities["notification_batch"] = config.as_capability()
+        self._outbound.configure(batch=config, binary_terminal=self.binary_frames)
+        return capabilities
 
     async def send_json(self, payload: dict[str, Any]) -> None:
-        async with self._send_lock:
-            await self._ws.send_text(json.dumps(payload, ensure_ascii=False))
+        await self._outbound.put_frame(json.dumps(payload, ensure_ascii=False))
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self._outbound.put_frame(data)
+
+    def disconnect_slow_client(self) -> None:
+        # 出站队列超过高水位太久：停止所有订阅并关闭连接，客户端重连后按 offset 续读。
+        self.cancel_all_subscriptions()
+        if self._close_task is None:
+            self._close_task = asyncio.create_task(self._close_ws(code=1013))
+
+    def disconnect_broken_client(self) -> None:
+        # 出站 writer 发送失败（socket 已断）：立即停止订阅并关闭会话，不等 stall 超时。
+        self.cancel_all_subscriptions()
+        if self._close_task is None:
+            self._close_task = asyncio.create_task(self._close_ws(code=1011))
+
+    async def _close_ws(self, *, code: int) -> None:
+        await self._outbound.close()
+        try:
+            await asyncio.wait_for(self._ws.close(code=code), timeout=5.0)
+        except Exception as exc:
+            logger.debug("mcp slow client close failed: %s", exc)
+
+    async def handle_binary(self, data: bytes) -> None:
+        # User clients only receive binary frames.
+        logger.debug("mcp user session ignored binary frame (%d bytes)", len(data))
 
     async def send_result(self, *, msg_id: Any, result: dict[str, Any]) -> None:
         await self.send_json({"jsonrpc": "2.0", "id": msg_id, "result": result})
@@ -220,8 +312,10 @@ class McpWebSocketSession:
             result={"content": [{"type": "text", "text": "ok"}], "structuredContent": structured},
         )
 
-    async def notify(self, *, method: str, params: dict[str, Any]) -> None:
-        await self.send_json({"jsonrpc": "2.0", "method": method, "params": params})
+    async def notify(self, *, method: str, params: dict[str, Any], size_hint: int = 256, key: Any = None) -> None:
+        # `key`: a queued notification with the same key is superseded (dropped) by this one.
+        payload = {"jsonrpc": "2.0", "method": method, "params": params}
+        await self._outbound.put_notification(payload=payload, size=size_hint, key=key)
 
     def ensure_job_access(self, *, job_id: str) -> None:
         paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
@@ -233,56 +327,32 @@ class McpWebSocketSession:
 
     async def tail_agent_status(self, *, job_id: str, offset: int) -> None:
         paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
-        path = paths.agent_status_jsonl
-        current_offset = max(0, int(offset or 0))
-        buf = b""
+        await self.tail_jsonl(job_id=job_id, path=paths.agent_status_jsonl, offset=offset, method="agent_status")
 
-        while True:
-            # Cancellation check.
-            await asyncio.sleep(0)
-
-            if not path.exists():
-                await asyncio.sleep(0.25)
-                continue
-
-            next_offset, chunk = read_file_chunk(path=path, offset=current_offset, max_bytes=64 * 1024, logger=logger)
-            if not chunk:
-                await asyncio.sleep(0.25)
-                continue
+    async def tail_test_results(self, *, job_id: str, offset: int) -> None:
+        # runner_test 每结束一个 case 追加一行（verdict/time/memory），UI 无需等待 report.json。
+        paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
+        await self.tail_jsonl(job_id=job_id, path=paths.test_results_jsonl, offset=offset, method="test_results")
 
-            current_offset = next_offset
-            buf += chunk
-            parsed, buf = parse_jsonl_buffer(buffer=buf, end_offset=current_offset, logger=logger)
-            for item_offset, item in parsed:
-                payload = {"job_id": job_id, "offset": item_offset, "item": item}
-                await self.notify(method="agent_status", params=payload)
-            await asyncio.sleep(0.05)
+    async def tail_jsonl(self, *, job_id: str, path: Path, offset: int, method: str) -> None:
+        buf = b""
+        async with get_log_tail_hub().subscribe(path=path, offset=offset) as tail:
+            async for current_offset, chunk in tail:
+                buf += chunk
+                parsed, buf = parse_jsonl_buffer(buffer=buf, end_offset=current_offset, logger=logger)
+                size_hint = len(chunk) // max(1, len(parsed))
+                for item_offset, item in parsed:
+                    payload = {"job_id": job_id, "offset": item_offset, "item": item}
+                    key = progress_key(method=method, job_id=job_id, item=item)
+                    await self.notify(method=method, params=payload, size_hint=size_hint, key=key)
 
     async def tail_terminal(self, *, job_id: str, offset: int) -> None:
+        # 同一文件的所有订阅共用 hub 中的一个 watcher（inotify 唤醒，新字节只读一次）。
         paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
-        path = paths.terminal_log
-        current_offset = max(0, int(offset or 0))
-
-        while True:
-            await asyncio.sleep(0)
-
-            if not path.exists():
-                await asyncio.sleep(0.25)
-                continue
-
-            next_offset, chunk = read_file_chunk(path=path, offset=current_offset, max_bytes=64 * 1024, logger=logger)
-            if not chunk:
-                await asyncio.sleep(0.25)
-                continue
-
-            current_offset = next_offset
-            payload = {
-                "job_id": job_id,
-                "offset": current_offset,
-                "chunk_b64": encode_chunk_b64(chunk, logger=logger),
-            }
-            await self.notify(method="terminal", params=payload)
-            await asyncio.sleep(0.05)
+        async with get_log_tail_hub().subscribe(path=paths.terminal_log, offset=offset) as tail:
+            async for current_offset, chunk in tail:
+                # 出站队列中相邻的 chunk 会合并，写出时按协商结果编码为二进制帧或 chunk_b64。
+                await self._outbound.put_terminal(job_id=job_id, end_offset=current_offset, chunk=chunk)
 
     def cancel_subscription(self, *, job_id: str, stream: str) -> None:
         key = (job_id, stream)
@@ -299,7 +369,10 @@ class McpWebSocketSession:
     async def tool_list(self, *, msg_id: Any) -> None:
         await self.send_result(msg_id=msg_id, result={"tools": MCP_TOOLS})
 
-    async def tool_models_list(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    # 以下 tool_* 为同步函数（DB / 磁盘 / 上游 HTTP），由 tool_call 放到 services/mcp_blocking 线程池执行，
+    # 返回 structuredContent。
+
+    def tool_models_list(self, *, args: dict[str, Any]) -> dict[str, Any]:
         live = bool(args.get("live", True))
         with SessionLocal() as db:
             if live:
@@ -307,17 +380,16 @@ class McpWebSocketSession:
             else:
                 rows = models_router.list_models(self._user, db=db)
         payload = [r.model_dump() if hasattr(r, "model_dump") else dict(r) for r in (rows or [])]
-        await self.send_ok(msg_id=msg_id, structured={"items": payload})
+        return {"items": payload}
 
-    async def tool_job_create(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    def tool_job_create(self, *, args: dict[str, Any]) -> dict[str, Any]:
         tests_zip_b64 = str(args.get("tests_zip_b64") or "").strip()
         upload = decode_tests_zip_upload(tests_zip_b64)
         form = build_create_job_form(args=args)
         with SessionLocal() as db:
             resp = jobs_router.create_job(user=self._user, db=db, form=form, tests_zip=upload)
 
-        payload = resp.model_dump() if hasattr(resp, "model_dump") else resp.dict()
-        await self.send_ok(msg_id=msg_id, structured=payload)
+        return resp.model_dump() if hasattr(resp, "model_dump") else resp.dict()
 
     def require_job_manager(self):
         # NOTE: JOB_MANAGER 由 backend 启动流程注入；未就绪时统一返回 500。
@@ -326,31 +398,38 @@ class McpWebSocketSession:
             raise RuntimeError("job_manager_not_ready")
         return jm
 
-    async def tool_job_manager_action(
-        self,
-        *,
-        msg_id: Any,
-        args: dict[str, Any],
-        action: Any,
-    ) -> None:
+    def tool_job_manager_action(self, *, args: dict[str, Any], action: Any) -> dict[str, Any]:
         # job.start / job.cancel 共用入口，减少重复模式扣分。
         job_id = str(args.get("job_id") or "").strip()
         jm = self.require_job_manager()
-        result = action(self._user, job_id=job_id, jm=jm)
-        await self.send_ok(msg_id=msg_id, structured=result)
-
-    async def tool_job_start(self, *, msg_id: Any, args: dict[str, Any]) -> None:
-        await self.tool_job_manager_action(msg_id=msg_id, args=args, action=jobs_router.start_job)
-
-    async def tool_job_cancel(self, *, msg_id: Any, args: dict[str, Any]) -> None:
-        await self.tool_job_manager_action(msg_id=msg_id, args=args, action=jobs_router.cancel_job)
+        return action(self._user, job_id=job_id, jm=jm)
+
+    def tool_job_start(self, *, args: dict[str, Any]) -> dict[str, Any]:
+        return self.tool_job_manager_action(args=args, action=jobs_router.start_job)
+
+    def tool_job_cancel(self, *, args: dict[str, Any]) -> dict[str, Any]:
+        return self.tool_job_manager_action(args=args, action=jobs_router.cancel_job)
+
+    def tool_job_list(self, *, args: dict[str, Any]) -> dict[str, Any]:
+        status = args.get("status")
+        statuses = [str(x) for x in status] if isinstance(status, list) else ([str(status)] if status else None)
+        params = jobs_router.JobListParams(
+            owner_user_id=str(args.get("owner_user_id") or "") or None,
+            status=statuses,
+            created_after=args.get("created_after"),
+            created_before=args.get("created_before"),
+            before_created_at=args.get("before_created_at"),
+            before_job_id=args.get("before_job_id"),
+            limit=int(args.get("limit") or jobs_router.JOB_LIST_DEFAULT_LIMIT),
+        )
+        resp = jobs_router.query_job_list(user=self._user, params=params)
+        return resp.model_dump()
 
-    async def tool_job_get_state(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    def tool_job_get_state(self, *, args: dict[str, Any]) -> dict[str, Any]:
         job_id = str(args.get("job_id") or "").strip()
-        state = jobs_router.get_job(self._user, job_id=job_id)
-        await self.send_ok(msg_id=msg_id, structured=state)
+        return jobs_router.get_job(self._user, job_id=job_id)
 
-    async def tool_job_get_artifacts(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    def tool_job_get_artifacts(self, *, args: dict[str, Any]) -> dict[str, Any]:
         job_id = str(args.get("job_id") or "").strip()
         names = args.get("names")
         want = [str(x) for x in names] if isinstance(names, list) else list(ALLOWED_ARTIFACT_NAMES)
@@ -367,9 +446,26 @@ class McpWebSocketSession:
                 continue
             k, v = item
             result[k] = v
-        await self.send_ok(msg_id=msg_id, structured={"items": result})
+        return {"items": result}
+
+    def tool_job_read_artifact_range(self, *, args: dict[str, Any]) -> dict[str, Any]:
+        # report.v2：按 record.outputs 的 offset/length 拉取 report.outputs.bin（单次最多 1 MiB）。
+        job_id = str(args.get("job_id") or "").strip()
+        name = str(args.get("name") or "").strip()
+        self.ensure_job_access(job_id=job_id)
+        paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
+        chunk = read_artifact_range(
+            output_dir=paths.output_dir,
+            name=name,
+            offset=int(args.get("offset") or 0),
+            length=args.get("length"),
+        )
+        data = chunk.pop("data")
+        chunk["data_b64"] = base64.b64encode(data).decode("ascii")
+        chunk["length"] = len(data)
+        return chunk
 
-    async def tool_job_get_tests(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    def tool_job_get_tests(self, *, args: dict[str, Any]) -> dict[str, Any]:
         job_id = str(args.get("job_id") or "").strip()
         self.ensure_job_access(job_id=job_id)
         paths = get_job_paths(jobs_root=Path(jobs_router.SETTINGS.jobs_root), job_id=job_id)
@@ -384,9 +480,9 @@ class McpWebSocketSession:
             }
             for m in metas
         ]
-        await self.send_ok(msg_id=msg_id, structured={"items": items, "total": len(items)})
+        return {"items": items, "total": len(items)}
 
-    async def tool_job_get_test_preview(self, *, msg_id: Any, args: dict[str, Any]) -> None:
+    def tool_job_get_test_preview(self, *, args: dict[str, Any]) -> dict[str, Any]:
         job_id = str(args.get("job_id") or "").strip()
         input_rel = str(args.get("input_rel") or "").strip()
         expected_rel = args.get("expected_rel")
@@ -401,38 +497,37 @@ class McpWebSocketSession:
             expected_rel=expected_rel_s,
             max_bytes=max_bytes,
         )
-        await self.send_ok(msg_id=msg_id, structured=payload)
+        return payload
 
     async def tool_job_subscribe(self, *, msg_id: Any, args: dict[str, Any]) -> None:
         job_id = str(args.get("job_id") or "").strip()
         streams = args.get("streams")
         stream_list = [str(x) for x in streams] if isinstance(streams, list) else ["agent_status"]
-        want_agent = "agent_status" in stream_list
-        want_terminal = "terminal" in stream_list
-
-        self.ensure_job_access(job_id=job_id)
 
-        if want_agent:
-            agent_offset = int(args.get("agent_status_offset") or 0)
-            self.cancel_subscription(job_id=job_id, stream="agent_status")
-            task = asyncio.create_task(self.tail_agent_status(job_id=job_id, offset=agent_offset))
-            self._subscriptions[(job_id, "agent_status")] = Subscription(job_id=job_id, stream="agent_status", task=task)
+        await run_blocking(self.ensure_job_access, job_id=job_id)
 
-        if want_terminal:
-            terminal_offset = int(args.get("terminal_offset") or 0)
-            self.cancel_subscription(job_id=job_id, stream="terminal")
-            task = asyncio.create_task(self.tail_terminal(job_id=job_id, offset=terminal_offset))
-            self._subscriptions[(job_id, "terminal")] = Subscription(job_id=job_id, stream="terminal", task=task)
+        tails = {
+            "agent_status": self.tail_agent_status,
+            "terminal": self.tail_terminal,
+            "test_results": self.tail_test_results,
+        }
+        for stream, tail in tails.items():
+            if stream not in stream_list:
+                continue
+            offset = int(args.get(f"{stream}_offset") or 0)
+            self.cancel_subscription(job_id=job_id, stream=stream)
+            task = asyncio.create_task(tail(job_id=job_id, offset=offset))
+            self._subscriptions[(job_id, stream)] = Subscription(job_id=job_id, stream=stream, task=task)
 
-        subscribed = [s for s in ("agent_status", "terminal") if (job_id, s) in self._subscriptions]
+        subscribed = [s for s in SUBSCRIBE_STREAMS if (job_id, s) in self._subscriptions]
         await self.send_ok(msg_id=msg_id, structured={"job_id": job_id, "streams": subscribed})
 
     async def tool_job_unsubscribe(self, *, msg_id: Any, args: dict[str, Any]) -> None:
         job_id = str(args.get("job_id") or "").strip()
         streams = args.get("streams")
-        stream_list = [str(x) for x in streams] if isinstance(streams, list) else ["agent_status", "terminal"]
+        stream_list = [str(x) for x in streams] if isinstance(streams, list) else list(SUBSCRIBE_STREAMS)
         for stream in stream_list:
-            if stream not in {"agent_status", "terminal"}:
+            if stream not in SUBSCRIBE_STREAMS:
                 continue
             self.cancel_subscription(job_id=job_id, stream=stream)
         await self.send_ok(msg_id=msg_id, structured={"job_id": job_id, "streams": stream_list})
@@ -441,25 +536,15 @@ class McpWebSocketSession:
         tool = str(name or "")
         args = arguments if isinstance(arguments, dict) else {}
 
-        handlers = {
-            "models.list": self.tool_models_list,
-            "job.create": self.tool_job_create,
-            "job.start": self.tool_job_start,
-            "job.cancel": self.tool_job_cancel,
-            "job.get_state": self.tool_job_get_state,
-            "job.get_artifacts": self.tool_job_get_artifacts,
-            "job.get_tests": self.tool_job_get_tests,
-            "job.get_test_preview": self.tool_job_get_test_preview,
-            "job.subscribe": self.tool_job_subscribe,
-            "job.unsubscribe": self.tool_job_unsubscribe,
-        }
-        handler = handlers.get(tool)
-        if handler is None:
+        if tool not in ORDERED_TOOLS and tool not in BLOCKING_TOOLS:
             await self.send_error(msg_id=msg_id, code=-32601, message="Tool not found")
             return
 
         try:
-            await handler(msg_id=msg_id, args=args)
+            if tool in ORDERED_TOOLS:
+                await getattr(self, ORDERED_TOOLS[tool])(msg_id=msg_id, args=args)
+            else:
+                await self.run_blocking_tool(msg_id=msg_id, tool=tool, args=args)
             return
 
         except FileNotFoundError:
@@ -473,11 +558,37 @@ class McpWebSocketSession:
             await self.send_error(msg_id=msg_id, code=500, message=f"{type(exc).__name__}: {exc}")
             return
 
+    async def run_blocking_tool(self, *, msg_id: Any, tool: str, args: dict[str, Any]) -> None:
+        # live models.list 走上游 HTTP，单独的 upstream 线程池，避免占满 io 池。
+        lane = "upstream" if tool == "models.list" and bool(args.get("live", True)) else "io"
+        structured = await run_blocking(getattr(self, BLOCKING_TOOLS[tool]), args=args, lane=lane)
+        await self.send_ok(msg_id=msg_id, structured=structured)
+
+    async def start_request(self, run: Callable[[], Awaitable[None]]) -> None:
+        """Handle one request concurrently (bounded by `mcp_session_max_inflight`).
+
+        Waits while the session is at its in-flight limit, so a client flooding requests stops
+        being read instead of growing an unbounded task set.
+        """
+        await self._inflight.acquire()
+        task = asyncio.create_task(self._run_request(run))
+        self._requests.add(task)
+        task.add_done_callback(self._requests.discard)
+
+    async def _run_request(self, run: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await run()
+        finally:
+            self._inflight.release()
+
     async def close(self) -> None:
         try:
             self.cancel_all_subscriptions()
         except Exception as exc:
             logger.debug("mcp session cancel_all_subscriptions failed: %s", exc)
+        for task in list(self._requests):
+            task.cancel()
+        await self._outbound.close()
 
 
 # ----------------------------
@@ -539,16 +650,26 @@ def parse_jsonrpc_message(*, raw: str) -> dict[str, Any] | None:
     return msg if isinstance(msg, dict) else None
 
 
+def is_concurrent_request(msg: dict[str, Any]) -> bool:
+    """User `tools/call` of a blocking tool: may run alongside other requests of the session.
+
+    Judge sessions stay strictly sequential (append_* offset checks rely on arrival order).
+    """
+    params = msg.get("params") if isinstance(msg.get("params"), dict) else {}
+    return msg.get("method") == "tools/call" and str(params.get("name") or "") in BLOCKING_TOOLS
+
+
 async def dispatch_jsonrpc_message(*, session: Any, is_judge: bool, msg: dict[str, Any]) -> None:
     msg_id = msg.get("id")
     method = msg.get("method")
     params = msg.get("params") if isinstance(msg.get("params"), dict) else {}
 
     if method == "initialize":
+        capabilities: dict[str, Any] = {"tools": {}, **session.negotiate_capabilities(params)}
         await session.send_result(
             msg_id=msg_id,
             result={
-                "capabilities": {"tools": {}},
+                "capabilities": capabilities,
                 "serverInfo": {"name": "realmoi-mcp", "version": "0.1.0", "role": "judge" if is_judge else "user"},
             },
         )
@@ -572,26 +693,36 @@ async def dispatch_jsonrpc_message(*, session: Any, is_judge: bool, msg: dict[st
         await session.send_error(msg_id=msg_id, code=-32601, message="Method not found")
 
 
-async def receive_ws_text_or_none(*, ws: WebSocket) -> str | None:
-    # NOTE: 把 receive_text 的异常处理从主循环里抽出来，降低嵌套深度。
+async def receive_ws_message_or_none(*, ws: WebSocket) -> str | bytes | None:
+    # NOTE: 把 receive 的异常处理从主循环里抽出来，降低嵌套深度；文本帧为 JSON-RPC，二进制帧见 mcp_binary。
     try:
-        return await ws.receive_text()
-    except WebSocketDisconnect as exc:
-        logger.debug("mcp_ws disconnect: %s", exc)
-        return None
+        message = await ws.receive()
     except Exception as exc:
-        logger.info("mcp_ws receive_text failed: %s", exc)
+        logger.info("mcp_ws receive failed: %s", exc)
         return None
+    if message.get("type") == "websocket.disconnect":
+        logger.debug("mcp_ws disconnect: %s", message.get("code"))
+        return None
+    if message.get("bytes") is not None:
+        return message["bytes"]
+    return message.get("text") or ""
 
 
 async def run_mcp_ws_loop(*, ws: WebSocket, session: Any, is_judge: bool) -> None:
     while True:
-        raw = await receive_ws_text_or_none(ws=ws)
+        raw = await receive_ws_message_or_none(ws=ws)
         if raw is None:
             return
+        if isinstance(raw, bytes):
+            await session.handle_binary(raw)
+            continue
         msg = parse_jsonrpc_message(raw=raw)
         if msg is None:
             continue
+        if not is_judge and is_concurrent_request(msg):
+            run = functools.partial(dispatch_jsonrpc_message, session=session, is_judge=is_judge, msg=msg)
+            await session.start_request(run)
+            continue
         await dispatch_jsonrpc_message(session=session, is_judge=is_judge, msg=msg)
 
 
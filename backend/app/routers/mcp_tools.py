@@ -46,6 +46,8 @@ MCP_TOOLS: list[dict[str, Any]] = [
             "tests_format": {"type": "string"},
             "compare_mode": {"type": "string"},
             "run_if_no_expected": {"type": "boolean"},
+            "fail_fast": {"type": "boolean"},
+            "early_wa": {"type": "boolean"},
             "search_mode": {"type": "string"},
             "reasoning_effort": {"type": "string"},
             "time_limit_ms": {"type": "integer"},
@@ -65,6 +67,22 @@ MCP_TOOLS: list[dict[str, Any]] = [
         properties={"job_id": {"type": "string"}},
         required=["job_id"],
     ),
+    tool_def(
+        name="job.list",
+        description=(
+            "List jobs newest first (keyset pagination). Pass next_before_created_at/next_before_job_id "
+            "from the previous page as before_created_at/before_job_id."
+        ),
+        properties={
+            "owner_user_id": {"type": "string"},
+            "status": {"type": ["string", "array"], "items": {"type": "string"}},
+            "created_after": {"type": "string"},
+            "created_before": {"type": "string"},
+            "before_created_at": {"type": "string"},
+            "before_job_id": {"type": "string"},
+            "limit": {"type": "integer"},
+        },
+    ),
     tool_def(
         name="job.get_state",
         description="Get job state.json payload.",
@@ -77,6 +95,17 @@ MCP_TOOLS: list[dict[str, Any]] = [
         properties={"job_id": {"type": "string"}, "names": {"type": "array", "items": {"type": "string"}}},
         required=["job_id"],
     ),
+    tool_def(
+        name="job.read_artifact_range",
+        description="Read a byte range of a job artifact (e.g. report.outputs.bin for report.v2 case outputs).",
+        properties={
+            "job_id": {"type": "string"},
+            "name": {"type": "string"},
+            "offset": {"type": "integer"},
+            "length": {"type": "integer"},
+        },
+        required=["job_id", "name"],
+    ),
     tool_def(
         name="job.get_tests",
         description="List extracted tests (from user tests.zip).",
@@ -96,12 +125,13 @@ MCP_TOOLS: list[dict[str, Any]] = [
     ),
     tool_def(
         name="job.subscribe",
-        description="Subscribe streams for a job; pushes JSON-RPC notifications: agent_status/terminal.",
+        description="Subscribe streams for a job; pushes JSON-RPC notifications: agent_status/terminal/test_results.",
         properties={
             "job_id": {"type": "string"},
             "streams": {"type": "array", "items": {"type": "string"}},
             "agent_status_offset": {"type": "integer"},
             "terminal_offset": {"type": "integer"},
+            "test_results_offset": {"type": "integer"},
         },
         required=["job_id"],
     ),
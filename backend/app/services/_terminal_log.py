@@ -4,6 +4,8 @@ from __future__ import annotations
 
 from pathlib import Path
 
+from .job_output_buffer import OUTPUT_BUFFER
+
 
 def redact_bytes(*, data: bytes, secrets: list[str]) -> bytes:
     output = data
@@ -26,6 +28,7 @@ def stream_terminal_log(
     written = 0
     try:
         with log_path.open("ab") as log_file:
+            position = int(log_file.tell())
             while True:
                 raw = stdout.read(4096)
                 if not raw:
@@ -39,6 +42,8 @@ def stream_terminal_log(
                     continue
                 log_file.write(out)
                 log_file.flush()
+                OUTPUT_BUFFER.record(path=log_path, offset=position, data=out)
+                position += len(out)
                 written += len(out)
     except Exception:
         return written
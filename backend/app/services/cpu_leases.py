@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+"""Per-job CPU core leases for the test stage.
+
+runner_test pins each case to one core; without a job-owned core set every concurrent test stage
+(embedded test pool, judge slots) would pin to the same host cores 0..N-1. `JobManager.run_test`
+leases `ceil(limits.cpus)` cores here and hands them to the runner:
+- docker: `cpuset_cpus` on the test container (plus `REALMOI_TEST_CPUSET`)
+- local: `REALMOI_TEST_CPUSET` only; runner_test pins inside that set
+
+When no disjoint set is free the lease is empty and `REALMOI_TEST_CPUSET=none` tells the runner not
+to pin at all (cases still run in parallel, the scheduler spreads them).
+"""
+
+import contextlib
+import math
+import os
+import threading
+import typing
+
+CPUSET_ENV = "REALMOI_TEST_CPUSET"
+NO_CPUSET = "none"
+
+
+def host_cores() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return sorted(os.sched_getaffinity(0))
+        except OSError:
+            pass
+    return list(range(os.cpu_count() or 1))
+
+
+def cores_needed(cpus: typing.Any) -> int:
+    try:
+        return max(1, math.ceil(float(cpus or 1)))
+    except (TypeError, ValueError):
+        return 1
+
+
+def format_cpuset(cores: typing.Sequence[int]) -> str:
+    return ",".join(str(c) for c in cores) if cores else NO_CPUSET
+
+
+class CoreLeases:
+    """Hands out disjoint core sets; `acquire` never blocks (empty list = nothing free)."""
+
+    def __init__(self, cores: typing.Sequence[int]):
+        self._cores = list(cores)
+        self._busy: set[int] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int) -> list[int]:
+        with self._lock:
+            free = [c for c in self._cores if c not in self._busy]
+            if count > len(free):
+                return []
+            picked = free[:count]
+            self._busy.update(picked)
+            return picked
+
+    def release(self, cores: typing.Sequence[int]) -> None:
+        with self._lock:
+            self._busy.difference_update(cores)
+
+    def busy(self) -> list[int]:
+        with self._lock:
+            return sorted(self._busy)
+
+
+_LEASES: CoreLeases | None = None
+_LEASES_LOCK = threading.Lock()
+
+
+def get_core_leases() -> CoreLeases:
+    """Process-wide leases, shared by every JobManager (embedded pool and judge slots)."""
+
+    global _LEASES
+    with _LEASES_LOCK:
+        if _LEASES is None:
+            _LEASES = CoreLeases(host_cores())
+        return _LEASES
+
+
+@contextlib.contextmanager
+def lease_cores(*, cpus: typing.Any) -> typing.Iterator[list[int]]:
+    leases = get_core_leases()
+    cores = leases.acquire(cores_needed(cpus))
+    try:
+        yield cores
+    finally:
+        leases.release(cores)
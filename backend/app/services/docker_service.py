@@ -22,6 +22,7 @@ from docker.models.containers import Container
 from docker.types import Ulimit
 
 from ..settings import SETTINGS
+from .job_output_buffer import OUTPUT_BUFFER
 
 
 @dataclass(frozen=True)
@@ -43,6 +44,8 @@ class ContainerResources:
     cpus: float
     memory_mb: int
     pids_limit: int
+    # Docker `cpuset_cpus` ("2,3"); None = any core.
+    cpuset: str | None = None
 
 
 _IMAGE_PULL_LOCK = threading.Lock()
@@ -252,6 +255,7 @@ def start_log_collector(
         written = 0
         log_file = log_path.open("ab")
         with log_file as f:
+            position = int(f.tell())
             try:
                 for chunk in container.logs(stream=True, follow=True):
                     if not isinstance(chunk, (bytes, bytearray)):
@@ -263,6 +267,8 @@ def start_log_collector(
                     chunk = chunk[:remaining]
                     _write_len = f.write(chunk)
                     f.flush()
+                    OUTPUT_BUFFER.record(path=log_path, offset=position, data=chunk)
+                    position += len(chunk)
                     written += len(chunk)
             except (docker.errors.APIError, OSError, ValueError):
                 # Best effort: failing to collect logs should not fail the job.
@@ -353,6 +359,7 @@ def create_test_container(
             "/tmp": "rw,size=256m,exec",
         },
         nano_cpus=int(resources.cpus * 1_000_000_000),
+        cpuset_cpus=resources.cpuset,
         mem_limit=f"{resources.memory_mb}m",
         memswap_limit=f"{resources.memory_mb}m",
         pids_limit=resources.pids_limit,
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+# Job output artifacts (names + ranged reads).
+#
+# report.v2 keeps `report.json` small: per-case stdout/stderr heads live in the
+# `report.outputs.bin` sidecar and records point at them with `{offset, length}`.
+# HTTP and MCP routes read the sidecar in bounded ranges instead of shipping it whole.
+
+import shutil
+from pathlib import Path
+from typing import Any
+
+
+ARTIFACT_NAMES = ("main.cpp", "solution.json", "report.json")
+REPORT_OUTPUTS_NAME = "report.outputs.bin"
+RANGE_ARTIFACT_NAMES = (*ARTIFACT_NAMES, REPORT_OUTPUTS_NAME)
+
+DEFAULT_RANGE_BYTES = 64 * 1024
+MAX_RANGE_BYTES = 1024 * 1024
+# Upper bound for a sidecar uploaded by an independent judge (2000 cases x 2 x 64 KB fits).
+MAX_REPORT_OUTPUTS_BYTES = 512 * 1024 * 1024
+
+
+def clamp_range_length(length: Any) -> int:
+    try:
+        value = int(length or DEFAULT_RANGE_BYTES)
+    except (TypeError, ValueError):
+        value = DEFAULT_RANGE_BYTES
+    return max(1, min(value, MAX_RANGE_BYTES))
+
+
+def read_artifact_range(*, output_dir: Path, name: str, offset: int, length: Any) -> dict[str, Any]:
+    """Read `[offset, offset+length)` of an artifact; raises FileNotFoundError for unknown/missing names."""
+    if name not in RANGE_ARTIFACT_NAMES:
+        raise FileNotFoundError(name)
+    file_path = output_dir / name
+    if not file_path.is_file():
+        raise FileNotFoundError(name)
+    start = max(0, int(offset or 0))
+    with file_path.open("rb") as fp:
+        size = int(fp.seek(0, 2))
+        fp.seek(min(start, size))
+        data = fp.read(clamp_range_length(length))
+    return {"name": name, "offset": start, "data": data, "size": size, "eof": start + len(data) >= size}
+
+
+def publish_report(*, test_output_dir: Path, output_dir: Path) -> None:
+    # Copy an attempt's report (+ sidecar) to `output/`; sidecar first so readers of the new
+    # report.json never see the previous attempt's bytes. A stale sidecar is dropped.
+    report_src = test_output_dir / "report.json"
+    if not report_src.exists():
+        return
+    outputs_src = test_output_dir / REPORT_OUTPUTS_NAME
+    if outputs_src.exists():
+        shutil.copyfile(outputs_src, output_dir / REPORT_OUTPUTS_NAME)
+    else:
+        (output_dir / REPORT_OUTPUTS_NAME).unlink(missing_ok=True)
+    shutil.copyfile(report_src, output_dir / "report.json")
@@ -0,0 +1,249 @@
+#
+# SQLite job index helpers.
+#
+from __future__ import annotations
+
+"""`jobs` 索引表：state.json 的可查询镜像。
+
+state.json 仍是唯一的权威数据源；索引只用于 list/claim/reconcile 的查询，避免每次都遍历 jobs_root。
+- 写入：`job_state.save_state` 在落盘后 upsert（best-effort，失败只记日志，不影响 state.json）。
+- 范围：只索引 backend 配置的 `SETTINGS.jobs_root`；judge worker 本地工作区等其它目录不入库。
+- 修复：索引与磁盘不一致时，可用 `python -m backend.app.rebuild_job_index` 从 state.json 全量重建。
+"""
+
+import logging
+import pathlib
+import typing
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .. import db as db_module
+from ..models import JobIndex
+from ..settings import SETTINGS
+from ..utils.fs import read_json
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_COLUMNS = (
+    "owner_user_id",
+    "status",
+    "created_at",
+    "finished_at",
+    "expires_at",
+    "judge_machine_id",
+    "judge_claim_id",
+    "judge_claimed_at",
+)
+
+
+def is_indexed_root(jobs_root: pathlib.Path) -> bool:
+    """Whether `jobs_root` is the backend jobs root mirrored into the index."""
+
+    try:
+        return jobs_root.resolve() == pathlib.Path(SETTINGS.jobs_root).resolve()
+    except OSError:
+        return False
+
+
+def optional_str(value: typing.Any) -> str | None:
+    text = str(value or "")
+    return text or None
+
+
+def row_values_from_state(*, job_id: str, state: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    judge = state.get("judge") if isinstance(state.get("judge"), dict) else {}
+    return {
+        "job_id": job_id,
+        "owner_user_id": str(state.get("owner_user_id") or ""),
+        "status": str(state.get("status") or ""),
+        "created_at": str(state.get("created_at") or ""),
+        "finished_at": optional_str(state.get("finished_at")),
+        "expires_at": optional_str(state.get("expires_at")),
+        "judge_machine_id": optional_str(judge.get("machine_id")),
+        "judge_claim_id": optional_str(judge.get("claim_id")),
+        "judge_claimed_at": optional_str(judge.get("claimed_at")),
+    }
+
+
+def upsert_job_state(*, job_id: str, state: dict[str, typing.Any]) -> None:
+    """Insert or update one index row from a state dict."""
+
+    values = row_values_from_state(job_id=job_id, state=state)
+    stmt = sqlite_insert(JobIndex).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobIndex.job_id],
+        set_={name: stmt.excluded[name] for name in INDEX_COLUMNS} | {"updated_at": func.current_timestamp()},
+    )
+    with db_module.SessionLocal() as db:
+        db.execute(stmt)
+        db.commit()
+
+
+def delete_job(*, job_id: str) -> None:
+    with db_module.SessionLocal() as db:
+        db.execute(delete(JobIndex).where(JobIndex.job_id == job_id))
+        db.commit()
+
+
+def sync_state_file(*, state_path: pathlib.Path, state: dict[str, typing.Any]) -> None:
+    """Mirror a freshly written `state.json` into the index (best-effort)."""
+
+    job_dir = state_path.parent
+    if not is_indexed_root(job_dir.parent):
+        return
+    try:
+        upsert_job_state(job_id=job_dir.name, state=state)
+    except Exception as exc:
+        logger.warning("job index upsert failed: job_id=%s (%s)", job_dir.name, exc)
+
+
+def refresh_job_from_disk(*, jobs_root: pathlib.Path, job_id: str) -> None:
+    """Re-read one job's state.json into the index; drop the row if the job is gone."""
+
+    state_path = jobs_root / job_id / "state.json"
+    try:
+        state = read_json(state_path)
+    except FileNotFoundError:
+        delete_job(job_id=job_id)
+        return
+    except Exception as exc:
+        logger.debug("job index refresh skipped: job_id=%s (%s)", job_id, exc)
+        return
+    if isinstance(state, dict):
+        upsert_job_state(job_id=job_id, state=state)
+
+
+def list_job_ids_by_status(*, statuses: typing.Sequence[str], limit: int | None = None) -> list[str]:
+    """Job ids in the given statuses, oldest first (FIFO order for claims)."""
+
+    stmt = (
+        select(JobIndex.job_id)
+        .where(JobIndex.status.in_(list(statuses)))
+        .order_by(JobIndex.created_at, JobIndex.job_id)
+    )
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    with db_module.SessionLocal() as db:
+        return list(db.scalars(stmt))
+
+
+def filter_job_rows(
+    stmt: typing.Any,
+    *,
+    owner_user_id: str | None,
+    statuses: typing.Sequence[str] | None,
+    created_after: str | None,
+    created_before: str | None,
+) -> typing.Any:
+    # list_job_rows / count_job_rows 共用的过滤条件（不含 keyset 游标）。
+    if owner_user_id is not None:
+        stmt = stmt.where(JobIndex.owner_user_id == owner_user_id)
+    if statuses:
+        stmt = stmt.where(JobIndex.status.in_(list(statuses)))
+    if created_after is not None:
+        stmt = stmt.where(JobIndex.created_at >= created_after)
+    if created_before is not None:
+        stmt = stmt.where(JobIndex.created_at < created_before)
+    return stmt
+
+
+def count_job_rows(
+    *,
+    owner_user_id: str | None = None,
+    statuses: typing.Sequence[str] | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+) -> int:
+    """Number of index rows matching the filters (all pages; the keyset cursor is not applied)."""
+
+    stmt = filter_job_rows(
+        select(func.count()).select_from(JobIndex),
+        owner_user_id=owner_user_id,
+        statuses=statuses,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    with db_module.SessionLocal() as db:
+        return int(db.scalar(stmt) or 0)
+
+
+def list_job_rows(
+    *,
+    owner_user_id: str | None = None,
+    statuses: typing.Sequence[str] | None = None,
+    created_after: str | None = None,
+    created_before: str | None = None,
+    before_created_at: str | None = None,
+    before_job_id: str | None = None,
+    limit: int | None = None,
+) -> list[JobIndex]:
+    """Index rows, newest first, with optional filters and a `(created_at, job_id)` keyset cursor.
+
+    Timestamps are compared as ISO strings, so callers must pass them in the UTC form state.json uses.
+    """
+
+    stmt = filter_job_rows(
+        select(JobIndex),
+        owner_user_id=owner_user_id,
+        statuses=statuses,
+        created_after=created_after,
+        created_before=created_before,
+    )
+    if before_created_at is not None:
+        if before_job_id:
+            stmt = stmt.where(
+                or_(
+                    JobIndex.created_at < before_created_at,
+                    and_(JobIndex.created_at == before_created_at, JobIndex.job_id < before_job_id),
+                )
+            )
+        else:
+            stmt = stmt.where(JobIndex.created_at < before_created_at)
+    stmt = stmt.order_by(JobIndex.created_at.desc(), JobIndex.job_id.desc())
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    with db_module.SessionLocal() as db:
+        return list(db.scalars(stmt))
+
+
+def iter_state_files(*, jobs_root: pathlib.Path) -> typing.Iterator[tuple[str, dict[str, typing.Any]]]:
+    """Yield `(job_id, state)` for every readable `state.json` under `jobs_root`."""
+
+    if not jobs_root.exists():
+        return
+    for job_dir in jobs_root.iterdir():
+        state_path = job_dir / "state.json"
+        if not job_dir.is_dir() or not state_path.exists():
+            continue
+        try:
+            state = read_json(state_path)
+        except Exception:
+            continue
+        if isinstance(state, dict):
+            yield job_dir.name, state
+
+
+def rebuild_job_index(*, jobs_root: pathlib.Path) -> int:
+    """Recreate the whole index from on-disk state.json files; returns the row count."""
+
+    rows = [row_values_from_state(job_id=job_id, state=state) for job_id, state in iter_state_files(jobs_root=jobs_root)]
+    with db_module.SessionLocal() as db:
+        db.execute(delete(JobIndex))
+        if rows:
+            db.execute(sqlite_insert(JobIndex), rows)
+        db.commit()
+    return len(rows)
+
+
+def ensure_job_index(*, jobs_root: pathlib.Path) -> None:
+    """Populate an empty index once (first start after upgrading from directory scans)."""
+
+    with db_module.SessionLocal() as db:
+        has_rows = db.scalar(select(JobIndex.job_id).limit(1)) is not None
+    if has_rows:
+        return
+    count = rebuild_job_index(jobs_root=jobs_root)
+    if count:
+        logger.info("job index rebuilt from disk: %d jobs", count)
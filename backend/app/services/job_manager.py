@@ -7,7 +7,7 @@ from __future__ import annotations
 #
 # - Runner executor: local subprocesses or Docker containers.
 # - Judge mode:
-#   - embedded: backend runs generate/test immediately when a job is started
+#   - embedded: backend runs generate/test when a job is started (stage pools, see job_manager_scheduler)
 #   - independent: external judge workers claim queued jobs via a lock file
 #
 # The implementation is intentionally best-effort: state updates should not
@@ -25,7 +25,9 @@ from dataclasses import dataclass
 from .. import db as db_module, models as models_module
 from ..services import (
     codex_config,
+    cpu_leases,
     docker_service,
+    job_artifacts,
     job_paths,
     job_state,
     upstream_channels,
@@ -37,11 +39,13 @@ from . import job_manager_utils
 from . import job_manager_claims
 from . import job_manager_execution
 from . import job_manager_reconcile
+from . import job_manager_scheduler
 from .job_manager_plans import (
     GenerateBundle,
     GenerateBundleProvider,
     GenerateRunnerPlan,
     ResourceLimits,
+    RusageReporter,
     TestRunnerPlan,
     UsageReporter,
 )
@@ -99,6 +103,7 @@ class JobManager:
         jobs_root: pathlib.Path,
         generate_bundle_provider: GenerateBundleProvider | None = None,
         usage_reporter: UsageReporter | None = None,
+        rusage_reporter: RusageReporter | None = None,
     ):
         self._jobs_root = jobs_root
         executor = str(SETTINGS.runner_executor or "local").strip().lower()
@@ -112,8 +117,8 @@ class JobManager:
             self._client = None
         self._generate_bundle_provider = generate_bundle_provider
         self._usage_reporter = usage_reporter
+        self._rusage_reporter = rusage_reporter
         self._lock = threading.Lock()
-        self._threads: dict[str, threading.Thread] = {}
         self._local_procs: dict[str, dict[str, subprocess.Popen[bytes]]] = {}
 
     def reconcile(self) -> None:
@@ -149,15 +154,16 @@ class JobManager:
             job_state.save_state(paths.state_json, state)
 
             if self._judge_mode == "independent":
+                job_manager_claims.enqueue_job(jobs_root=self._jobs_root, job_id=job_id)
                 return state
 
-            t = threading.Thread(
-                target=self.run_job_thread,
-                kwargs={"job_id": job_id, "owner_user_id": owner_user_id},
-                daemon=True,
+            # generate/test 分池调度（见 job_manager_scheduler），不再每个 job 起一个线程。
+            job_manager_scheduler.get_stage_scheduler().submit_job(
+                manager=self,
+                jobs_root=self._jobs_root,
+                job_id=job_id,
+                owner_user_id=owner_user_id,
             )
-            self._threads[job_id] = t
-            t.start()
             return state
 
     def claim_next_queued_job(self, *, machine_id: str) -> dict[str, str] | None:
@@ -169,6 +175,10 @@ class JobManager:
         claimed = job_manager_claims.claim_next_queued_job(**claim_kwargs)
         return claimed
 
+    def requeue_job(self, *, job_id: str) -> None:
+        # Put a claimed-but-never-run job back on the queue (claim released by caller).
+        job_manager_claims.enqueue_job(jobs_root=self._jobs_root, job_id=job_id)
+
     def run_claimed_job(self, *, job_id: str, owner_user_id: str) -> None:
         # Run claimed job inline.
 
@@ -197,6 +207,8 @@ class JobManager:
             self.stop_job_execution(job_id=job_id, state=state)
             self.mark_state_cancelled(state=state)
             job_state.save_state(paths.state_json, state)
+            if status == "queued":
+                job_manager_claims.dequeue_job(jobs_root=self._jobs_root, job_id=job_id)
             return state
 
     def mark_state_cancelled(self, *, state: dict[str, typing.Any]) -> None:
@@ -353,6 +365,7 @@ class JobManager:
             resolve_runner_path=self.resolve_runner_path,
             on_started=lambda proc: self.remember_local_process(job_id=paths.root.name, stage="generate", process=proc),
             on_finished=lambda: self.forget_local_process(job_id=paths.root.name, stage="generate"),
+            on_rusage=self._rusage_reporter,
         )
 
     def run_test_docker(
@@ -388,6 +401,7 @@ class JobManager:
             "resolve_runner_path": self.resolve_runner_path,
             "on_started": on_started,
             "on_finished": on_finished,
+            "on_rusage": self._rusage_reporter,
         }
         return job_manager_runners.run_test_local(**run_kwargs)
 
@@ -517,36 +531,42 @@ class JobManager:
         job_state.save_state(paths.state_json, state)
 
         limits = job_manager_utils.read_resource_limits(state=state)
-        plan = TestRunnerPlan(
-            attempt=attempt,
-            extra_env={"ATTEMPT": str(attempt)},
-            limits=limits,
-        )
-
-        if self._runner_executor == "docker":
-            # Docker runner: tests run in a separate container that mounts the job dir.
-            exit_code = self.run_test_docker(
-                paths=paths,
-                owner_user_id=owner_user_id,
-                plan=plan,
-                state=typing.cast(dict[str, typing.Any], state),
-            )
-        else:
-            # Local runner: execute the test script directly inside the backend environment.
-            exit_code = self.run_test_local(
-                paths=paths,
-                plan=plan,
-                state=typing.cast(dict[str, typing.Any], state),
+        # 每个 test stage 独占一组核心（见 cpu_leases），runner 只在这组核心内按 case 绑核。
+        with cpu_leases.lease_cores(cpus=limits.cpus) as cores:
+            plan = TestRunnerPlan(
+                attempt=attempt,
+                extra_env={
+                    "ATTEMPT": str(attempt),
+                    # 最终 attempt 不做 fail-fast：要给出完整的 report。
+                    "REALMOI_TEST_FINAL_ATTEMPT": "1" if attempt >= job_manager_execution.attempts_total() else "0",
+                    cpu_leases.CPUSET_ENV: cpu_leases.format_cpuset(cores),
+                },
+                limits=limits,
+                cpuset=tuple(cores),
             )
 
+            if self._runner_executor == "docker":
+                # Docker runner: tests run in a separate container that mounts the job dir.
+                exit_code = self.run_test_docker(
+                    paths=paths,
+                    owner_user_id=owner_user_id,
+                    plan=plan,
+                    state=typing.cast(dict[str, typing.Any], state),
+                )
+            else:
+                # Local runner: execute the test script directly inside the backend environment.
+                exit_code = self.run_test_local(
+                    paths=paths,
+                    plan=plan,
+                    state=typing.cast(dict[str, typing.Any], state),
+                )
+
         state = job_state.load_state(paths.state_json)
         state["containers"]["test"]["exit_code"] = exit_code
         job_state.save_state(paths.state_json, state)
 
         attempt_dir = paths.output_dir / "artifacts" / f"attempt_{attempt}" / "test_output"
-        report_src = attempt_dir / "report.json"
-        if report_src.exists():
-            (paths.output_dir / "report.json").write_bytes(report_src.read_bytes())
+        job_artifacts.publish_report(test_output_dir=attempt_dir, output_dir=paths.output_dir)
 
         if exit_code != 0:
             return
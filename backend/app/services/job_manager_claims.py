@@ -6,7 +6,7 @@ from __future__ import annotations
 """独立 judge 模式：队列领取与锁文件管理。
 
 该模块将 `JobManager` 中与 `judge.lock` 相关的文件锁逻辑拆出，避免核心调度代码被锁细节淹没。
-行为保持为 best-effort：读取失败会放弃当前候选并继续扫描，不应导致 worker 崩溃。
+行为保持为 best-effort：读取失败会放弃当前候选并继续尝试下一个，不应导致 worker 崩溃。
 """
 
 import json
@@ -15,29 +15,101 @@ import pathlib
 import secrets
 import time
 
-from ..services import job_paths, job_state
+from ..services import job_index, job_paths, job_queue, job_state
+
+
+def enqueue_job(*, jobs_root: pathlib.Path, job_id: str) -> None:
+    """`start_job` 进入 queued 后入队；非 backend jobs_root 不使用队列（领取时退回扫描）。"""
+
+    if job_index.is_indexed_root(jobs_root):
+        job_queue.push(job_id=job_id)
+        job_queue.CLAIM_WAITERS.notify_all()
+
+
+def dequeue_job(*, jobs_root: pathlib.Path, job_id: str) -> None:
+    """queued job 被取消时移出队列，避免队列里堆积已取消的条目。"""
+
+    if job_index.is_indexed_root(jobs_root):
+        job_queue.remove(job_id=job_id)
 
 
 def claim_next_queued_job(*, jobs_root: pathlib.Path, machine_id: str, stale_seconds: int) -> dict[str, str] | None:
-    """从 `jobs_root` 扫描并尝试领取一个 queued job。"""
+    """按入队顺序（FIFO）领取一个 queued job。
 
-    candidates: list[tuple[str, str]] = []
-    for p in jobs_root.iterdir():
-        if not p.is_dir():
-            continue
-        state_path = p / "state.json"
-        if not state_path.exists():
+    backend 的 jobs_root 从 `job_queue` 原子弹出队头（O(1)）；其它目录（测试/临时 root）退回目录扫描。
+    弹出的 job 若已不是 queued（例如已取消）直接丢弃并继续弹下一个。
+    """
+
+    if not job_index.is_indexed_root(jobs_root):
+        return claim_first(
+            jobs_root=jobs_root,
+            job_ids=scan_queued_job_ids(jobs_root=jobs_root),
+            machine_id=machine_id,
+            stale_seconds=stale_seconds,
+        )
+
+    swept = False
+    while True:
+        job_id = job_queue.pop()
+        if job_id is None:
+            if swept:
+                return None
+            # 队列空时补一次漏网的 queued job（崩溃/升级/手工改 state.json），只查索引中的 queued 行。
+            requeue_orphans(jobs_root=jobs_root, stale_seconds=stale_seconds)
+            swept = True
             continue
+        payload = try_claim_job(
+            jobs_root=jobs_root,
+            job_id=job_id,
+            machine_id=machine_id,
+            stale_seconds=stale_seconds,
+        )
+        if payload is not None:
+            return payload
+        # 以磁盘为准刷新索引行，避免过期的 queued 行在下次 sweep 时又被捡回来。
         try:
-            state = job_state.load_state(state_path)
+            job_index.refresh_job_from_disk(jobs_root=jobs_root, job_id=job_id)
         except Exception:
             continue
-        if state.get("status") != "queued":
+
+
+def requeue_orphans(*, jobs_root: pathlib.Path, stale_seconds: int) -> list[str]:
+    """把索引中 queued、但不在队列里且未被有效锁占用的 job 重新入队（按 created_at）。"""
+
+    queued_ids = job_index.list_job_ids_by_status(statuses=("queued",))
+    in_queue = job_queue.contains(job_ids=queued_ids)
+    orphans: list[str] = []
+    for job_id in queued_ids:
+        if job_id in in_queue:
             continue
-        created_at = str(state.get("created_at") or "")
-        candidates.append((created_at, p.name))
+        lock_path = jobs_root / job_id / "logs" / "judge.lock"
+        try_break_stale_lock(lock_path=lock_path, stale_seconds=stale_seconds)
+        if lock_path.exists():
+            continue
+        orphans.append(job_id)
+    job_queue.push_many(job_ids=orphans)
+    return orphans
+
 
-    for _created_at, job_id in sorted(candidates):
+def scan_queued_job_ids(*, jobs_root: pathlib.Path) -> list[str]:
+    """目录扫描版本：返回所有 queued job，按 created_at 升序。"""
+
+    candidates = [
+        (str(state.get("created_at") or ""), job_id)
+        for job_id, state in job_index.iter_state_files(jobs_root=jobs_root)
+        if state.get("status") == "queued"
+    ]
+    return [job_id for _created_at, job_id in sorted(candidates)]
+
+
+def claim_first(
+    *,
+    jobs_root: pathlib.Path,
+    job_ids: list[str],
+    machine_id: str,
+    stale_seconds: int,
+) -> dict[str, str] | None:
+    for job_id in job_ids:
         payload = try_claim_job(
             jobs_root=jobs_root,
             job_id=job_id,
@@ -48,28 +48,44 @@ def append_retry_terminal(*, paths: job_paths.JobPaths, attempt: int) -> None:
     job_manager_utils.append_terminal(paths, f"[backend] attempt {attempt} failed, retrying (repair)...\n")
 
 
+def attempts_total() -> int:
+    return 1 + max(0, int(SETTINGS.quality_max_retries))
+
+
+def prompt_mode_for(attempt: int) -> str:
+    # After a failed attempt, switch to repair prompt mode.
+    return "generate" if attempt == 1 else "repair"
+
+
+def finish_attempt(*, manager: "JobManager", paths: job_paths.JobPaths, attempt: int, total: int) -> bool:
+    """Decide what follows a finished test stage.
+
+    Returns True when the job succeeded (already finalized), False when another
+    attempt should run; raises once retries are exhausted.
+    """
+
+    if report_is_success(report_path=paths.output_dir / "report.json"):
+        manager.finalize_success(paths=paths)
+        return True
+    if attempt < total:
+        append_retry_terminal(paths=paths, attempt=attempt)
+        return False
+    raise RuntimeError("quality_retries_exhausted")
+
+
 def run_job_attempts(*, manager: "JobManager", jobs_root: pathlib.Path, job_id: str, owner_user_id: str) -> None:
+    # Serial attempt loop (judge workers run claimed jobs inline; embedded mode uses job_manager_scheduler).
     paths = job_paths.get_job_paths(jobs_root=jobs_root, job_id=job_id)
-    attempts_total = 1 + max(0, int(SETTINGS.quality_max_retries))
+    total = attempts_total()
 
     try:
-        for attempt in range(1, attempts_total + 1):
+        for attempt in range(1, total + 1):
             if is_cancelled(paths=paths):
                 return
 
-            # After a failed attempt, switch to repair prompt mode.
-            prompt_mode = "generate" if attempt == 1 else "repair"
-            manager.run_generate(paths=paths, owner_user_id=owner_user_id, attempt=attempt, prompt_mode=prompt_mode)
+            manager.run_generate(paths=paths, owner_user_id=owner_user_id, attempt=attempt, prompt_mode=prompt_mode_for(attempt))
             manager.run_test(paths=paths, owner_user_id=owner_user_id, attempt=attempt)
-
-            if report_is_success(report_path=paths.output_dir / "report.json"):
-                manager.finalize_success(paths=paths)
+            if finish_attempt(manager=manager, paths=paths, attempt=attempt, total=total):
                 return
-
-            if attempt < attempts_total:
-                append_retry_terminal(paths=paths, attempt=attempt)
-                continue
-
-            raise RuntimeError("quality_retries_exhausted")
     except Exception as error:
         mark_failed_state(paths=paths, message=str(error))
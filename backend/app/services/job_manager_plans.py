@@ -20,6 +20,8 @@ class GenerateBundle:
 
 GenerateBundleProvider = collections.abc.Callable[..., GenerateBundle]
 UsageReporter = collections.abc.Callable[..., None]
+# Receives `resource.struct_rusage` of each finished local runner process.
+RusageReporter = collections.abc.Callable[..., None]
 
 
 @dataclasses.dataclass(frozen=True)
@@ -49,4 +51,6 @@ class TestRunnerPlan:
     attempt: int
     extra_env: dict[str, str]
     limits: ResourceLimits
+    # Cores leased for this stage (docker `cpuset_cpus`); empty = not pinned.
+    cpuset: tuple[int, ...] = ()
 
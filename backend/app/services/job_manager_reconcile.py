@@ -8,7 +8,7 @@ from __future__ import annotations
 import pathlib
 import typing
 
-from ..services import job_state
+from ..services import job_index, job_state
 
 
 def load_state_safe(state_path: pathlib.Path) -> dict[str, typing.Any] | None:
@@ -80,6 +80,21 @@ def reconcile_docker_running(
     job_state.save_state(state_path, state)
 
 
+RUNNING_STATUSES = ("running_generate", "running_test")
+
+
+def iter_running_state_paths(*, jobs_root: pathlib.Path) -> typing.Iterator[pathlib.Path]:
+    """运行中 job 的 state.json：backend jobs_root 查索引，其它目录退回扫描。"""
+
+    if job_index.is_indexed_root(jobs_root):
+        for job_id in job_index.list_job_ids_by_status(statuses=RUNNING_STATUSES):
+            yield jobs_root / job_id / "state.json"
+        return
+    for job_id, state in job_index.iter_state_files(jobs_root=jobs_root):
+        if state.get("status") in RUNNING_STATUSES:
+            yield jobs_root / job_id / "state.json"
+
+
 def reconcile_jobs(
     *,
     jobs_root: pathlib.Path,
@@ -87,11 +102,9 @@ def reconcile_jobs(
     judge_mode: str,
     docker_client: typing.Any | None,
 ) -> None:
-    for job_dir in jobs_root.iterdir():
-        if not job_dir.is_dir():
-            continue
-        state_path = job_dir / "state.json"
+    for state_path in iter_running_state_paths(jobs_root=jobs_root):
         if not state_path.exists():
+            job_index.refresh_job_from_disk(jobs_root=jobs_root, job_id=state_path.parent.name)
             continue
 
         state = load_state_safe(state_path)
@@ -99,7 +112,7 @@ def reconcile_jobs(
             continue
 
         status = state.get("status")
-        if status not in ("running_generate", "running_test"):
+        if status not in RUNNING_STATUSES:
             continue
         stage = "generate" if status == "running_generate" else "test"
 
@@ -82,6 +82,7 @@ def run_generate_local(
     resolve_runner_path: typing.Callable[[str], pathlib.Path],
     on_started: typing.Callable[[typing.Any], None],
     on_finished: typing.Callable[[], None],
+    on_rusage: typing.Callable[[typing.Any], None] | None = None,
 ) -> int:
     # Run generation as a local subprocess and record pid into state.json.
     script_path = resolve_runner_path(SETTINGS.runner_generate_script)
@@ -113,7 +114,11 @@ def run_generate_local(
             log_path=paths.terminal_log,
             max_bytes=plan.limits.max_terminal_log_bytes,
             redact_secrets=[plan.secret],
-            callbacks=local_runner.LocalRunnerCallbacks(on_started=on_started, on_finished=on_finished),
+            callbacks=local_runner.LocalRunnerCallbacks(
+                on_started=on_started,
+                on_finished=on_finished,
+                on_rusage=on_rusage,
+            ),
         )
     )
     state = job_state.load_state(paths.state_json)
@@ -146,6 +151,7 @@ def run_test_docker(
             cpus=plan.limits.cpus,
             memory_mb=plan.limits.memory_mb,
             pids_limit=plan.limits.pids_limit,
+            cpuset=",".join(str(c) for c in plan.cpuset) or None,
         ),
         extra_env=plan.extra_env,
     )
@@ -178,6 +184,7 @@ def run_test_local(
     resolve_runner_path: typing.Callable[[str], pathlib.Path],
     on_started: typing.Callable[[typing.Any], None],
     on_finished: typing.Callable[[], None],
+    on_rusage: typing.Callable[[typing.Any], None] | None = None,
 ) -> int:
     # Run tests as a local subprocess and record pid into state.json.
     script_path = resolve_runner_path(SETTINGS.runner_test_script)
@@ -202,7 +209,11 @@ def run_test_local(
             log_path=paths.terminal_log,
             max_bytes=plan.limits.max_terminal_log_bytes,
             redact_secrets=[],
-            callbacks=local_runner.LocalRunnerCallbacks(on_started=on_started, on_finished=on_finished),
+            callbacks=local_runner.LocalRunnerCallbacks(
+                on_started=on_started,
+                on_finished=on_finished,
+                on_rusage=on_rusage,
+            ),
         )
     )
     state = job_state.load_state(paths.state_json)
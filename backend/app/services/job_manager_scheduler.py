@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+"""Embedded 模式的 stage 调度器：generate 与 test 分池执行。
+
+generate 阶段主要在等 LLM，CPU 几乎空闲；test 阶段编译并运行 C++，是纯 CPU 负载。
+因此按阶段拆成两个有界线程池：
+- generate 池：较大（`REALMOI_STAGE_GENERATE_WORKERS`），允许大量 job 并发等待上游
+- test 池：按 CPU 核数（`REALMOI_STAGE_TEST_WORKERS`，0=os.cpu_count()），避免编译/评测超订核心
+一个 attempt 的 generate 完成后把 job 交给 test 池；test 失败且还有重试时再交回 generate 池。
+阶段之间 job 只占队列位置，不占线程。
+"""
+
+import logging
+import os
+import queue
+import threading
+import typing
+from dataclasses import dataclass, replace
+
+from ..settings import SETTINGS
+from . import job_manager_execution, job_paths
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from .job_manager import JobManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class StagePool:
+    """Bounded pool of daemon worker threads fed by a FIFO queue.
+
+    Threads are started lazily up to `workers` and never block interpreter exit
+    (unlike `ThreadPoolExecutor`), matching the old daemon job threads.
+    """
+
+    def __init__(self, *, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self._queue: queue.Queue[typing.Callable[[], None]] = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        self._idle = 0
+        self._busy = 0
+
+    def submit(self, fn: typing.Callable[[], None]) -> None:
+        self._queue.put(fn)
+        with self._lock:
+            if self._queue.qsize() <= self._idle or len(self._threads) >= self.workers:
+                return
+            t = threading.Thread(target=self._worker, name=f"{self.name}-{len(self._threads)}", daemon=True)
+            self._threads.append(t)
+        t.start()
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            fn = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+                self._busy += 1
+            try:
+                fn()
+            except Exception:
+                logger.exception("stage task crashed: pool=%s", self.name)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"workers": self.workers, "threads": len(self._threads), "busy": self._busy, "queued": self._queue.qsize()}
+
+
+@dataclass(frozen=True)
+class StageTask:
+    manager: "JobManager"
+    paths: job_paths.JobPaths
+    owner_user_id: str
+    attempt: int
+    total: int
+
+
+def resolve_test_workers(value: typing.Any) -> int:
+    # 0/非法值表示按 CPU 核数。
+    try:
+        workers = int(value or 0)
+    except (TypeError, ValueError):
+        workers = 0
+    return workers if workers > 0 else max(1, os.cpu_count() or 1)
+
+
+class StageScheduler:
+    """Run job attempts as generate/test stage tasks on separate pools."""
+
+    def __init__(self, *, generate_workers: int, test_workers: int):
+        self.generate_pool = StagePool(name="stage-generate", workers=generate_workers)
+        self.test_pool = StagePool(name="stage-test", workers=test_workers)
+        self._lock = threading.Lock()
+        self._inflight: dict[str, str] = {}
+
+    def submit_job(self, *, manager: "JobManager", jobs_root: typing.Any, job_id: str, owner_user_id: str) -> None:
+        task = StageTask(
+            manager=manager,
+            paths=job_paths.get_job_paths(jobs_root=jobs_root, job_id=job_id),
+            owner_user_id=owner_user_id,
+            attempt=1,
+            total=job_manager_execution.attempts_total(),
+        )
+        self.submit_generate(task)
+
+    def submit_generate(self, task: StageTask) -> None:
+        self._set_stage(task, "generate")
+        self.generate_pool.submit(lambda: self.run_generate_stage(task))
+
+    def submit_test(self, task: StageTask) -> None:
+        self._set_stage(task, "test")
+        self.test_pool.submit(lambda: self.run_test_stage(task))
+
+    def run_generate_stage(self, task: StageTask) -> None:
+        try:
+            if job_manager_execution.is_cancelled(paths=task.paths):
+                self._finish(task)
+                return
+            task.manager.run_generate(
+                paths=task.paths,
+                owner_user_id=task.owner_user_id,
+                attempt=task.attempt,
+                prompt_mode=job_manager_execution.prompt_mode_for(task.attempt),
+            )
+        except Exception as error:
+            self._fail(task, error)
+            return
+        self.submit_test(task)
+
+    def run_test_stage(self, task: StageTask) -> None:
+        try:
+            if job_manager_execution.is_cancelled(paths=task.paths):
+                self._finish(task)
+                return
+            task.manager.run_test(paths=task.paths, owner_user_id=task.owner_user_id, attempt=task.attempt)
+            done = job_manager_execution.finish_attempt(
+                manager=task.manager,
+                paths=task.paths,
+                attempt=task.attempt,
+                total=task.total,
+            )
+        except Exception as error:
+            self._fail(task, error)
+            return
+        if done:
+            self._finish(task)
+            return
+        self.submit_generate(replace(task, attempt=task.attempt + 1))
+
+    def inflight(self) -> dict[str, str]:
+        """`job_id -> stage` for jobs queued or running in either pool."""
+
+        with self._lock:
+            return dict(self._inflight)
+
+    def stats(self) -> dict[str, typing.Any]:
+        return {"generate": self.generate_pool.stats(), "test": self.test_pool.stats(), "jobs": len(self.inflight())}
+
+    def _set_stage(self, task: StageTask, stage: str) -> None:
+        with self._lock:
+            self._inflight[task.paths.root.name] = stage
+
+    def _finish(self, task: StageTask) -> None:
+        with self._lock:
+            self._inflight.pop(task.paths.root.name, None)
+
+    def _fail(self, task: StageTask, error: Exception) -> None:
+        try:
+            job_manager_execution.mark_failed_state(paths=task.paths, message=str(error))
+        finally:
+            self._finish(task)
+
+
+_SCHEDULER: StageScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_stage_scheduler() -> StageScheduler:
+    """Process-wide scheduler, so every JobManager shares the same CPU budget."""
+
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = StageScheduler(
+                generate_workers=max(1, int(SETTINGS.stage_generate_workers or 1)),
+                test_workers=resolve_test_workers(SETTINGS.stage_test_workers),
+            )
+        return _SCHEDULER
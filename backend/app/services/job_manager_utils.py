@@ -14,14 +14,18 @@ from ..services import codex_config, upstream_channels
 from ..settings import SETTINGS
 from . import job_paths
 from .job_manager_plans import GenerateBundle, ResourceLimits
+from .job_output_buffer import OUTPUT_BUFFER
 
 
 def append_terminal(paths: job_paths.JobPaths, text: str) -> None:
     # Append to terminal log best-effort (UI streaming).
     try:
         paths.terminal_log.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf-8")
         with paths.terminal_log.open("ab") as file_handle:
-            file_handle.write(text.encode("utf-8"))
+            offset = int(file_handle.tell())
+            file_handle.write(data)
+        OUTPUT_BUFFER.record(path=paths.terminal_log, offset=offset, data=data)
     except OSError:
         return
 
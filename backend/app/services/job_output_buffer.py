@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+# In-memory window of recent job output (terminal.log / agent_status.jsonl / test_results.jsonl).
+#
+# - 写入方（本地 runner 的 stream_terminal_log、docker 日志采集、append_terminal、judge.job.append_*）
+#   在写盘后顺带把 (offset, bytes) 记进来；log_tail_hub 从磁盘读到的新字节也会补记
+# - 每个文件一个连续窗口 [base, end)，超过单文件上限时丢弃最旧的字节；所有窗口合计超过总预算时
+#   按最近使用淘汰整个文件
+# - 读取只在 offset 落在窗口内时命中，其余（更旧的 offset、窗口末尾之后）交给调用方读盘
+#
+# 文件只追加，因此窗口内容始终等于磁盘上同一 offset 的内容；写入 offset 小于窗口末尾时
+# （截断或重复上报）直接从该 offset 覆盖。
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from ..settings import SETTINGS
+
+
+BUFFERED_NAMES = frozenset({"terminal.log", "agent_status.jsonl", "test_results.jsonl"})
+# Let a window grow this much past its cap before trimming (avoids a memmove per write).
+TRIM_SLACK = 1.25
+
+
+class OutputWindow:
+    __slots__ = ("base", "data")
+
+    def __init__(self, base: int):
+        self.base = base
+        self.data = bytearray()
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.data)
+
+
+class JobOutputBuffer:
+    """Thread-safe per-file windows of the most recent output bytes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._windows: OrderedDict[Path, OutputWindow] = OrderedDict()
+        self._total = 0
+
+    def record(self, *, path: Path, offset: int, data: bytes) -> None:
+        """Remember that `data` now sits at `offset` in `path` (append-only files)."""
+        per_file = int(SETTINGS.output_buffer_bytes_per_file)
+        if not data or per_file <= 0 or path.name not in BUFFERED_NAMES:
+            return
+        with self._lock:
+            window = self._windows.get(path)
+            if window is None or not window.base <= offset <= window.end:
+                if window is not None:
+                    self._total -= len(window.data)
+                window = OutputWindow(offset)
+                self._windows[path] = window
+            self._windows.move_to_end(path)
+            cut = offset - window.base
+            self._total -= len(window.data) - cut
+            del window.data[cut:]
+            window.data += data
+            self._total += len(data)
+            if len(window.data) > per_file * TRIM_SLACK:
+                drop = len(window.data) - per_file
+                del window.data[:drop]
+                window.base += drop
+                self._total -= drop
+            self._evict()
+
+    def _evict(self) -> None:
+        budget = int(SETTINGS.output_buffer_total_bytes)
+        while self._total > budget and len(self._windows) > 1:
+            _path, oldest = self._windows.popitem(last=False)
+            self._total -= len(oldest.data)
+
+    def read(self, *, path: Path, offset: int, max_bytes: int) -> bytes | None:
+        """Bytes at `offset` if it falls inside the window, else None (read from disk)."""
+        with self._lock:
+            window = self._windows.get(path)
+            if window is None or not window.base <= offset < window.end:
+                return None
+            self._windows.move_to_end(path)
+            start = offset - window.base
+            return bytes(window.data[start : start + max_bytes])
+
+    def window(self, path: Path) -> tuple[int, int] | None:
+        with self._lock:
+            window = self._windows.get(path)
+            return None if window is None else (window.base, window.end)
+
+    def forget(self, path: Path) -> None:
+        with self._lock:
+            window = self._windows.pop(path, None)
+            if window is not None:
+                self._total -= len(window.data)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+
+OUTPUT_BUFFER = JobOutputBuffer()
+
+
+def read_output(*, path: Path, offset: int, max_bytes: int) -> tuple[bytes, bool]:
+    """Read from the in-memory window when possible, else from disk. Returns `(data, from_memory)`."""
+    cached = OUTPUT_BUFFER.read(path=path, offset=offset, max_bytes=max_bytes)
+    if cached is not None:
+        return cached, True
+    try:
+        with path.open("rb") as fp:
+            fp.seek(offset)
+            return fp.read(max_bytes), False
+    except OSError:
+        return b"", False
@@ -18,6 +18,7 @@ class JobPaths:
     tests_dir: Path
     terminal_log: Path
     agent_status_jsonl: Path
+    test_results_jsonl: Path
 
 
 def get_job_paths(*, jobs_root: Path, job_id: str) -> JobPaths:
@@ -35,4 +36,6 @@ def get_job_paths(*, jobs_root: Path, job_id: str) -> JobPaths:
         tests_dir=input_dir / "tests",
         terminal_log=logs_dir / "terminal.log",
         agent_status_jsonl=logs_dir / "agent_status.jsonl",
+        # Under output/: the docker test container can only write /job/output.
+        test_results_jsonl=output_dir / "test_results.jsonl",
     )
@@ -0,0 +1,99 @@
+#
+# Independent judge FIFO queue (SQLite).
+#
+from __future__ import annotations
+
+"""`job_queue` 表：独立 judge 模式的 FIFO 队列。
+
+- `push`：`start_job` 进入 queued 后入队（同一 job 只保留一行）。
+- `pop`：`DELETE ... RETURNING` 原子弹出队头，多进程/多 worker 也不会重复弹出同一个 job。
+- `remove`：queued job 被取消时删除对应行（`cancel_job`），队列不保留已取消的条目。
+- 队列只是调度提示：真正的领取仍以 state.json + `judge.lock` 为准（见 `job_manager_claims`）。
+- `CLAIM_WAITERS`：长轮询 `judge.claim_next(wait_ms)` 的唤醒点；入队线程可能不在事件循环里，统一走 `call_soon_threadsafe`。
+"""
+
+import asyncio
+import threading
+import typing
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .. import db as db_module
+from ..models import JobQueueEntry
+
+
+def push(*, job_id: str) -> None:
+    stmt = sqlite_insert(JobQueueEntry).values(job_id=job_id).on_conflict_do_nothing(index_elements=[JobQueueEntry.job_id])
+    with db_module.SessionLocal() as db:
+        db.execute(stmt)
+        db.commit()
+
+
+def push_many(*, job_ids: typing.Sequence[str]) -> None:
+    if not job_ids:
+        return
+    stmt = sqlite_insert(JobQueueEntry).on_conflict_do_nothing(index_elements=[JobQueueEntry.job_id])
+    with db_module.SessionLocal() as db:
+        db.execute(stmt, [{"job_id": job_id} for job_id in job_ids])
+        db.commit()
+
+
+def pop() -> str | None:
+    """Atomically remove and return the oldest queued job id."""
+
+    head = select(func.min(JobQueueEntry.seq)).scalar_subquery()
+    stmt = delete(JobQueueEntry).where(JobQueueEntry.seq == head).returning(JobQueueEntry.job_id)
+    with db_module.SessionLocal() as db:
+        job_id = db.scalar(stmt)
+        db.commit()
+    return job_id
+
+
+def remove(*, job_id: str) -> None:
+    with db_module.SessionLocal() as db:
+        db.execute(delete(JobQueueEntry).where(JobQueueEntry.job_id == job_id))
+        db.commit()
+
+
+def contains(*, job_ids: typing.Sequence[str]) -> set[str]:
+    if not job_ids:
+        return set()
+    with db_module.SessionLocal() as db:
+        return set(db.scalars(select(JobQueueEntry.job_id).where(JobQueueEntry.job_id.in_(list(job_ids)))))
+
+
+def depth() -> int:
+    with db_module.SessionLocal() as db:
+        return int(db.scalar(select(func.count()).select_from(JobQueueEntry)) or 0)
+
+
+class ClaimWaiters:
+    """Registry of long-polling claimers; `notify_all` wakes them from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._waiters: dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
+
+    def register(self) -> asyncio.Event:
+        event = asyncio.Event()
+        with self._lock:
+            self._waiters[event] = asyncio.get_running_loop()
+        return event
+
+    def unregister(self, event: asyncio.Event) -> None:
+        with self._lock:
+            self._waiters.pop(event, None)
+
+    def notify_all(self) -> None:
+        with self._lock:
+            waiters = list(self._waiters.items())
+        for event, loop in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Loop already closed (session gone); its finally-unregister will clean up.
+                continue
+
+
+CLAIM_WAITERS = ClaimWaiters()
@@ -7,6 +7,7 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+from ..services import job_index
 from ..utils.fs import read_json, write_json
 
 
@@ -24,3 +25,5 @@ def load_state(path: Path) -> dict[str, Any]:
 
 def save_state(path: Path, state: dict[str, Any]) -> None:
     write_json(path, state)
+    # state.json 落盘后再同步索引：索引失败不影响权威数据。
+    job_index.sync_state_file(state_path=path, state=state)
@@ -7,6 +7,7 @@ from __future__ import annotations
 # - Minimal dependencies: only `websockets` if available.
 # - No business logic: job execution remains in judge_daemon.py.
 
+import base64
 import json
 from dataclasses import dataclass
 from typing import Any, Callable
@@ -17,6 +18,8 @@ try:
 except ModuleNotFoundError:  # pragma: no cover
     connect = None  # type: ignore[assignment]
 
+from .mcp_binary import APPEND_TOOL_STREAMS, CAPABILITY, encode_frame
+
 
 WarnFn = Callable[..., None]
 
@@ -112,6 +115,8 @@ class _ConnState:
     ws: Any | None = None
     connected_url: str = ""
     next_id: int = 0
+    # 服务端在 initialize 里确认后，append_* 走二进制帧。
+    binary_frames: bool = False
 
 
 class McpJudgeClient:
@@ -146,7 +151,9 @@ class McpJudgeClient:
                 self._state.ws = connect(url, open_timeout=2)  # type: ignore[misc]
                 self._state.connected_url = url
                 self._state.next_id = 0
-                self._request("initialize", {})
+                self._state.binary_frames = False
+                init = self._request("initialize", {"capabilities": {CAPABILITY: True}})
+                self._state.binary_frames = CAPABILITY in (init.get("capabilities") or {})
                 print(f"[judge] mcp connected url={url}", flush=True)
                 return
             except Exception as e:
@@ -178,38 +185,67 @@ class McpJudgeClient:
             self._state.next_id += 1
             msg_id = self._state.next_id
             payload = {"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params}
+            return self._send_and_wait(ws=ws, msg_id=msg_id, data=json.dumps(payload, ensure_ascii=False))
+
+    def _send_and_wait(self, *, ws: Any, msg_id: int, data: str | bytes) -> dict[str, Any]:
+        try:
+            ws.send(data)
+        except (OSError, RuntimeError, ValueError) as e:
+            self.close()
+            raise McpJudgeClientError(f"mcp_send_failed:{e}") from e
+
+        while True:
             try:
-                ws.send(json.dumps(payload, ensure_ascii=False))
-            except (OSError, RuntimeError, ValueError) as e:
+                raw = ws.recv()
+            except (OSError, TimeoutError, RuntimeError) as e:
                 self.close()
-                raise McpJudgeClientError(f"mcp_send_failed:{e}") from e
-
-            while True:
-                try:
-                    raw = ws.recv()
-                except (OSError, TimeoutError, RuntimeError) as e:
-                    self.close()
-                    raise McpJudgeClientError(f"mcp_recv_failed:{e}") from e
-
-                if isinstance(raw, bytes):
-                    raw_text = raw.decode("utf-8", errors="replace")
-                else:
-                    raw_text = str(raw)
-
-                msg = _try_parse_json_dict(raw_text)
-                if msg is None:
-                    # Ignore junk/partial frames but keep a breadcrumb for diagnosis.
-                    self._log_warn(key="mcp_decode", message="mcp recv: invalid json frame")
-                    continue
-                if msg.get("id") != msg_id:
-                    continue
-                if "error" in msg:
-                    raise McpJudgeClientError(f"mcp_error:{msg.get('error')}")
-                result = msg.get("result")
-                return result if isinstance(result, dict) else {}
+                raise McpJudgeClientError(f"mcp_recv_failed:{e}") from e
+
+            if isinstance(raw, bytes):
+                raw_text = raw.decode("utf-8", errors="replace")
+            else:
+                raw_text = str(raw)
+
+            msg = _try_parse_json_dict(raw_text)
+            if msg is None:
+                # Ignore junk/partial frames but keep a breadcrumb for diagnosis.
+                self._log_warn(key="mcp_decode", message="mcp recv: invalid json frame")
+                continue
+            if msg.get("id") != msg_id:
+                continue
+            if "error" in msg:
+                raise McpJudgeClientError(f"mcp_error:{msg.get('error')}")
+            result = msg.get("result")
+            return result if isinstance(result, dict) else {}
 
     def _request(self, method: str, params: dict[str, Any]) -> dict[str, Any]:
         return self.request(method, params)
 
     def call_tool(self, *, name: str, arguments: dict[str, Any]) -> dict[str, Any]:
         return self.request("tools/call", {"name": name, "arguments": arguments})
+
+    def append_chunk(self, *, name: str, job_id: str, claim_id: str, offset: int, chunk: bytes) -> dict[str, Any]:
+        # judge.job.append_*：已协商时发二进制帧（原始字节），否则退回 chunk_b64。
+        stream = APPEND_TOOL_STREAMS.get(name)
+        with self._lock:
+            self.ensure_connected()
+            ws = self._state.ws
+            if stream is not None and ws is not None and self._state.binary_frames:
+                self._state.next_id += 1
+                msg_id = self._state.next_id
+                frame = encode_frame(
+                    stream=stream,
+                    job_id=job_id,
+                    claim_id=claim_id,
+                    request_id=msg_id,
+                    offset=offset,
+                    payload=chunk,
+                )
+                return self._send_and_wait(ws=ws, msg_id=msg_id, data=frame)
+        arguments = {
+            "job_id": job_id,
+            "claim_id": claim_id,
+            "offset": offset,
+            "chunk_b64": base64.b64encode(chunk).decode("ascii"),
+        }
+        return self.call_tool(name=name, arguments=arguments)
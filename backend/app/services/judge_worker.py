@@ -6,6 +6,7 @@ from __future__ import annotations
 # - claim queued jobs over MCP WebSocket tools
 # - sync terminal/state logs while a job runs
 # - upload final artifacts and release claim locks
+# - run up to `REALMOI_JUDGE_SLOTS` claimed jobs concurrently (one workspace per slot)
 #
 # It is intentionally split out so the daemon entrypoint stays small and the
 # orchestration code can be reasoned about and tested in isolation.
@@ -13,16 +14,25 @@ from __future__ import annotations
 import base64
 import binascii
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from ..settings import SETTINGS
 from .job_manager import JobManager
 from .job_manager_plans import GenerateBundle
 from .judge_mcp_client import McpJudgeClient, McpJudgeClientError, resolve_mcp_ws_urls
-from .judge_worker_artifacts import cleanup_workspace, read_artifacts, sync_final_state, upload_artifacts
+from .judge_worker_artifacts import (
+    cleanup_workspace,
+    read_artifacts,
+    sync_final_state,
+    upload_artifacts,
+    upload_report_outputs,
+)
 from .judge_worker_common import log_warn, resolve_machine_id, resolve_work_root, structured_content
+from .judge_worker_slots import JudgeSlot, SlotPool, build_slots, resolve_slot_count
 from .judge_worker_sync import McpJobContext, SyncPaths, start_sync_threads, stop_threads
 from .judge_worker_workspace import download_job_input, init_job_workspace, write_initial_state
 
@@ -104,9 +114,9 @@ class McpUsageReporter:
             return
 
 
-def claim_next_job(*, client: McpJudgeClient, machine_id: str) -> tuple[str, str, str] | None:
-    # Claim one queued job via backend MCP tool.
-    result = client.call_tool(name="judge.claim_next", arguments={"machine_id": machine_id})
+def claim_next_job(*, client: McpJudgeClient, machine_id: str, wait_ms: int = 0) -> tuple[str, str, str] | None:
+    # Claim one queued job via backend MCP tool (wait_ms>0: server-side long-poll).
+    result = client.call_tool(name="judge.claim_next", arguments={"machine_id": machine_id, "wait_ms": wait_ms})
     payload = result.get("structuredContent") or {}
     if not isinstance(payload, dict) or not payload.get("claimed"):
         return None
@@ -119,12 +129,21 @@ def claim_next_job(*, client: McpJudgeClient, machine_id: str) -> tuple[str, str
     return job_id, owner_user_id, claim_id
 
 
-def run_claimed_job(*, client: McpJudgeClient, work_root: Path, job_id: str, owner_user_id: str, claim_id: str) -> None:
+def run_claimed_job(
+    *,
+    client: McpJudgeClient,
+    work_root: Path,
+    job_id: str,
+    owner_user_id: str,
+    claim_id: str,
+    rusage_reporter: Callable[[Any], None] | None = None,
+) -> None:
     # Execute one claimed job end-to-end in local workspace.
     manager = JobManager(
         jobs_root=work_root,
         generate_bundle_provider=McpGenerateBundleProvider(client=client, claim_id=claim_id),
         usage_reporter=McpUsageReporter(client=client, claim_id=claim_id),
+        rusage_reporter=rusage_reporter,
     )
     paths = init_job_workspace(work_root=work_root, job_id=job_id)
 
@@ -133,11 +152,12 @@ def run_claimed_job(*, client: McpJudgeClient, work_root: Path, job_id: str, own
 
     ctx = McpJobContext(client=client, job_id=job_id, claim_id=claim_id)
     stop, threads = start_sync_threads(
-        ctx=ctx,
+        job_ctx=ctx,
         manager=manager,
         paths=SyncPaths(
             terminal_log=paths.terminal_log,
             agent_status_jsonl=paths.agent_status_jsonl,
+            test_results_jsonl=paths.test_results_jsonl,
             state_json=paths.state_json,
         ),
     )
@@ -148,6 +168,7 @@ def run_claimed_job(*, client: McpJudgeClient, work_root: Path, job_id: str, own
 
     sync_final_state(client=client, job_id=job_id, claim_id=claim_id, state_path=paths.state_json)
     main_cpp, solution_json, report_json = read_artifacts(output_dir=paths.output_dir)
+    upload_report_outputs(client=client, job_id=job_id, claim_id=claim_id, output_dir=paths.output_dir)
     upload_artifacts(
         client=client,
         job_id=job_id,
@@ -159,55 +180,122 @@ def run_claimed_job(*, client: McpJudgeClient, work_root: Path, job_id: str, own
     cleanup_workspace(root=paths.root)
 
 
-def run_daemon() -> int:
+def release_claim(*, client: McpJudgeClient, job_id: str, claim_id: str) -> None:
+    try:
+        client.call_tool(name="judge.release_claim", arguments={"job_id": job_id, "claim_id": claim_id})
+    except McpJudgeClientError as e:
+        print(f"[judge] release claim failed job_id={job_id}: {e}", flush=True)
+
+
+def run_slot_job(
+    *,
+    client: McpJudgeClient,
+    pool: SlotPool,
+    slot: JudgeSlot,
+    claimed: tuple[str, str, str],
+) -> None:
+    # Run one claimed job inside `slot`, then release the claim and give the slot back.
+    job_id, owner_user_id, claim_id = claimed
+    cpu_before = slot.cpu.total_s()
+    try:
+        run_claimed_job(
+            client=client,
+            work_root=slot.work_root,
+            job_id=job_id,
+            owner_user_id=owner_user_id,
+            claim_id=claim_id,
+            rusage_reporter=slot.cpu.add_rusage,
+        )
+    except Exception as e:
+        # 单个 job 失败不影响其它 slot；backend 侧由 reconcile/锁过期兜底。
+        print(f"[judge] slot={slot.index} job failed job_id={job_id}: {type(e).__name__}: {e}", flush=True)
+    finally:
+        release_claim(client=client, job_id=job_id, claim_id=claim_id)
+        cpu_total = slot.cpu.total_s()
+        print(
+            f"[judge] slot={slot.index} finished job_id={job_id} "
+            f"cpu={cpu_total - cpu_before:.3f}s slot_cpu_total={cpu_total:.3f}s",
+            flush=True,
+        )
+        pool.release(slot)
+
+
+def run_dispatch_loop(
+    *,
+    claim_client: McpJudgeClient,
+    job_client: McpJudgeClient,
+    pool: SlotPool,
+    machine_id: str,
+    wait_ms: int,
+    interval: float,
+    stop: threading.Event,
+) -> None:
+    # Claim jobs only while a slot is free; each claimed job runs on a slot thread.
+    with ThreadPoolExecutor(max_workers=pool.size, thread_name_prefix="judge-slot") as executor:
+        while not stop.is_set():
+            slot = pool.acquire(timeout=interval)
+            if slot is None:
+                continue
+
+            started = time.monotonic()
+            try:
+                claimed = claim_next_job(client=claim_client, machine_id=machine_id, wait_ms=wait_ms)
+            except McpJudgeClientError as e:
+                pool.release(slot)
+                print(f"[judge] mcp error: {e}", flush=True)
+                stop.wait(interval)
+                continue
+
+            if not claimed:
+                pool.release(slot)
+                # 长轮询已在服务端等待过；旧 backend 忽略 wait_ms 立即返回时，按 poll interval 兜底避免空转。
+                idle = interval - (time.monotonic() - started)
+                if idle > 0:
+                    stop.wait(idle)
+                continue
+
+            print(f"[judge] claimed job_id={claimed[0]} slot={slot.index}", flush=True)
+            executor.submit(run_slot_job, client=job_client, pool=pool, slot=slot, claimed=claimed)
+
+
+def run_daemon(*, slots: int | None = None) -> int:
     # Run judge worker loop forever (or until fatal configuration error).
     machine_id = resolve_machine_id()
     interval = max(100, int(SETTINGS.judge_poll_interval_ms or 1000)) / 1000.0
+    wait_ms = max(0, int(SETTINGS.judge_claim_wait_ms or 0))
+    slot_count = resolve_slot_count(slots if slots is not None else SETTINGS.judge_slots)
     token = str(SETTINGS.judge_mcp_token or "").strip()
     ws_urls = resolve_mcp_ws_urls(
         token=token,
         api_base_url=str(SETTINGS.judge_api_base_url or ""),
         fallback_bases=["http://backend:8000/api", "http://127.0.0.1:8000/api"],
     )
-    mcp_client = McpJudgeClient(ws_urls=ws_urls, warn=log_warn) if ws_urls else None
     work_root = resolve_work_root()
     work_root.mkdir(parents=True, exist_ok=True)
 
     print(
-        f"[judge] machine_id={machine_id} mode={SETTINGS.judge_mode} executor={SETTINGS.runner_executor} poll={interval:.3f}s",
+        f"[judge] machine_id={machine_id} mode={SETTINGS.judge_mode} executor={SETTINGS.runner_executor} "
+        f"poll={interval:.3f}s claim_wait={wait_ms}ms slots={slot_count}",
         flush=True,
     )
     if SETTINGS.judge_mode != "independent":
         print("[judge] warning: REALMOI_JUDGE_MODE is not independent", flush=True)
-    if mcp_client is None:
+    if not ws_urls:
         print("[judge] error: REALMOI_JUDGE_MCP_TOKEN missing; cannot claim jobs via MCP", flush=True)
         return 2
 
-    while True:
-        try:
-            claimed = claim_next_job(client=mcp_client, machine_id=machine_id)
-        except McpJudgeClientError as e:
-            print(f"[judge] mcp error: {e}", flush=True)
-            time.sleep(interval)
-            continue
-
-        if not claimed:
-            time.sleep(interval)
-            continue
-
-        job_id, owner_user_id, claim_id = claimed
-
-        print(f"[judge] claimed job_id={job_id}", flush=True)
-        try:
-            run_claimed_job(
-                client=mcp_client,
-                work_root=work_root,
-                job_id=job_id,
-                owner_user_id=owner_user_id,
-                claim_id=claim_id,
-            )
-        finally:
-            try:
-                mcp_client.call_tool(name="judge.release_claim", arguments={"job_id": job_id, "claim_id": claim_id})
-            except McpJudgeClientError as e:
-                print(f"[judge] release claim failed job_id={job_id}: {e}", flush=True)
+    # 两条连接：claim 长轮询会占住连接（客户端串行收发），不能阻塞各 slot 的日志/状态同步；
+    # 所有 slot 共享同一个 job 连接，McpJudgeClient 内部锁保证请求/响应不交错。
+    claim_client = McpJudgeClient(ws_urls=ws_urls, warn=log_warn)
+    job_client = McpJudgeClient(ws_urls=ws_urls, warn=log_warn)
+    pool = SlotPool(build_slots(work_root=work_root, count=slot_count))
+    run_dispatch_loop(
+        claim_client=claim_client,
+        job_client=job_client,
+        pool=pool,
+        machine_id=machine_id,
+        wait_ms=wait_ms,
+        interval=interval,
+        stop=threading.Event(),
+    )
+    return 0
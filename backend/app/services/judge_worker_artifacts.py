@@ -6,9 +6,13 @@ from pathlib import Path
 from typing import Any
 
 from .judge_mcp_client import McpJudgeClient, McpJudgeClientError
+from .job_artifacts import REPORT_OUTPUTS_NAME
 from .judge_worker_common import log_warn
 
 
+REPORT_OUTPUTS_CHUNK_BYTES = 256 * 1024
+
+
 def sync_final_state(*, client: McpJudgeClient, job_id: str, claim_id: str, state_path: Path) -> None:
     # Push final state.json snapshot back to backend best-effort.
     try:
@@ -72,6 +76,29 @@ def upload_artifacts(
         log_warn(key="upload_artifacts", message=f"upload artifacts failed job_id={job_id}: {exc}")
 
 
+def upload_report_outputs(*, client: McpJudgeClient, job_id: str, claim_id: str, output_dir: Path) -> None:
+    # Upload the report.v2 sidecar in chunks before report.json, so the report never points past it.
+    path = output_dir / REPORT_OUTPUTS_NAME
+    offset = 0
+    try:
+        with path.open("rb") as fp:
+            while chunk := fp.read(REPORT_OUTPUTS_CHUNK_BYTES):
+                client.append_chunk(
+                    name="judge.job.append_report_outputs",
+                    job_id=job_id,
+                    claim_id=claim_id,
+                    offset=offset,
+                    chunk=chunk,
+                )
+                offset += len(chunk)
+    except FileNotFoundError:
+        return
+    except OSError as exc:
+        log_warn(key="upload_report_outputs", message=f"read report outputs failed job_id={job_id}: {exc}")
+    except McpJudgeClientError as exc:
+        log_warn(key="upload_report_outputs", message=f"upload report outputs failed job_id={job_id}: {exc}")
+
+
 def cleanup_workspace(*, root: Path) -> None:
     try:
         shutil.rmtree(root)
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+# 多 slot judge：一个 daemon 同时执行最多 N 个已领取的 job。
+# 设计要点：
+# - 每个 slot 独占 `judge_work_root/slot-{i}` 工作区，互不覆盖 job 目录/临时文件
+# - 空闲 slot 通过队列分配：只有拿到空闲 slot 才去 claim，避免领了却跑不了
+# - 每个 slot 单独累计本地 runner 子进程的 CPU 时间（wait4 rusage），便于观察负载分布
+
+import queue
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+
+def resolve_slot_count(value: Any) -> int:
+    # slots 至少为 1；非法值按 1 处理。
+    try:
+        return max(1, int(value or 1))
+    except (TypeError, ValueError):
+        return 1
+
+
+@dataclass
+class SlotCpuAccount:
+    """Thread-safe CPU time accumulator for one slot."""
+
+    user_s: float = 0.0
+    sys_s: float = 0.0
+    processes: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_rusage(self, usage: Any) -> None:
+        # `usage` 为 resource.struct_rusage；只取 ru_utime/ru_stime。
+        with self._lock:
+            self.user_s += float(getattr(usage, "ru_utime", 0.0) or 0.0)
+            self.sys_s += float(getattr(usage, "ru_stime", 0.0) or 0.0)
+            self.processes += 1
+
+    def total_s(self) -> float:
+        with self._lock:
+            return self.user_s + self.sys_s
+
+
+@dataclass(frozen=True)
+class JudgeSlot:
+    index: int
+    work_root: Path
+    cpu: SlotCpuAccount
+
+
+def build_slots(*, work_root: Path, count: int) -> list[JudgeSlot]:
+    # 为每个 slot 创建独立工作区目录。
+    slots = []
+    for index in range(resolve_slot_count(count)):
+        slot_root = work_root / f"slot-{index}"
+        slot_root.mkdir(parents=True, exist_ok=True)
+        slots.append(JudgeSlot(index=index, work_root=slot_root, cpu=SlotCpuAccount()))
+    return slots
+
+
+class SlotPool:
+    """Free-slot queue shared by the claim loop and slot workers."""
+
+    def __init__(self, slots: list[JudgeSlot]):
+        self._slots = list(slots)
+        self._free: queue.Queue[JudgeSlot] = queue.Queue()
+        for slot in self._slots:
+            self._free.put(slot)
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    def acquire(self, *, timeout: float | None = None) -> JudgeSlot | None:
+        # 阻塞等待空闲 slot；timeout 到期返回 None。
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, slot: JudgeSlot) -> None:
+        self._free.put(slot)
+
+    def free_count(self) -> int:
+        return self._free.qsize()
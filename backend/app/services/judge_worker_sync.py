@@ -6,8 +6,6 @@ from __future__ import annotations
 # - 写入采用 offset 协议：支持 offset_mismatch 自愈
 # - 允许“短时不一致”：该同步线程只负责把信息尽快写回后端，最终一致即可
 
-import base64
-import binascii
 import json
 import threading
 import time
@@ -35,6 +33,7 @@ class McpJobContext:
 class SyncPaths:
     terminal_log: Path
     agent_status_jsonl: Path
+    test_results_jsonl: Path
     state_json: Path
 
 
@@ -43,15 +42,6 @@ def sleepSeconds(poll_interval: float) -> None:
     time.sleep(max(0.0, float(poll_interval)))
 
 
-def encode_chunk_b64(chunk: bytes) -> str:
-    # terminal/log 走 JSON-RPC，因此二进制内容需要 base64 编码。
-    try:
-        return base64.b64encode(chunk).decode("ascii")
-    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
-        log_warn(key="append_encode", message=f"encode chunk failed: {type(exc).__name__}: {exc}")
-        return ""
-
-
 def read_local_chunk(*, local_path: Path, local_offset: int, max_bytes: int) -> bytes:
     """Read a fixed-size chunk from `local_path` at `local_offset` (best-effort)."""
     try:
@@ -68,17 +58,17 @@ def call_append_tool(
     job_ctx: McpJobContext,
     tool_name: str,
     remote_offset: int,
-    chunk_b64: str,
+    chunk: bytes,
 ) -> dict[str, Any] | None:
     """Call MCP append tool and return structuredContent payload (or None on failure)."""
     try:
-        result = job_ctx.client.call_tool(
+        # 协商了二进制帧时直接发原始字节，否则 client 内部退回 chunk_b64。
+        result = job_ctx.client.append_chunk(
             name=tool_name,
-            arguments={
-                **job_ctx.base_args(),
-                "offset": remote_offset,
-                "chunk_b64": chunk_b64,
-            },
+            job_id=job_ctx.job_id,
+            claim_id=job_ctx.claim_id,
+            offset=remote_offset,
+            chunk=chunk,
         )
     except McpJudgeClientError as exc:
         log_warn(key=f"append_call:{tool_name}", message=f"mcp append failed tool={tool_name}: {exc}")
@@ -137,13 +127,7 @@ def sync_append_loop(
             sleepSeconds(poll_interval)
             continue
 
-        # 编码失败通常意味着数据异常；退避并继续。
-        chunk_b64 = encode_chunk_b64(chunk)
-        if not chunk_b64:
-            sleepSeconds(max(0.2, poll_interval))
-            continue
-
-        payload = call_append_tool(job_ctx=job_ctx, tool_name=tool_name, remote_offset=remote_offset, chunk_b64=chunk_b64)
+        payload = call_append_tool(job_ctx=job_ctx, tool_name=tool_name, remote_offset=remote_offset, chunk=chunk)
         if payload is None:
             sleepSeconds(max(0.2, poll_interval))
             continue
@@ -306,6 +290,17 @@ def start_sync_threads(
             },
             daemon=True,
         ),
+        threading.Thread(
+            target=sync_append_loop,
+            kwargs={
+                "stop": stop,
+                "job_ctx": job_ctx,
+                "local_path": paths.test_results_jsonl,
+                "tool_name": "judge.job.append_test_results",
+                "poll_interval": 0.05,
+            },
+            daemon=True,
+        ),
         threading.Thread(
             target=sync_state_loop,
             kwargs={
@@ -6,6 +6,7 @@ import json
 import shutil
 from pathlib import Path
 
+from .job_output_buffer import OUTPUT_BUFFER
 from .job_paths import get_job_paths
 from .judge_mcp_client import McpJudgeClient, McpJudgeClientError
 from .judge_worker_common import log_warn, structured_content
@@ -25,6 +26,9 @@ def init_job_workspace(*, work_root: Path, job_id: str):
     paths = get_job_paths(jobs_root=work_root, job_id=job_id)
     if paths.root.exists():
         safe_rmtree(paths.root)
+    # 同一路径的旧窗口属于上一次领取，不能再当作新文件的内容。
+    for log_path in (paths.terminal_log, paths.agent_status_jsonl, paths.test_results_jsonl):
+        OUTPUT_BUFFER.forget(log_path)
     paths.input_dir.mkdir(parents=True, exist_ok=True)
     paths.output_dir.mkdir(parents=True, exist_ok=True)
     paths.logs_dir.mkdir(parents=True, exist_ok=True)
@@ -13,6 +13,7 @@ They intentionally:
 """
 
 import os
+import resource
 import signal
 import subprocess
 import sys
@@ -51,6 +52,8 @@ class LocalRunnerCallbacks:
 
     on_started: Callable[[subprocess.Popen[bytes]], None] | None = None
     on_finished: Callable[[], None] | None = None
+    # 子进程退出后回传 wait4 的 rusage（judge slot 按此累计 CPU 时间）。
+    on_rusage: Callable[[resource.struct_rusage], None] | None = None
 
 
 @dataclass(frozen=True)
@@ -65,6 +68,33 @@ class LocalRunnerConfig:
     callbacks: LocalRunnerCallbacks = field(default_factory=LocalRunnerCallbacks)
 
 
+def wait_with_rusage(
+    *,
+    process: subprocess.Popen[bytes],
+    on_rusage: Callable[[resource.struct_rusage], None] | None,
+) -> int:
+    """Wait for `process` and report its resource usage.
+
+    Uses `os.wait4` so the rusage belongs to this child only (`RUSAGE_CHILDREN`
+    would mix in runners of other concurrent jobs). Falls back to `Popen.wait`
+    when the child was already reaped elsewhere.
+    """
+
+    if on_rusage is None:
+        return int(process.wait() or 0)
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        return int(process.wait() or 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    try:
+        on_rusage(usage)
+    except Exception:
+        # Accounting must never change the job result.
+        pass
+    return int(process.returncode or 0)
+
+
 def run_local_runner(
     *,
     config: LocalRunnerConfig,
@@ -109,7 +139,7 @@ def run_local_runner(
             max_bytes=config.max_bytes,
             redact_secrets=config.redact_secrets,
         )
-        exit_code = int(process.wait() or 0)
+        exit_code = wait_with_rusage(process=process, on_rusage=config.callbacks.on_rusage)
         return exit_code, process.pid
     finally:
         # Ensure caller hooks run even when streaming/exec fails.
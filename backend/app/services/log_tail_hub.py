@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+# Process-wide log tail hub for MCP subscriptions.
+#
+# 每个被订阅的文件（terminal.log / agent_status.jsonl / test_results.jsonl）只有一个 watcher：
+# - 变化通知：Linux 上用 inotify（ctypes，监听所在目录），否则/失败时退回定时 stat 轮询；
+#   inotify 模式下仍保留低频兜底轮询（bind mount / 网络盘可能丢事件）
+# - 新增字节只读一次，按 (start_offset, bytes) 分发给所有已追上的订阅者
+# - 订阅者从任意 offset 开始：先补读到 watcher 的当前末尾，再接收分发的数据；
+#   积压超过上限（慢客户端）时丢弃内存中的积压，回到补读，不会无限占用内存
+# - 补读与 watcher 读新字节都先查 job_output_buffer 的内存窗口，只有窗口外的 offset 才读盘
+#
+# 所有状态都只在事件循环线程里访问（每个事件循环一个 hub）。
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator
+
+from .job_output_buffer import OUTPUT_BUFFER, read_output
+
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_BYTES = 64 * 1024
+# Backlog per subscriber before it falls back to reading from disk.
+MAX_PENDING_BYTES = 1024 * 1024
+POLL_INTERVAL_S = 0.25
+# With inotify: safety re-stat in case an event was missed.
+INOTIFY_SAFETY_POLL_S = 2.0
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_size(path: Path) -> int:
+    try:
+        return int(path.stat().st_size)
+    except OSError:
+        return 0
+
+
+class Inotify:
+    """Minimal inotify binding (directory watches, non-blocking fd)."""
+
+    def __init__(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.fd = int(fd)
+
+    def add_watch(self, directory: Path) -> int | None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        return int(wd) if wd >= 0 else None
+
+    def rm_watch(self, wd: int) -> None:
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, name_len = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos : pos + name_len].rstrip(b"\0").decode("utf-8", errors="replace")
+            pos += name_len
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def open_inotify() -> Inotify | None:
+    if not hasattr(os, "O_NONBLOCK") or os.environ.get("REALMOI_TAIL_INOTIFY", "1") == "0":
+        return None
+    try:
+        return Inotify()
+    except (OSError, AttributeError) as exc:
+        logger.info("inotify unavailable, log tail falls back to polling: %s", exc)
+        return None
+
+
+class TailSubscription:
+    """One subscriber's cursor; iterate to get `(end_offset, chunk)` in file order."""
+
+    def __init__(self, watch: WatchedFile, offset: int):
+        self._watch = watch
+        self.offset = max(0, int(offset or 0))
+        self._pending: deque[tuple[int, bytes]] = deque()
+        self._pending_bytes = 0
+        self._wake = asyncio.Event()
+        # Read from disk until the watcher's end (initial catch-up, or after falling behind).
+        self._from_disk = True
+
+    def push(self, start: int, chunk: bytes) -> None:
+        if not self._from_disk:
+            if self._pending_bytes + len(chunk) > MAX_PENDING_BYTES:
+                self._pending.clear()
+                self._pending_bytes = 0
+                self._from_disk = True
+            else:
+                self._pending.append((start, chunk))
+                self._pending_bytes += len(chunk)
+        self._wake.set()
+
+    def _read_disk(self) -> bytes:
+        if self.offset >= self._watch.end:
+            self._from_disk = False
+            return b""
+        chunk, _from_memory = read_output(path=self._watch.path, offset=self.offset, max_bytes=READ_CHUNK_BYTES)
+        if not chunk:
+            # Size went backwards (truncate / race): wait for the watcher.
+            self._from_disk = False
+        return chunk
+
+    def _take_pending(self) -> bytes:
+        while self._pending:
+            start, chunk = self._pending.popleft()
+            self._pending_bytes -= len(chunk)
+            end = start + len(chunk)
+            if end <= self.offset:
+                continue
+            if start > self.offset:
+                # Gap (should not happen): fill it from disk.
+                self._pending.appendleft((start, chunk))
+                self._pending_bytes += len(chunk)
+                self._from_disk = True
+                return b""
+            return chunk[self.offset - start :]
+        return b""
+
+    async def next_chunk(self) -> tuple[int, bytes]:
+        while True:
+            chunk = self._read_disk() if self._from_disk else self._take_pending()
+            if chunk:
+                self.offset += len(chunk)
+                return self.offset, chunk
+            if self._from_disk or self._pending:
+                continue
+            self._wake.clear()
+            await self._wake.wait()
+
+    def __aiter__(self) -> TailSubscription:
+        return self
+
+    async def __anext__(self) -> tuple[int, bytes]:
+        return await self.next_chunk()
+
+
+class WatchedFile:
+    def __init__(self, path: Path):
+        self.path = path
+        self.end = file_size(path)
+        self.subscribers: set[TailSubscription] = set()
+        self.changed = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.wd: int | None = None
+
+    def poll_interval(self) -> float:
+        return POLL_INTERVAL_S if self.wd is None else INOTIFY_SAFETY_POLL_S
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.changed.wait(), timeout=self.poll_interval())
+            except asyncio.TimeoutError:
+                pass
+            self.changed.clear()
+            self.read_new_bytes()
+
+    def read_new_bytes(self) -> None:
+        size = file_size(self.path)
+        if size < self.end:
+            # Truncated/recreated: restart from the new end.
+            self.end = size
+            return
+        while self.end < size:
+            chunk, from_memory = read_output(path=self.path, offset=self.end, max_bytes=READ_CHUNK_BYTES)
+            if not chunk:
+                return
+            if not from_memory:
+                # Written by a process that does not feed the buffer (e.g. the runner's agent_status).
+                OUTPUT_BUFFER.record(path=self.path, offset=self.end, data=chunk)
+            start = self.end
+            self.end += len(chunk)
+            for sub in self.subscribers:
+                sub.push(start, chunk)
+
+
+class LogTailHub:
+    """Shared watchers keyed by path; see module comment."""
+
+    def __init__(self) -> None:
+        self._files: dict[Path, WatchedFile] = {}
+        # Opened with the first watcher and closed with the last one (no idle fd per event loop).
+        self._inotify: Inotify | None = None
+        # wd -> watched directory; (wd, file name) resolves to a WatchedFile.
+        self._dir_watches: dict[Path, int] = {}
+        self._wd_dirs: dict[int, Path] = {}
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def watched_paths(self) -> list[Path]:
+        return list(self._files)
+
+    def _on_inotify(self) -> None:
+        assert self._inotify is not None
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                for watched in self._files.values():
+                    watched.changed.set()
+                continue
+            directory = self._wd_dirs.get(wd)
+            watched = self._files.get(directory / name) if directory is not None and name else None
+            if watched is not None:
+                watched.changed.set()
+
+    def _open_inotify(self) -> None:
+        self._inotify = open_inotify()
+        if self._inotify is not None:
+            asyncio.get_running_loop().add_reader(self._inotify.fd, self._on_inotify)
+
+    def _close_inotify(self) -> None:
+        inotify, self._inotify = self._inotify, None
+        self._dir_watches.clear()
+        self._wd_dirs.clear()
+        if inotify is not None:
+            asyncio.get_running_loop().remove_reader(inotify.fd)
+            inotify.close()
+
+    def _watch_dir(self, watched: WatchedFile) -> None:
+        if self._inotify is None:
+            return
+        directory = watched.path.parent
+        wd = self._dir_watches.get(directory)
+        if wd is None:
+            wd = self._inotify.add_watch(directory)
+            if wd is None:
+                return
+            self._dir_watches[directory] = wd
+            self._wd_dirs[wd] = directory
+        watched.wd = wd
+
+    def _unwatch_dir(self, watched: WatchedFile) -> None:
+        wd = watched.wd
+        if self._inotify is None or wd is None:
+            return
+        if any(other.wd == wd for other in self._files.values()):
+            return
+        self._dir_watches.pop(self._wd_dirs.pop(wd), None)
+        try:
+            self._inotify.rm_watch(wd)
+        except OSError:
+            pass
+
+    def _acquire(self, path: Path) -> WatchedFile:
+        watched = self._files.get(path)
+        if watched is None:
+            if not self._files:
+                self._open_inotify()
+            watched = WatchedFile(path)
+            self._files[path] = watched
+            self._watch_dir(watched)
+            watched.task = asyncio.create_task(watched.run())
+        return watched
+
+    def _release(self, watched: WatchedFile, sub: TailSubscription) -> None:
+        watched.subscribers.discard(sub)
+        if watched.subscribers or self._files.get(watched.path) is not watched:
+            return
+        del self._files[watched.path]
+        if watched.task is not None:
+            watched.task.cancel()
+        if self._files:
+            self._unwatch_dir(watched)
+        else:
+            self._close_inotify()
+
+    @asynccontextmanager
+    async def subscribe(self, *, path: Path, offset: int) -> AsyncIterator[TailSubscription]:
+        watched = self._acquire(path)
+        # Pick up anything written before the watcher existed/noticed, then join the fan-out.
+        watched.read_new_bytes()
+        sub = TailSubscription(watched, offset)
+        watched.subscribers.add(sub)
+        try:
+            yield sub
+        finally:
+            self._release(watched, sub)
+
+
+_HUBS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LogTailHub] = weakref.WeakKeyDictionary()
+
+
+def get_log_tail_hub() -> LogTailHub:
+    """Hub of the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    hub = _HUBS.get(loop)
+    if hub is None:
+        hub = LogTailHub()
+        _HUBS[loop] = hub
+    return hub
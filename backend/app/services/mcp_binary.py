@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+# Binary frames on /api/mcp/ws (negotiated through `initialize`).
+#
+# 文本帧仍然是 JSON-RPC 控制通道；双方在 initialize 里都声明 `capabilities.binary_frames` 后，
+# 原始日志字节改走二进制帧，省掉 base64（+33%）与 JSON 转义：
+# - server → user：`terminal` 通知（offset = 这段字节在 terminal.log 中的起始位置）
+# - judge → server：judge.job.append_{terminal,agent_status,test_results,report_outputs}，
+#   request_id 即 JSON-RPC id，服务端按普通 tools/call 结果回一个文本帧
+#
+# 帧格式（大端）：version u8 | stream u8 | job_id_len u16 | claim_id_len u16 | request_id u32 | offset u64
+#                 | job_id utf-8 | claim_id utf-8 | payload
+# 未协商的连接保持原样（chunk_b64）。
+
+import struct
+from dataclasses import dataclass
+from typing import Any
+
+
+FRAME_VERSION = 1
+CAPABILITY = "binary_frames"
+HEADER = struct.Struct(">BBHHIQ")
+
+STREAM_IDS = {"terminal": 1, "agent_status": 2, "test_results": 3, "report_outputs": 4}
+STREAM_NAMES = {stream_id: name for name, stream_id in STREAM_IDS.items()}
+APPEND_TOOLS = {
+    "terminal": "judge.job.append_terminal",
+    "agent_status": "judge.job.append_agent_status",
+    "test_results": "judge.job.append_test_results",
+    "report_outputs": "judge.job.append_report_outputs",
+}
+APPEND_TOOL_STREAMS = {tool: stream for stream, tool in APPEND_TOOLS.items()}
+
+
+@dataclass(frozen=True)
+class BinaryFrame:
+    stream: str
+    job_id: str
+    offset: int
+    payload: bytes
+    claim_id: str = ""
+    request_id: int = 0
+
+
+def encode_frame(
+    *,
+    stream: str,
+    job_id: str,
+    offset: int,
+    payload: bytes,
+    claim_id: str = "",
+    request_id: int = 0,
+) -> bytes:
+    job = job_id.encode("utf-8")
+    claim = claim_id.encode("utf-8")
+    header = HEADER.pack(FRAME_VERSION, STREAM_IDS[stream], len(job), len(claim), int(request_id), int(offset))
+    return b"".join((header, job, claim, payload))
+
+
+def decode_frame(data: bytes) -> BinaryFrame:
+    """Parse a binary frame; raises ValueError on a malformed/unknown frame."""
+    if len(data) < HEADER.size:
+        raise ValueError("short_frame")
+    version, stream_id, job_len, claim_len, request_id, offset = HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise ValueError("unsupported_frame_version")
+    stream = STREAM_NAMES.get(stream_id)
+    if stream is None:
+        raise ValueError("unknown_stream")
+    pos = HEADER.size
+    if len(data) < pos + job_len + claim_len:
+        raise ValueError("short_frame")
+    job_id = data[pos : pos + job_len].decode("utf-8", errors="replace")
+    pos += job_len
+    claim_id = data[pos : pos + claim_len].decode("utf-8", errors="replace")
+    pos += claim_len
+    return BinaryFrame(
+        stream=stream,
+        job_id=job_id,
+        offset=offset,
+        payload=bytes(data[pos:]),
+        claim_id=claim_id,
+        request_id=request_id,
+    )
+
+
+def wants_binary_frames(params: dict[str, Any]) -> bool:
+    capabilities = params.get("capabilities")
+    return isinstance(capabilities, dict) and bool(capabilities.get(CAPABILITY))
+
+
+def binary_frames_capability() -> dict[str, Any]:
+    return {"version": FRAME_VERSION, "streams": dict(STREAM_IDS)}
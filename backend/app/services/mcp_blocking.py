@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+"""Bounded thread pools for blocking MCP tool work.
+
+User MCP tools do blocking work (SQLAlchemy sessions, state/artifact reads, tests.zip extraction in
+`job.create`, synchronous upstream `httpx.get` in live `models.list`), and so do judge tools
+(`save_state` + jobs index upsert, log appends, usage ingest). Running it on the event loop stalls
+every WebSocket in the process, so sessions run it here instead:
+- `io`: disk + database work (`mcp_blocking_workers` threads)
+- `upstream`: calls to upstream model APIs (`mcp_upstream_workers` threads), kept separate so a slow
+  upstream cannot occupy every `io` worker
+
+The REST routes behind these functions are sync FastAPI endpoints (already run in a threadpool), so
+they are safe to call from worker threads.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from ..settings import SETTINGS
+
+
+T = TypeVar("T")
+LANES = ("io", "upstream")
+
+_EXECUTORS: dict[str, ThreadPoolExecutor] = {}
+_LOCK = threading.Lock()
+
+
+def lane_workers(lane: str) -> int:
+    if lane == "upstream":
+        return max(1, int(SETTINGS.mcp_upstream_workers))
+    return max(1, int(SETTINGS.mcp_blocking_workers))
+
+
+def get_executor(lane: str) -> ThreadPoolExecutor:
+    if lane not in LANES:
+        raise ValueError(f"unknown_blocking_lane: {lane}")
+    with _LOCK:
+        executor = _EXECUTORS.get(lane)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=lane_workers(lane), thread_name_prefix=f"mcp-{lane}")
+            _EXECUTORS[lane] = executor
+        return executor
+
+
+async def run_blocking(fn: Callable[..., T], /, *args: Any, lane: str = "io", **kwargs: Any) -> T:
+    """Run `fn(*args, **kwargs)` on the lane's pool; exceptions propagate to the caller."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(lane), functools.partial(fn, *args, **kwargs))
+
@@ -7,6 +7,8 @@ from __future__ import annotations
 # - 该模块实现 judge.* tools（服务端侧），用于 runner/judge 与后端之间的最小协议面。
 # - 所有 tool 都以 job_id 定位 job 目录，并要求 claim_id 匹配以避免并发写冲突。
 # - 返回统一用 JSON-RPC result/error；不把 Python 异常透传为协议崩溃。
+# - 除 claim_next 外的 tool_* 都是同步函数（state.json / jobs 索引 / 日志追加 / SQLAlchemy），
+#   由 tool_call 放到 services/mcp_blocking 线程池执行；judge 会话仍按到达顺序逐个处理。
 
 import asyncio
 import base64
@@ -22,7 +24,13 @@ from ..db import SessionLocal
 from ..models import ModelPricing, UserCodexSettings
 from ..services import singletons
 from ..services.codex_config import build_effective_config
+from ..services import job_queue
+from ..services.job_artifacts import MAX_REPORT_OUTPUTS_BYTES, REPORT_OUTPUTS_NAME
+from ..services.job_output_buffer import OUTPUT_BUFFER
 from ..services.job_paths import JobPaths, get_job_paths
+from ..services.mcp_binary import APPEND_TOOLS, binary_frames_capability, decode_frame, wants_binary_frames
+from ..services.mcp_blocking import run_blocking
+from ..services.job_state import save_state
 from ..services.upstream_channels import resolve_upstream_target
 from ..services.usage_records import ingest_usage_payload
 from ..settings import SETTINGS
@@ -60,6 +68,10 @@ def walk_files(base: Path) -> list[Path]:
     return out
 
 
+# judge.claim_next 长轮询上限：避免 worker 断线后服务端仍长时间挂起等待。
+MAX_CLAIM_WAIT_MS = 30_000
+
+
 def ws_error(*, code: int, message: str) -> dict[str, Any]:
     # JSON-RPC error payload（嵌入到 {"error": ...} 中）
     return {"code": code, "message": message}
@@ -79,6 +91,8 @@ class McpJudgeWebSocketSession:
         self._ws = ws
         # 避免多个并发 task 同时写 ws 导致帧交错。
         self._send_lock = asyncio.Lock()
+        # initialize 协商后，append_* 可以直接发二进制帧（见 mcp_binary）。
+        self.binary_frames = False
 
     async def send_json(self, payload: dict[str, Any]) -> None:
         async with self._send_lock:
@@ -99,6 +113,25 @@ class McpJudgeWebSocketSession:
     async def tool_list(self, *, msg_id: Any) -> None:
         await self.send_result(msg_id=msg_id, result={"tools": JUDGE_TOOLS})
 
+    def negotiate_capabilities(self, params: dict[str, Any]) -> dict[str, Any]:
+        # judge 只上行日志，没有通知可批量；仅协商二进制帧。
+        self.binary_frames = wants_binary_frames(params)
+        return {"binary_frames": binary_frames_capability()} if self.binary_frames else {}
+
+    async def handle_binary(self, data: bytes) -> None:
+        # 二进制帧 = 对应 judge.job.append_* 的 tools/call，chunk 为原始字节（不走 base64）。
+        try:
+            frame = decode_frame(data)
+        except ValueError as exc:
+            # 头部都解析不了，拿不到 request_id：按 JSON-RPC parse error 回 id=null。
+            await self.send_error(msg_id=None, code=-32700, message=str(exc))
+            return
+        await self.tool_call(
+            msg_id=frame.request_id,
+            name=APPEND_TOOLS[frame.stream],
+            arguments={"job_id": frame.job_id, "claim_id": frame.claim_id, "offset": frame.offset, "chunk": frame.payload},
+        )
+
     def get_paths(self, *, job_id: str) -> JobPaths:
         # judge.* tools 都以 job_id 定位 job 目录；不存在时统一按 not_found 处理。
         paths = get_job_paths(jobs_root=Path(SETTINGS.jobs_root), job_id=job_id)
@@ -208,17 +241,41 @@ class McpJudgeWebSocketSession:
             out = chunk[:remaining]
             written_bytes = file_obj.write(out)
             file_obj.flush()
+            OUTPUT_BUFFER.record(path=path, offset=current_offset, data=out)
             return {"ok": True, "next_offset": current_offset + len(out), "written_bytes": int(written_bytes)}
 
     def max_terminal_log_bytes(self, *, state: dict[str, Any]) -> int:
         limits = state.get("resource_limits") or {}
         return int(limits.get("max_terminal_log_bytes") or SETTINGS.default_max_terminal_log_bytes)
 
+    async def claim_with_wait(self, *, job_manager: Any, machine_id: str, wait_ms: int) -> dict[str, str] | None:
+        # 长轮询：先注册唤醒再尝试领取，避免“检查为空 → 入队 → 开始等待”之间丢失通知。
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait_ms / 1000.0
+        while True:
+            event = job_queue.CLAIM_WAITERS.register()
+            try:
+                claimed = await run_blocking(job_manager.claim_next_queued_job, machine_id=machine_id)
+                remaining = deadline - loop.time()
+                if claimed is not None or remaining <= 0:
+                    return claimed
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            finally:
+                job_queue.CLAIM_WAITERS.unregister(event)
+
+    def return_claim(self, *, job_manager: Any, claimed: dict[str, str]) -> None:
+        job_manager.release_judge_claim(job_id=str(claimed["job_id"]), claim_id=str(claimed["claim_id"]))
+        job_manager.requeue_job(job_id=str(claimed["job_id"]))
+
     async def tool_claim_next(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:
         machine_id = str(args.get("machine_id") or "").strip()
         if not machine_id:
             raise ValueError("missing_machine_id")
-        claimed = job_manager.claim_next_queued_job(machine_id=machine_id)
+        wait_ms = min(max(0, int(args.get("wait_ms") or 0)), MAX_CLAIM_WAIT_MS)
+        claimed = await self.claim_with_wait(job_manager=job_manager, machine_id=machine_id, wait_ms=wait_ms)
         if claimed is None:
             payload: dict[str, Any] = {"claimed": False}
         else:
@@ -231,21 +288,29 @@ class McpJudgeWebSocketSession:
                 "owner_user_id": claimed_owner_user_id,
                 "claim_id": claimed_claim_id,
             }
-        await self.send_ok(msg_id=msg_id, structured=payload)
+        try:
+            await self.send_ok(msg_id=msg_id, structured=payload)
+        except Exception:
+            # worker 在等待期间断开：把刚领取的 job 放回队列，而不是等 stale lock 回收。
+            if claimed is not None:
+                await run_blocking(self.return_claim, job_manager=job_manager, claimed=claimed)
+            raise
 
-    async def tool_release_claim(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:
+    # 以下 tool_* 为同步函数：返回 structuredContent，由 tool_call 在线程池执行后统一 send_ok。
+
+    def tool_release_claim(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:
         job_id, claim_id = self.require_job_and_claim(args=args)
         released = job_manager.release_judge_claim(job_id=job_id, claim_id=claim_id)
         if not released:
             raise ToolCallError(code=409, message="claim_mismatch")
-        await self.send_ok(msg_id=msg_id, structured={"released": True})
+        return {"released": True}
 
-    async def tool_job_get_state(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_job_get_state(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         job_id, claim_id = self.require_job_and_claim(args=args)
         _paths, state = self.get_paths_and_state(job_id=job_id, claim_id=claim_id)
-        await self.send_ok(msg_id=msg_id, structured=state)
+        return state
 
-    async def tool_input_list(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_input_list(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, paths, _state = self.require_job_claim_paths_state(args=args)
         base = paths.input_dir
         items: list[dict[str, Any]] = []
@@ -255,9 +320,9 @@ class McpJudgeWebSocketSession:
                 continue
             items.append({"path": rel, "size": stat_size_or_zero(file_path)})
         items.sort(key=lambda x: str(x.get("path") or ""))
-        await self.send_ok(msg_id=msg_id, structured={"items": items})
+        return {"items": items}
 
-    async def tool_input_read_chunk(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_input_read_chunk(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         job_id, claim_id = self.require_job_and_claim(args=args)
         rel_path = str(args.get("path") or "")
         offset = int(args.get("offset") or 0)
@@ -274,15 +339,14 @@ class McpJudgeWebSocketSession:
             next_offset = int(file_obj.tell())
         eof = next_offset >= int(file_path.stat().st_size)
         chunk_b64 = base64.b64encode(chunk).decode("ascii")
-        payload = {
+        return {
             "path": rel_path.replace("\\", "/"),
             "chunk_b64": chunk_b64,
             "next_offset": next_offset,
             "eof": eof,
         }
-        await self.send_ok(msg_id=msg_id, structured=payload)
 
-    async def tool_job_patch_state(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_job_patch_state(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, paths, state = self.require_job_claim_paths_state(args=args)
         patch = args.get("patch")
         if not isinstance(patch, dict):
@@ -292,50 +356,74 @@ class McpJudgeWebSocketSession:
         merged = self.deep_merge(state, cast(dict[str, Any], patch))
         if current_status == "cancelled":
             merged["status"] = "cancelled"
-        write_json(paths.state_json, merged)
-        await self.send_ok(msg_id=msg_id, structured={"ok": True})
+        save_state(paths.state_json, merged)
+        return {"ok": True}
 
-    async def tool_job_append_log(
+    def tool_job_append_log(
         self,
         *,
-        msg_id: Any,
         args: dict[str, Any],
         log_path: Path,
         max_bytes: int,
-    ) -> None:
+    ) -> dict[str, Any]:
         offset = int(args.get("offset") or 0)
-        chunk_b64 = str(args.get("chunk_b64") or "").strip()
-        if not chunk_b64:
-            raise ValueError("missing_chunk_b64")
-        try:
-            chunk = base64.b64decode(chunk_b64.encode("ascii"), validate=True)
-        except (ValueError, binascii.Error):
-            raise ValueError("invalid_base64") from None
+        chunk = args.get("chunk")
+        if not isinstance(chunk, bytes):
+            # JSON 通道：chunk_b64；raw `chunk` 只可能来自二进制帧。
+            chunk = self.decode_chunk_b64(args)
 
-        payload = self.append_with_offset_check(
+        return self.append_with_offset_check(
             path=log_path,
             offset=offset,
             chunk=chunk,
             max_bytes=max_bytes,
         )
-        await self.send_ok(msg_id=msg_id, structured=payload)
 
-    async def tool_job_append_terminal(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def decode_chunk_b64(self, args: dict[str, Any]) -> bytes:
+        chunk_b64 = str(args.get("chunk_b64") or "").strip()
+        if not chunk_b64:
+            raise ValueError("missing_chunk_b64")
+        try:
+            return base64.b64decode(chunk_b64.encode("ascii"), validate=True)
+        except (ValueError, binascii.Error):
+            raise ValueError("invalid_base64") from None
+
+    def tool_job_append_terminal(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, paths, state = self.require_job_claim_paths_state(args=args)
         max_bytes = self.max_terminal_log_bytes(state=state)
-        await self.tool_job_append_log(msg_id=msg_id, args=args, log_path=paths.terminal_log, max_bytes=max_bytes)
+        return self.tool_job_append_log(args=args, log_path=paths.terminal_log, max_bytes=max_bytes)
 
-    async def tool_job_append_agent_status(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_job_append_agent_status(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, paths, state = self.require_job_claim_paths_state(args=args)
         max_bytes = self.max_terminal_log_bytes(state=state)
-        await self.tool_job_append_log(
-            msg_id=msg_id,
+        return self.tool_job_append_log(
             args=args,
             log_path=paths.agent_status_jsonl,
             max_bytes=max_bytes,
         )
 
-    async def tool_job_put_artifacts(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_job_append_test_results(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
+        _job_id, _claim_id, paths, state = self.require_job_claim_paths_state(args=args)
+        max_bytes = self.max_terminal_log_bytes(state=state)
+        return self.tool_job_append_log(
+            args=args,
+            log_path=paths.test_results_jsonl,
+            max_bytes=max_bytes,
+        )
+
+    def tool_job_append_report_outputs(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
+        # report.v2 sidecar（report.outputs.bin）分块上传；offset=0 表示重新开始（覆盖旧内容）。
+        _job_id, _claim_id, paths, _state = self.require_job_claim_paths_state(args=args)
+        outputs_path = paths.output_dir / REPORT_OUTPUTS_NAME
+        if int(args.get("offset") or 0) == 0:
+            outputs_path.unlink(missing_ok=True)
+        return self.tool_job_append_log(
+            args=args,
+            log_path=outputs_path,
+            max_bytes=MAX_REPORT_OUTPUTS_BYTES,
+        )
+
+    def tool_job_put_artifacts(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, paths, state = self.require_job_claim_paths_state(args=args)
         main_cpp = str(args.get("main_cpp") or "")
         solution_json = args.get("solution_json")
@@ -352,9 +440,8 @@ class McpJudgeWebSocketSession:
         if isinstance(report_json, dict):
             write_json(paths.output_dir / "report.json", report_json)
             (state.setdefault("artifacts", {}))["report_json"] = True
-        write_json(paths.state_json, state)
-
-        await self.send_ok(msg_id=msg_id, structured={"ok": True})
+        save_state(paths.state_json, state)
+        return {"ok": True}
 
     def require_owner_user_id(self, *, state: dict[str, Any]) -> str:
         owner_user_id = str(state.get("owner_user_id") or "").strip()
@@ -438,12 +525,11 @@ class McpJudgeWebSocketSession:
             "mock_mode": bool(SETTINGS.mock_mode),
         }
 
-    async def tool_prepare_generate(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_prepare_generate(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         _job_id, _claim_id, _paths, state = self.require_job_claim_paths_state(args=args)
-        payload = self.load_prepare_generate_payload(state=state)
-        await self.send_ok(msg_id=msg_id, structured=payload)
+        return self.load_prepare_generate_payload(state=state)
 
-    async def tool_usage_ingest(self, *, msg_id: Any, args: dict[str, Any], job_manager: Any) -> None:  # noqa: ARG002
+    def tool_usage_ingest(self, *, args: dict[str, Any], job_manager: Any) -> dict[str, Any]:  # noqa: ARG002
         job_id, claim_id = self.require_job_and_claim(args=args)
         attempt = int(args.get("attempt") or 0)
         usage = args.get("usage")
@@ -467,7 +553,7 @@ class McpJudgeWebSocketSession:
             attempt=attempt,
             payload=cast(dict[str, Any], usage),
         )
-        await self.send_ok(msg_id=msg_id, structured={"ok": True})
+        return {"ok": True}
 
     async def tool_call(self, *, msg_id: Any, name: str, arguments: dict[str, Any]) -> None:
         tool = str(name or "")
@@ -479,7 +565,6 @@ class McpJudgeWebSocketSession:
             return
 
         handlers = {
-            "judge.claim_next": self.tool_claim_next,
             "judge.release_claim": self.tool_release_claim,
             "judge.job.get_state": self.tool_job_get_state,
             "judge.input.list": self.tool_input_list,
@@ -487,18 +572,25 @@ class McpJudgeWebSocketSession:
             "judge.job.patch_state": self.tool_job_patch_state,
             "judge.job.append_terminal": self.tool_job_append_terminal,
             "judge.job.append_agent_status": self.tool_job_append_agent_status,
+            "judge.job.append_test_results": self.tool_job_append_test_results,
+            "judge.job.append_report_outputs": self.tool_job_append_report_outputs,
             "judge.job.put_artifacts": self.tool_job_put_artifacts,
             "judge.prepare_generate": self.tool_prepare_generate,
             "judge.usage.ingest": self.tool_usage_ingest,
         }
 
         handler = handlers.get(tool)
-        if handler is None:
+        if handler is None and tool != "judge.claim_next":
             await self.send_error(msg_id=msg_id, code=-32601, message="Tool not found")
             return
 
         try:
-            await handler(msg_id=msg_id, args=args, job_manager=job_manager)
+            if handler is None:
+                # claim_next 是长轮询：自己在等待之间 await 线程池，不整体放进线程池。
+                await self.tool_claim_next(msg_id=msg_id, args=args, job_manager=job_manager)
+                return
+            structured = await run_blocking(handler, args=args, job_manager=job_manager)
+            await self.send_ok(msg_id=msg_id, structured=structured)
         except ToolCallError as e:
             await self.send_error(msg_id=msg_id, code=e.code, message=e.message)
             return
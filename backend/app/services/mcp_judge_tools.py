@@ -32,8 +32,11 @@ def tool_def(*, name: str, description: str, properties: dict[str, Any], require
 JUDGE_TOOLS: list[dict[str, Any]] = [
     tool_def(
         name="judge.claim_next",
-        description="Claim one queued job for independent judge worker.",
-        properties={"machine_id": {"type": "string"}},
+        description=(
+            "Claim one queued job for independent judge worker. "
+            "wait_ms>0 long-polls until a job is enqueued or the wait expires (max 30000)."
+        ),
+        properties={"machine_id": {"type": "string"}, "wait_ms": {"type": "integer"}},
         required=["machine_id"],
     ),
     tool_def(
@@ -94,6 +97,28 @@ JUDGE_TOOLS: list[dict[str, Any]] = [
         },
         required=["job_id", "claim_id", "offset", "chunk_b64"],
     ),
+    tool_def(
+        name="judge.job.append_test_results",
+        description="Append bytes to output/test_results.jsonl with offset check (requires claim_id).",
+        properties={
+            "job_id": {"type": "string"},
+            "claim_id": {"type": "string"},
+            "offset": {"type": "integer"},
+            "chunk_b64": {"type": "string"},
+        },
+        required=["job_id", "claim_id", "offset", "chunk_b64"],
+    ),
+    tool_def(
+        name="judge.job.append_report_outputs",
+        description="Append bytes to output/report.outputs.bin with offset check; offset=0 restarts (requires claim_id).",
+        properties={
+            "job_id": {"type": "string"},
+            "claim_id": {"type": "string"},
+            "offset": {"type": "integer"},
+            "chunk_b64": {"type": "string"},
+        },
+        required=["job_id", "claim_id", "offset", "chunk_b64"],
+    ),
     tool_def(
         name="judge.job.put_artifacts",
         description="Write output artifacts main.cpp/solution.json/report.json (requires claim_id).",
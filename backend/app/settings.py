@@ -45,7 +45,14 @@ class Settings(BaseSettings):
     judge_mode: Literal["embedded", "independent"] = "embedded"
     judge_machine_id: str = ""
     judge_poll_interval_ms: int = 1000
+    # judge.claim_next 长轮询时长；0 表示退回按 poll interval 轮询。
+    judge_claim_wait_ms: int = 25000
+    # 单个 judge daemon 同时执行的 job 数（每个 slot 独立工作区）；可被 `--slots` 覆盖。
+    judge_slots: int = 1
     judge_lock_stale_seconds: int = 120
+    # embedded 模式的阶段线程池：generate 等上游为主可以开大；test 占 CPU，0 表示按 CPU 核数。
+    stage_generate_workers: int = 64
+    stage_test_workers: int = 0
     judge_api_base_url: str = ""
     judge_mcp_token: str = "dev-judge-token-change-me"
     judge_work_root: str = ""
@@ -60,12 +67,24 @@ class Settings(BaseSettings):
 
     default_time_limit_ms: int = 2000
     max_time_limit_ms: int = 15000
+    # TLE 判定：cpu=按 user+sys CPU 时间（墙钟仅作硬上限），wall=按墙钟时间
+    default_time_mode: Literal["cpu", "wall"] = "cpu"
 
     # Output limits
     default_max_output_bytes_per_test: int = 1_048_576  # 1MB
     max_max_output_bytes_per_test: int = 8_388_608  # 8MB
     default_max_terminal_log_bytes: int = 5_242_880  # 5MB
     max_max_terminal_log_bytes: int = 52_428_800  # 50MB
+    # MCP 订阅的内存窗口：每个日志文件保留最近这么多字节，全部文件合计不超过 total（按最近使用淘汰）
+    output_buffer_bytes_per_file: int = 4 * 1024 * 1024  # 4MB, 0 = disabled
+    output_buffer_total_bytes: int = 64 * 1024 * 1024  # 64MB
+    # MCP user 会话出站队列：排队+发送中的字节超过该值时生产者等待，持续超过 stall 秒则断开慢客户端
+    mcp_outbound_max_bytes: int = 8 * 1024 * 1024  # 8MB
+    mcp_outbound_stall_seconds: float = 30.0
+    # MCP 阻塞型工具（DB / 磁盘 / 上游模型列表）的线程池大小，以及单个 user 会话同时处理的请求数
+    mcp_blocking_workers: int = 8
+    mcp_upstream_workers: int = 4
+    mcp_session_max_inflight: int = 8
 
     # tests.zip safety
     tests_max_files: int = 2000
@@ -213,13 +213,14 @@ def append_jsonl(path: Path, line_obj: dict) -> None:
 
 
 def set_job_status(state_path: Path, status: str) -> dict:
-    """Patch `state.json` status field and persist."""
+    """Patch `state.json` status field and persist (via `save_state`, so the jobs index stays in sync)."""
+
+    from backend.app.services.job_state import save_state  # noqa: WPS433
 
     state_text = state_path.read_text(encoding="utf-8")
     state = json.loads(state_text)
     state["status"] = status
-    new_text = json.dumps(state, ensure_ascii=False, indent=2) + "\n"
-    state_path.write_text(new_text, encoding="utf-8")
+    save_state(state_path, state)
     return state
 
 
@@ -9,6 +9,8 @@ import base64
 import json
 from pathlib import Path
 
+from backend.app.services.mcp_binary import encode_frame
+
 from .mcp_ws_common import (
     HTTP_JOB_CREATE_FORM_BASE,
     JUDGE_PUT_ARTIFACTS_ARGS,
@@ -30,6 +32,8 @@ def assert_judge_tools(tool_names: set[str]) -> None:
         "judge.input.read_chunk",
         "judge.job.append_terminal",
         "judge.job.append_agent_status",
+        "judge.job.append_test_results",
+        "judge.job.append_report_outputs",
         "judge.job.put_artifacts",
         "judge.job.patch_state",
         "judge.job.get_state",
@@ -151,6 +155,13 @@ def judge_append_logs_and_patch_state(
     assert mismatch_ok is False
     assert mismatch_code == "offset_mismatch"
 
+    # 二进制帧：raw bytes 走 append_terminal，request_id 作为 JSON-RPC id 回包。
+    ws.send_bytes(encode_frame(stream="terminal", job_id=job_id, claim_id=claim_id, request_id=54, offset=5, payload=b" \xffworld"))
+    binary_resp = ws.receive_json()
+    assert binary_resp.get("id") == 54
+    assert structured_content(binary_resp).get("next_offset") == 12
+    assert terminal_log_path.read_bytes() == b"hello \xffworld"
+
     status_resp = ws_call_tool(
         ws,
         request_id=36,
@@ -161,6 +172,15 @@ def judge_append_logs_and_patch_state(
     status_ok = status_payload.get("ok")
     assert status_ok is True
 
+    results_resp = ws_call_tool(
+        ws,
+        request_id=53,
+        name="judge.job.append_test_results",
+        arguments={"job_id": job_id, "claim_id": claim_id, "offset": 0, "chunk_b64": b64encode_ascii(b'{"verdict":"AC"}\n')},
+    )
+    assert structured_content(results_resp).get("ok") is True
+    assert (jobs_root / job_id / "output" / "test_results.jsonl").read_bytes() == b'{"verdict":"AC"}\n'
+
     patched_resp = ws_call_tool(
         ws,
         request_id=37,
@@ -176,6 +196,18 @@ def judge_append_logs_and_patch_state(
 def judge_put_artifacts_and_ingest_usage(ws, *, job_id: str, claim_id: str, jobs_root: Path, model: str) -> None:
     """Put artifacts + ingest usage for a job and assert output files are written."""
 
+    # report.v2 sidecar is uploaded in chunks; offset=0 restarts an interrupted upload.
+    outputs_path = jobs_root / job_id / "output" / "report.outputs.bin"
+    for request_id, offset, chunk in ((50, 0, b"stale"), (51, 0, b"abc"), (52, 3, b"def")):
+        append_resp = ws_call_tool(
+            ws,
+            request_id=request_id,
+            name="judge.job.append_report_outputs",
+            arguments={"job_id": job_id, "claim_id": claim_id, "offset": offset, "chunk_b64": b64encode_ascii(chunk)},
+        )
+        assert structured_content(append_resp).get("ok") is True
+    assert outputs_path.read_bytes() == b"abcdef"
+
     put_resp = ws_call_tool(
         ws,
         request_id=38,
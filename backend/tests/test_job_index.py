@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+"""SQLite `jobs` index tests (save_state sync, list, claim, rebuild)."""
+
+import json
+import shutil
+from pathlib import Path
+from uuid import uuid4
+
+from backend.app.models import JobIndex
+from backend.app.services import job_index
+from backend.app.services import job_manager as job_manager_module
+from backend.app.services.job_paths import get_job_paths
+from backend.app.services.job_state import load_state, now_iso, save_state
+from backend.app.settings import SETTINGS
+
+
+def _signup_headers(client, username: str) -> tuple[dict[str, str], str]:
+    resp = client.post("/api/auth/signup", json={"username": f"{username}_{uuid4().hex[:8]}", "password": "password123"})
+    assert resp.status_code == 200
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    me = client.get("/api/auth/me", headers=headers)
+    assert me.status_code == 200
+    return headers, str(me.json()["id"])
+
+
+def _write_state(*, job_id: str, owner_user_id: str, status: str) -> Path:
+    paths = get_job_paths(jobs_root=Path(SETTINGS.jobs_root), job_id=job_id)
+    paths.logs_dir.mkdir(parents=True, exist_ok=True)
+    save_state(
+        paths.state_json,
+        {
+            "schema_version": "state.v1",
+            "job_id": job_id,
+            "owner_user_id": owner_user_id,
+            "status": status,
+            "created_at": now_iso(),
+            "finished_at": None,
+            "expires_at": None,
+            "error": None,
+        },
+    )
+    return paths.state_json
+
+
+def _index_row(job_id: str) -> JobIndex | None:
+    from backend.app.db import SessionLocal  # noqa: WPS433
+
+    with SessionLocal() as db:
+        return db.get(JobIndex, job_id)
+
+
+def test_save_state_updates_index_and_list_jobs(client):
+    headers, user_id = _signup_headers(client, "idx")
+    job_id = f"job-idx-{uuid4().hex[:8]}"
+    state_path = _write_state(job_id=job_id, owner_user_id=user_id, status="created")
+
+    row = _index_row(job_id)
+    assert row is not None
+    assert row.status == "created"
+    assert row.owner_user_id == user_id
+
+    state = load_state(state_path)
+    state["status"] = "succeeded"
+    state["finished_at"] = now_iso()
+    save_state(state_path, state)
+    assert _index_row(job_id).status == "succeeded"
+
+    resp = client.get("/api/jobs", headers=headers)
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [x["job_id"] for x in items] == [job_id]
+    assert items[0]["status"] == "succeeded"
+    assert items[0]["finished_at"] == state["finished_at"]
+
+
+def test_save_state_outside_jobs_root_is_not_indexed(tmp_path):
+    job_id = f"job-idx-tmp-{uuid4().hex[:8]}"
+    state_path = tmp_path / job_id / "state.json"
+    state_path.parent.mkdir(parents=True)
+    save_state(state_path, {"job_id": job_id, "owner_user_id": "u1", "status": "queued", "created_at": now_iso()})
+    assert _index_row(job_id) is None
+
+
+def test_claim_skips_stale_index_rows_and_records_claim(client, monkeypatch):  # noqa: ARG001
+    monkeypatch.setattr(SETTINGS, "judge_mode", "independent")
+    jobs_root = Path(SETTINGS.jobs_root)
+    stale_id = f"job-idx-stale-{uuid4().hex[:8]}"
+    live_id = f"job-idx-live-{uuid4().hex[:8]}"
+    stale_path = _write_state(job_id=stale_id, owner_user_id="u1", status="queued")
+    _write_state(job_id=live_id, owner_user_id="u1", status="queued")
+
+    # Out-of-band write: the index still says queued, state.json says cancelled.
+    stale_state = load_state(stale_path)
+    stale_state["status"] = "cancelled"
+    stale_path.write_text(json.dumps(stale_state) + "\n", encoding="utf-8")
+
+    jm = job_manager_module.JobManager(jobs_root=jobs_root)
+    claimed = None
+    while claimed is None or claimed["job_id"] != live_id:
+        claimed = jm.claim_next_queued_job(machine_id="judge-idx")
+        assert claimed is not None
+        if claimed["job_id"] != live_id:
+            # Queued jobs left behind by other tests are older; park them.
+            st = load_state(jobs_root / claimed["job_id"] / "state.json")
+            st["status"] = "cancelled"
+            save_state(jobs_root / claimed["job_id"] / "state.json", st)
+            jm.release_judge_claim(job_id=claimed["job_id"], claim_id=claimed["claim_id"])
+
+    assert _index_row(stale_id).status == "cancelled"
+    live_row = _index_row(live_id)
+    assert live_row.judge_machine_id == "judge-idx"
+    assert live_row.judge_claim_id == claimed["claim_id"]
+    live_path = jobs_root / live_id / "state.json"
+    live_state = load_state(live_path)
+    live_state["status"] = "cancelled"
+    save_state(live_path, live_state)
+    jm.release_judge_claim(job_id=live_id, claim_id=claimed["claim_id"])
+
+
+def test_rebuild_job_index_matches_disk(client):  # noqa: ARG001
+    jobs_root = Path(SETTINGS.jobs_root)
+    kept_id = f"job-idx-kept-{uuid4().hex[:8]}"
+    gone_id = f"job-idx-gone-{uuid4().hex[:8]}"
+    kept_path = _write_state(job_id=kept_id, owner_user_id="u1", status="created")
+    _write_state(job_id=gone_id, owner_user_id="u1", status="created")
+
+    kept_state = load_state(kept_path)
+    kept_state["status"] = "failed"
+    kept_path.write_text(json.dumps(kept_state) + "\n", encoding="utf-8")
+    shutil.rmtree(jobs_root / gone_id)
+
+    count = job_index.rebuild_job_index(jobs_root=jobs_root)
+    assert count == len(list(job_index.iter_state_files(jobs_root=jobs_root)))
+    assert _index_row(kept_id).status == "failed"
+    assert _index_row(gone_id) is None
+
+
+def test_list_jobs_keyset_pagination_and_filters(client):
+    headers, user_id = _signup_headers(client, "page")
+    job_ids = [f"job-page-{i}-{uuid4().hex[:6]}" for i in range(5)]
+    for i, job_id in enumerate(job_ids):
+        _write_state(job_id=job_id, owner_user_id=user_id, status="succeeded" if i % 2 == 0 else "failed")
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"limit": 2}
+    while True:
+        resp = client.get("/api/jobs", headers=headers, params=params)
+        assert resp.status_code == 200
+        body = resp.json()
+        assert len(body["items"]) <= 2
+        assert body["total"] == 5
+        seen.extend(x["job_id"] for x in body["items"])
+        if body["next_before_job_id"] is None:
+            break
+        params = {"limit": 2, "before_created_at": body["next_before_created_at"], "before_job_id": body["next_before_job_id"]}
+    assert seen == list(reversed(job_ids))
+
+    resp = client.get("/api/jobs", headers=headers, params={"status": "succeeded"})
+    assert [x["job_id"] for x in resp.json()["items"]] == [job_ids[4], job_ids[2], job_ids[0]]
+    resp = client.get("/api/jobs", headers=headers, params={"status": "succeeded", "limit": 1})
+    assert resp.json()["total"] == 3
+
+    resp = client.get("/api/jobs", headers=headers, params=[("status", "failed"), ("status", "succeeded"), ("limit", 50)])
+    assert len(resp.json()["items"]) == 5
+
+    created_at = load_state(Path(SETTINGS.jobs_root) / job_ids[2] / "state.json")["created_at"]
+    resp = client.get("/api/jobs", headers=headers, params={"created_after": created_at})
+    assert [x["job_id"] for x in resp.json()["items"]] == [job_ids[4], job_ids[3], job_ids[2]]
+    resp = client.get("/api/jobs", headers=headers, params={"created_before": created_at.replace("+00:00", "Z")})
+    assert [x["job_id"] for x in resp.json()["items"]] == [job_ids[1], job_ids[0]]
+
+    resp = client.get("/api/jobs", headers=headers, params={"created_after": "not-a-date"})
+    assert resp.status_code == 422
+    resp = client.get("/api/jobs", headers=headers, params={"limit": 0})
+    assert resp.status_code == 422
+
+    other_headers, _other_id = _signup_headers(client, "page-other")
+    resp = client.get("/api/jobs", headers=other_headers, params={"owner_user_id": user_id})
+    assert resp.json()["items"] == []
+
+
+def test_cleanup_jobs_script_drops_index_rows(client, monkeypatch):
+    import importlib.util  # noqa: WPS433
+
+    script = Path(__file__).resolve().parents[2] / "scripts" / "cleanup_jobs.py"
+    spec = importlib.util.spec_from_file_location("cleanup_jobs_script", script)
+    cleanup_jobs = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cleanup_jobs)
+
+    headers, user_id = _signup_headers(client, "idx-cleanup")
+    job_id = f"job-idx-{uuid4().hex[:8]}"
+    state_path = _write_state(job_id=job_id, owner_user_id=user_id, status="succeeded")
+    assert _index_row(job_id) is not None
+
+    cleanup_jobs._cleanup_job_dir(state_path.parent, dry_run=False)
+
+    assert not state_path.parent.exists()
+    assert _index_row(job_id) is None
+    listed = client.get("/api/jobs", headers=headers).json()
+    assert job_id not in [item["job_id"] for item in listed["items"]]
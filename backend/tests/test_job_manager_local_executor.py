@@ -17,6 +17,7 @@ import time
 
 from backend.app import db as db_module
 from backend.app.services import job_manager as job_manager_module
+from backend.app.services import job_manager_scheduler
 from backend.app.services.codex_config import build_effective_config
 from backend.app.services.job_paths import get_job_paths
 from backend.app.services.job_state import load_state, now_iso, save_state
@@ -161,7 +162,7 @@ def test_start_job_queues_when_independent_mode(client, monkeypatch, tmp_path):
 
     assert state["status"] == "queued"
     assert saved["status"] == "queued"
-    assert jm._threads == {}
+    assert job_id not in job_manager_scheduler.get_stage_scheduler().inflight()
 
 
 def test_independent_judge_claim_and_release_lock(client, monkeypatch, tmp_path):  # noqa: ARG001
@@ -281,3 +282,48 @@ def test_generate_bundle_provider_avoids_db_access(client, monkeypatch, tmp_path
     jm.run_generate(paths=paths, owner_user_id="u1", attempt=1, prompt_mode="generate")
     state = json.loads(paths.state_json.read_text(encoding="utf-8"))
     assert state["containers"]["generate"]["exit_code"] == 0
+
+
+def test_concurrent_test_stages_get_disjoint_cpusets(client, monkeypatch, tmp_path):  # noqa: ARG001
+    import threading  # noqa: WPS433
+
+    from backend.app.services import cpu_leases  # noqa: WPS433
+
+    set_settings_local(monkeypatch)
+    monkeypatch.setattr(cpu_leases, "_LEASES", cpu_leases.CoreLeases([0, 1, 2, 3]))
+    job_ids = [f"job-cpuset-{i}" for i in range(3)]
+    for job_id in job_ids:
+        state_path = write_job_and_state(jobs_root=tmp_path, job_id=job_id, owner_user_id="u1", model="m") / "state.json"
+        state = load_state(state_path)
+        state["resource_limits"]["cpus"] = 2.0
+        save_state(state_path, state)
+
+    jm = job_manager_module.JobManager(jobs_root=tmp_path)
+    barrier = threading.Barrier(len(job_ids))
+    seen: dict[str, str] = {}
+
+    def fake_run_test_local(*, paths, plan, state):
+        # 三个 test stage 同时在跑：前两个各租到 2 个核心，第三个没有空闲核心则不绑核。
+        state.setdefault("containers", {})["test"] = {"exit_code": None}
+        save_state(paths.state_json, state)
+        seen[paths.root.name] = plan.extra_env[cpu_leases.CPUSET_ENV]
+        barrier.wait(timeout=5)
+        return 0
+
+    monkeypatch.setattr(jm, "run_test_local", fake_run_test_local)
+    threads = [
+        threading.Thread(
+            target=jm.run_test,
+            kwargs={"paths": get_job_paths(jobs_root=tmp_path, job_id=job_id), "owner_user_id": "u1", "attempt": 1},
+        )
+        for job_id in job_ids
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+    leased = [v for v in seen.values() if v != cpu_leases.NO_CPUSET]
+    assert sorted(leased) == ["0,1", "2,3"]
+    assert list(seen.values()).count(cpu_leases.NO_CPUSET) == 1
+    assert cpu_leases.get_core_leases().busy() == []
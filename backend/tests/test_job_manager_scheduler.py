@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+"""Stage scheduler tests (generate/test pools, hand-off between stages, retries)."""
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from backend.app.services import job_manager_scheduler
+from backend.app.services.job_paths import get_job_paths
+from backend.app.services.job_state import load_state, now_iso, save_state
+from backend.app.settings import SETTINGS
+
+
+class _FakeManager:
+    # Records stage concurrency; `fail_first_test` jobs need one repair attempt.
+    def __init__(self, *, fail_first_test: set[str]):
+        self._fail_first_test = fail_first_test
+        self._lock = threading.Lock()
+        self.generate_running = 0
+        self.test_running = 0
+        self.max_generate = 0
+        self.max_test = 0
+        self.calls: list[tuple[str, str, int]] = []
+
+    def run_generate(self, *, paths, owner_user_id, attempt, prompt_mode):  # noqa: ARG002
+        with self._lock:
+            self.generate_running += 1
+            self.max_generate = max(self.max_generate, self.generate_running)
+            self.calls.append((paths.root.name, prompt_mode, attempt))
+        time.sleep(0.05)
+        with self._lock:
+            self.generate_running -= 1
+
+    def run_test(self, *, paths, owner_user_id, attempt):  # noqa: ARG002
+        with self._lock:
+            self.test_running += 1
+            self.max_test = max(self.max_test, self.test_running)
+        time.sleep(0.02)
+        ok = not (paths.root.name in self._fail_first_test and attempt == 1)
+        paths.output_dir.mkdir(parents=True, exist_ok=True)
+        (paths.output_dir / "report.json").write_text(json.dumps({"status": "succeeded" if ok else "failed"}), encoding="utf-8")
+        with self._lock:
+            self.test_running -= 1
+
+    def finalize_success(self, *, paths):
+        state = load_state(paths.state_json)
+        state["status"] = "succeeded"
+        save_state(paths.state_json, state)
+
+
+def _write_running_state(*, jobs_root: Path, job_id: str) -> Path:
+    paths = get_job_paths(jobs_root=jobs_root, job_id=job_id)
+    paths.logs_dir.mkdir(parents=True, exist_ok=True)
+    save_state(paths.state_json, {"job_id": job_id, "owner_user_id": "u1", "status": "running_generate", "created_at": now_iso()})
+    return paths.state_json
+
+
+def _wait_idle(scheduler: job_manager_scheduler.StageScheduler, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while scheduler.inflight():
+        assert time.monotonic() < deadline, scheduler.stats()
+        time.sleep(0.01)
+
+
+def test_scheduler_bounds_test_pool_and_retries_through_generate_pool(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "quality_max_retries", 1)
+    job_ids = [f"job-sched-{i}" for i in range(6)]
+    state_paths = [_write_running_state(jobs_root=tmp_path, job_id=job_id) for job_id in job_ids]
+    manager = _FakeManager(fail_first_test={job_ids[0]})
+    scheduler = job_manager_scheduler.StageScheduler(generate_workers=6, test_workers=1)
+
+    for job_id in job_ids:
+        scheduler.submit_job(manager=manager, jobs_root=tmp_path, job_id=job_id, owner_user_id="u1")
+    _wait_idle(scheduler)
+
+    assert manager.max_generate > 1
+    assert manager.max_test == 1
+    assert all(load_state(p)["status"] == "succeeded" for p in state_paths)
+    assert [c for c in manager.calls if c[0] == job_ids[0]] == [(job_ids[0], "generate", 1), (job_ids[0], "repair", 2)]
+    assert scheduler.stats()["test"]["threads"] == 1
+
+
+def test_scheduler_marks_failed_and_skips_cancelled(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(SETTINGS, "quality_max_retries", 0)
+    failing = _write_running_state(jobs_root=tmp_path, job_id="job-sched-fail")
+    cancelled = _write_running_state(jobs_root=tmp_path, job_id="job-sched-cancelled")
+    state = load_state(cancelled)
+    state["status"] = "cancelled"
+    save_state(cancelled, state)
+
+    manager = _FakeManager(fail_first_test={"job-sched-fail"})
+    scheduler = job_manager_scheduler.StageScheduler(generate_workers=2, test_workers=1)
+    scheduler.submit_job(manager=manager, jobs_root=tmp_path, job_id="job-sched-fail", owner_user_id="u1")
+    scheduler.submit_job(manager=manager, jobs_root=tmp_path, job_id="job-sched-cancelled", owner_user_id="u1")
+    _wait_idle(scheduler)
+
+    failed_state = load_state(failing)
+    assert failed_state["status"] == "failed"
+    assert failed_state["error"]["message"] == "quality_retries_exhausted"
+    assert load_state(cancelled)["status"] == "cancelled"
+    assert [c[0] for c in manager.calls] == ["job-sched-fail"]
+
+
+def test_resolve_test_workers_defaults_to_cpu_count():
+    assert job_manager_scheduler.resolve_test_workers(3) == 3
+    assert job_manager_scheduler.resolve_test_workers(0) >= 1
+    assert job_manager_scheduler.resolve_test_workers("bad") >= 1
+
+
+def test_admin_scheduler_endpoint(client, monkeypatch):
+    scheduler = job_manager_scheduler.StageScheduler(generate_workers=3, test_workers=2)
+    monkeypatch.setattr(job_manager_scheduler, "_SCHEDULER", scheduler)
+    monkeypatch.setattr(scheduler, "_inflight", {"job-admin-sched": "test"})
+
+    resp = client.post("/api/auth/login", json={"username": "admin", "password": "admin-password-123"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    resp = client.get("/api/admin/scheduler", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["generate"] == {"workers": 3, "threads": 0, "busy": 0, "queued": 0}
+    assert body["test"]["workers"] == 2
+    assert body["jobs"] == 1
+    assert body["inflight"] == {"job-admin-sched": "test"}
+    assert client.get("/api/admin/scheduler").status_code == 401
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+"""In-memory output window tests (trim/overwrite/eviction, tail subscriptions served from memory)."""
+
+import asyncio
+
+from backend.app.services import job_output_buffer
+from backend.app.services._terminal_log import stream_terminal_log
+from backend.app.services.job_output_buffer import JobOutputBuffer, read_output
+from backend.app.services.log_tail_hub import LogTailHub
+
+
+def test_window_trims_overwrites_and_evicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_output_buffer.SETTINGS, "output_buffer_bytes_per_file", 8)
+    monkeypatch.setattr(job_output_buffer.SETTINGS, "output_buffer_total_bytes", 16)
+    buf = JobOutputBuffer()
+    a = tmp_path / "a" / "terminal.log"
+    b = tmp_path / "b" / "terminal.log"
+
+    buf.record(path=a, offset=0, data=b"0123456789ab")
+    assert buf.window(a) == (4, 12)
+    assert buf.read(path=a, offset=1, max_bytes=4) is None
+    assert buf.read(path=a, offset=4, max_bytes=4) == b"4567"
+    assert buf.read(path=a, offset=12, max_bytes=4) is None
+
+    # Truncate-and-rewrite from inside the window; a gap starts a new window.
+    buf.record(path=a, offset=8, data=b"xy")
+    assert buf.read(path=a, offset=6, max_bytes=8) == b"67xy"
+    buf.record(path=a, offset=20, data=b"z")
+    assert buf.window(a) == (20, 21)
+
+    # Unbuffered names are ignored; over the total budget the least recently used file goes.
+    buf.record(path=tmp_path / "report.outputs.bin", offset=0, data=b"ignored")
+    buf.record(path=b, offset=0, data=b"b" * 8)
+    buf.record(path=tmp_path / "c" / "agent_status.jsonl", offset=0, data=b"c" * 8)
+    assert buf.window(a) is None
+    assert buf.total_bytes == 16
+
+
+def test_writer_fed_window_serves_tail_catch_up(tmp_path):
+    log_path = tmp_path / "logs" / "terminal.log"
+    log_path.parent.mkdir()
+    log_path.write_bytes(b"old attempt\n")
+
+    class Stdout:
+        def __init__(self) -> None:
+            self._chunks = [b"line 1\n", b"line 2\n"]
+
+        def read(self, _n: int) -> bytes:
+            return self._chunks.pop(0) if self._chunks else b""
+
+    assert stream_terminal_log(stdout=Stdout(), log_path=log_path, max_bytes=1024, redact_secrets=[]) == 14
+    assert job_output_buffer.OUTPUT_BUFFER.window(log_path) == (12, 26)
+    assert read_output(path=log_path, offset=12, max_bytes=64) == (b"line 1\nline 2\n", True)
+    assert read_output(path=log_path, offset=0, max_bytes=4) == (b"old ", False)
+
+    async def scenario() -> None:
+        hub = LogTailHub()
+        async with hub.subscribe(path=log_path, offset=0) as tail:
+            data = b""
+            while len(data) < 26:
+                _offset, chunk = await asyncio.wait_for(tail.next_chunk(), timeout=3.0)
+                data += chunk
+            assert data == b"old attempt\nline 1\nline 2\n"
+
+    asyncio.run(scenario())
+    job_output_buffer.OUTPUT_BUFFER.forget(log_path)
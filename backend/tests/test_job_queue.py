@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+"""Independent judge FIFO queue tests (push on start, O(1) pop on claim, orphan sweep)."""
+
+from pathlib import Path
+from uuid import uuid4
+
+from backend.app.services import job_manager as job_manager_module
+from backend.app.services import job_queue
+from backend.app.services.job_paths import get_job_paths
+from backend.app.services.job_state import load_state, now_iso, save_state
+from backend.app.settings import SETTINGS
+
+
+def _write_created_job(*, jobs_root: Path, job_id: str) -> Path:
+    paths = get_job_paths(jobs_root=jobs_root, job_id=job_id)
+    paths.logs_dir.mkdir(parents=True, exist_ok=True)
+    save_state(
+        paths.state_json,
+        {
+            "schema_version": "state.v1",
+            "job_id": job_id,
+            "owner_user_id": "u1",
+            "status": "created",
+            "created_at": now_iso(),
+            "started_at": None,
+            "finished_at": None,
+            "expires_at": None,
+            "error": None,
+        },
+    )
+    return paths.state_json
+
+
+def _set_status(state_path: Path, status: str) -> None:
+    state = load_state(state_path)
+    state["status"] = status
+    save_state(state_path, state)
+
+
+def _drain_queue() -> None:
+    while job_queue.pop() is not None:
+        pass
+
+
+def test_claims_follow_start_order_and_skip_cancelled(client, monkeypatch):  # noqa: ARG001
+    monkeypatch.setattr(SETTINGS, "judge_mode", "independent")
+    jobs_root = Path(SETTINGS.jobs_root)
+    _drain_queue()
+
+    # Created in one order, started in another: the queue follows start order.
+    job_ids = [f"job-q-{i}-{uuid4().hex[:6]}" for i in range(3)]
+    state_paths = {job_id: _write_created_job(jobs_root=jobs_root, job_id=job_id) for job_id in job_ids}
+    jm = job_manager_module.JobManager(jobs_root=jobs_root)
+    for job_id in (job_ids[2], job_ids[0], job_ids[1]):
+        jm.start_job(job_id=job_id, owner_user_id="u1")
+    assert job_queue.depth() == 3
+
+    jm.cancel_job(job_id=job_ids[0])
+    assert job_queue.depth() == 2
+    assert job_queue.contains(job_ids=job_ids) == {job_ids[1], job_ids[2]}
+
+    first = jm.claim_next_queued_job(machine_id="judge-q")
+    second = jm.claim_next_queued_job(machine_id="judge-q")
+    assert first is not None and first["job_id"] == job_ids[2]
+    assert second is not None and second["job_id"] == job_ids[1]
+    assert job_queue.depth() == 0
+    assert jm.claim_next_queued_job(machine_id="judge-q") is None
+
+    for claimed in (first, second):
+        _set_status(state_paths[claimed["job_id"]], "cancelled")
+        assert jm.release_judge_claim(job_id=claimed["job_id"], claim_id=claimed["claim_id"]) is True
+
+
+def test_empty_queue_sweeps_queued_jobs_missing_from_queue(client, monkeypatch):  # noqa: ARG001
+    monkeypatch.setattr(SETTINGS, "judge_mode", "independent")
+    jobs_root = Path(SETTINGS.jobs_root)
+    _drain_queue()
+
+    # Queued without going through start_job (crash between save and push, pre-queue data, ...).
+    job_id = f"job-q-orphan-{uuid4().hex[:6]}"
+    state_path = _write_created_job(jobs_root=jobs_root, job_id=job_id)
+    _set_status(state_path, "queued")
+    assert job_queue.depth() == 0
+
+    jm = job_manager_module.JobManager(jobs_root=jobs_root)
+    claimed = jm.claim_next_queued_job(machine_id="judge-q")
+    assert claimed is not None and claimed["job_id"] == job_id
+
+    # A fresh judge.lock keeps the claimed job out of later sweeps.
+    assert jm.claim_next_queued_job(machine_id="judge-q") is None
+
+    _set_status(state_path, "cancelled")
+    assert jm.release_judge_claim(job_id=job_id, claim_id=claimed["claim_id"]) is True
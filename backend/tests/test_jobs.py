@@ -91,6 +91,8 @@ def test_create_job_with_tests_zip(client):
     job_json = (jobs_root / job_id / "input" / "job.json").read_text(encoding="utf-8")
     assert '"present": true' in job_json
     assert '"reasoning_effort": "high"' in job_json
+    assert '"fail_fast": true' in job_json
+    assert '"early_wa": false' in job_json
     state_json = (jobs_root / job_id / "state.json").read_text(encoding="utf-8")
     assert '"reasoning_effort": "high"' in state_json
 
@@ -21,3 +21,44 @@ def test_ensure_connected_catches_unexpected_connect_errors(monkeypatch: pytest.
 
     assert attempted == ["ws://a.example/api/mcp/ws", "ws://b.example/api/mcp/ws"]
 
+
+
+@pytest.mark.parametrize("server_binary", [True, False])
+def test_append_chunk_uses_binary_frames_only_when_negotiated(monkeypatch: pytest.MonkeyPatch, server_binary: bool) -> None:
+    import base64
+    import json
+
+    from backend.app.services import judge_mcp_client as mod
+    from backend.app.services.mcp_binary import binary_frames_capability, decode_frame
+
+    sent: list[object] = []
+
+    class FakeWs:
+        def send(self, data: object) -> None:
+            sent.append(data)
+
+        def recv(self) -> str:
+            last = sent[-1]
+            if isinstance(last, bytes):
+                msg_id = decode_frame(last).request_id
+                return json.dumps({"jsonrpc": "2.0", "id": msg_id, "result": {"structuredContent": {"ok": True}}})
+            req = json.loads(str(last))
+            caps = {"tools": {}}
+            if req["method"] == "initialize" and server_binary:
+                caps["binary_frames"] = binary_frames_capability()
+            return json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": {"capabilities": caps}})
+
+        def close(self) -> None:
+            return None
+
+    monkeypatch.setattr(mod, "connect", lambda url, open_timeout=0: FakeWs())  # noqa: ARG005
+    client = mod.McpJudgeClient(ws_urls=["ws://a.example/api/mcp/ws"])
+    client.append_chunk(name="judge.job.append_terminal", job_id="j1", claim_id="c1", offset=7, chunk=b"\x00raw")
+
+    assert json.loads(str(sent[0]))["params"] == {"capabilities": {"binary_frames": True}}
+    if server_binary:
+        frame = decode_frame(sent[1])
+        assert (frame.stream, frame.job_id, frame.claim_id, frame.offset, frame.payload) == ("terminal", "j1", "c1", 7, b"\x00raw")
+    else:
+        args = json.loads(str(sent[1]))["params"]["arguments"]
+        assert args["chunk_b64"] == base64.b64encode(b"\x00raw").decode("ascii")
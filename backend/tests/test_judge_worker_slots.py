@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+"""Multi-slot judge worker tests (slot dispatch, per-slot workspace, CPU accounting)."""
+
+import threading
+from pathlib import Path
+
+from backend.app.services import judge_worker
+from backend.app.services.judge_worker_slots import SlotCpuAccount, SlotPool, build_slots, resolve_slot_count
+from backend.app.services.local_runner import LocalRunnerCallbacks, LocalRunnerConfig, run_local_runner
+
+
+class _FakeClaimClient:
+    def __init__(self, job_ids: list[str]):
+        self._job_ids = list(job_ids)
+        self._lock = threading.Lock()
+
+    def call_tool(self, *, name: str, arguments: dict) -> dict:
+        assert name == "judge.claim_next"
+        with self._lock:
+            if not self._job_ids:
+                return {"structuredContent": {"claimed": False}}
+            job_id = self._job_ids.pop(0)
+        return {"structuredContent": {"claimed": True, "job_id": job_id, "owner_user_id": "u1", "claim_id": f"c-{job_id}"}}
+
+
+class _FakeJobClient:
+    def __init__(self):
+        self.released: list[str] = []
+        self._lock = threading.Lock()
+
+    def call_tool(self, *, name: str, arguments: dict) -> dict:
+        assert name == "judge.release_claim"
+        with self._lock:
+            self.released.append(arguments["job_id"])
+        return {}
+
+
+def test_resolve_slot_count_clamps_invalid_values():
+    assert resolve_slot_count(None) == 1
+    assert resolve_slot_count(0) == 1
+    assert resolve_slot_count("3") == 3
+    assert resolve_slot_count("x") == 1
+
+
+def test_dispatch_runs_claimed_jobs_concurrently_in_slot_workspaces(tmp_path: Path, monkeypatch):
+    # Both jobs must be in flight at once for the barrier to open.
+    barrier = threading.Barrier(2, timeout=10)
+    seen: dict[str, Path] = {}
+    done = threading.Event()
+
+    def fake_run_claimed_job(*, client, work_root, job_id, owner_user_id, claim_id, rusage_reporter=None):  # noqa: ARG001
+        seen[job_id] = work_root
+        barrier.wait()
+        if rusage_reporter is not None:
+            rusage_reporter(type("Usage", (), {"ru_utime": 0.25, "ru_stime": 0.05})())
+        if len(seen) == 2:
+            done.set()
+
+    monkeypatch.setattr(judge_worker, "run_claimed_job", fake_run_claimed_job)
+
+    slots = build_slots(work_root=tmp_path, count=2)
+    pool = SlotPool(slots)
+    job_client = _FakeJobClient()
+    stop = threading.Event()
+    loop = threading.Thread(
+        target=judge_worker.run_dispatch_loop,
+        kwargs={
+            "claim_client": _FakeClaimClient(["job-a", "job-b"]),
+            "job_client": job_client,
+            "pool": pool,
+            "machine_id": "judge-slots",
+            "wait_ms": 0,
+            "interval": 0.05,
+            "stop": stop,
+        },
+        daemon=True,
+    )
+    loop.start()
+    assert done.wait(10)
+    stop.set()
+    loop.join(10)
+    assert not loop.is_alive()
+
+    assert sorted(seen) == ["job-a", "job-b"]
+    assert {seen["job-a"], seen["job-b"]} == {tmp_path / "slot-0", tmp_path / "slot-1"}
+    assert sorted(job_client.released) == ["job-a", "job-b"]
+    assert pool.free_count() == 2
+    assert [round(slot.cpu.total_s(), 3) for slot in slots] == [0.3, 0.3]
+
+
+def test_local_runner_reports_child_cpu_usage(tmp_path: Path):
+    script = tmp_path / "burn.py"
+    script.write_text(
+        "import time\n"
+        "end = time.process_time() + 0.2\n"
+        "while time.process_time() < end:\n"
+        "    pass\n"
+        "raise SystemExit(3)\n",
+        encoding="utf-8",
+    )
+    account = SlotCpuAccount()
+    exit_code, pid = run_local_runner(
+        config=LocalRunnerConfig(
+            script_path=script,
+            env={},
+            log_path=tmp_path / "terminal.log",
+            max_bytes=4096,
+            redact_secrets=[],
+            callbacks=LocalRunnerCallbacks(on_rusage=account.add_rusage),
+        )
+    )
+    assert exit_code == 3
+    assert pid > 0
+    assert account.processes == 1
+    assert account.total_s() >= 0.15
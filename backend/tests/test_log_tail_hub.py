@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+"""Shared log tail hub tests (fan-out, catch-up from offset, polling fallback, slow subscribers)."""
+
+import asyncio
+import time
+
+from backend.app.services import log_tail_hub
+from backend.app.services.log_tail_hub import LogTailHub
+
+
+async def _collect(tail, *, until: int, timeout: float = 3.0) -> bytes:
+    data = b""
+    while len(data) < until:
+        _offset, chunk = await asyncio.wait_for(tail.next_chunk(), timeout=timeout)
+        data += chunk
+    return data
+
+
+def test_one_watcher_fans_out_to_subscribers_from_their_offsets(tmp_path):
+    path = tmp_path / "logs" / "terminal.log"
+    path.parent.mkdir()
+    path.write_bytes(b"hello ")
+
+    async def scenario() -> None:
+        hub = LogTailHub()
+        async with hub.subscribe(path=path, offset=0) as first, hub.subscribe(path=path, offset=3) as second:
+            assert hub.watched_paths() == [path]
+            assert await _collect(first, until=6) == b"hello "
+            assert await _collect(second, until=3) == b"lo "
+
+            started = time.monotonic()
+            with path.open("ab") as fp:
+                fp.write(b"world")
+            assert await _collect(first, until=5) == b"world"
+            assert await _collect(second, until=5) == b"world"
+            if hub.uses_inotify:
+                # Woken by inotify, not by the safety poll.
+                assert time.monotonic() - started < log_tail_hub.INOTIFY_SAFETY_POLL_S / 2
+            assert first.offset == second.offset == 11
+        assert hub.watched_paths() == []
+
+    asyncio.run(scenario())
+
+
+def test_polling_fallback_and_file_created_after_subscribe(tmp_path, monkeypatch):
+    monkeypatch.setenv("REALMOI_TAIL_INOTIFY", "0")
+    path = tmp_path / "agent_status.jsonl"
+
+    async def scenario() -> None:
+        hub = LogTailHub()
+        assert hub.uses_inotify is False
+        async with hub.subscribe(path=path, offset=0) as tail:
+            path.write_bytes(b'{"stage":"coding"}\n')
+            offset, chunk = await asyncio.wait_for(tail.next_chunk(), timeout=3.0)
+            assert (offset, chunk) == (19, b'{"stage":"coding"}\n')
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_falls_back_to_disk_without_losing_bytes(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_tail_hub, "MAX_PENDING_BYTES", 16)
+    path = tmp_path / "terminal.log"
+    path.write_bytes(b"")
+    payload = bytes(range(256)) * 4
+
+    async def scenario() -> None:
+        hub = LogTailHub()
+        async with hub.subscribe(path=path, offset=0) as tail:
+            for i in range(0, len(payload), 64):
+                with path.open("ab") as fp:
+                    fp.write(payload[i : i + 64])
+                await asyncio.sleep(0.01)
+            assert await _collect(tail, until=len(payload)) == payload
+
+    asyncio.run(scenario())
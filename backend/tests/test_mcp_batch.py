@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+"""notifications/batch coalescing tests (timer flush, size flush, terminal merge, negotiation)."""
+
+import asyncio
+import base64
+import json
+import logging
+
+from backend.app.routers._mcp_batch import BATCH_METHOD, BatchConfig, negotiate_batch_config
+from backend.app.routers._mcp_outbound import OutboundQueue
+from backend.app.services.mcp_binary import decode_frame
+
+
+class _Batcher:
+    # Thin adapter: notifications/batch coalescing lives in the session's outbound queue.
+    def __init__(self, queue: OutboundQueue):
+        self.queue = queue
+
+    async def add(self, *, method: str, params: dict, size_hint: int = 256) -> None:
+        payload = {"jsonrpc": "2.0", "method": method, "params": params}
+        await self.queue.put_notification(payload=payload, size=size_hint)
+
+    async def add_terminal(self, *, job_id: str, end_offset: int, chunk: bytes) -> None:
+        await self.queue.put_terminal(job_id=job_id, end_offset=end_offset, chunk=chunk)
+
+
+def _batcher(*, config: BatchConfig, binary_terminal: bool = False) -> tuple[_Batcher, list]:
+    sent: list = []
+
+    async def send_text(data: str) -> None:
+        sent.append(json.loads(data))
+
+    async def send_bytes(data: bytes) -> None:
+        sent.append(data)
+
+    queue = OutboundQueue(
+        send_text=send_text,
+        send_bytes=send_bytes,
+        on_stall=lambda: None,
+        logger=logging.getLogger(__name__),
+    )
+    queue.configure(batch=config, binary_terminal=binary_terminal)
+    return _Batcher(queue), sent
+
+
+def test_negotiate_batch_config_clamps_client_values():
+    assert negotiate_batch_config({}) is None
+    assert negotiate_batch_config({"capabilities": {"notification_batch": True}}) == BatchConfig()
+    config = negotiate_batch_config({"capabilities": {"notification_batch": {"max_delay_ms": 10_000, "max_bytes": "x"}}})
+    assert config == BatchConfig(max_delay_ms=250, max_bytes=64 * 1024)
+
+
+def test_timer_flush_coalesces_items_and_merges_terminal_chunks():
+    async def scenario() -> list:
+        batcher, sent = _batcher(config=BatchConfig(max_delay_ms=20))
+        for i in range(3):
+            await batcher.add(method="agent_status", params={"job_id": "j", "offset": i, "item": {"i": i}})
+        await batcher.add_terminal(job_id="j", end_offset=3, chunk=b"abc")
+        await batcher.add_terminal(job_id="j", end_offset=5, chunk=b"de")
+        assert sent == []
+        await asyncio.sleep(0.1)
+        # A lone notification is sent unwrapped.
+        await batcher.add(method="test_results", params={"job_id": "j"})
+        await asyncio.sleep(0.1)
+        return sent
+
+    sent = asyncio.run(scenario())
+    assert len(sent) == 2
+    batch, single = sent
+    assert batch["method"] == BATCH_METHOD
+    items = batch["params"]["items"]
+    assert [item["method"] for item in items] == ["agent_status"] * 3 + ["terminal"]
+    assert items[3]["params"]["offset"] == 5
+    assert base64.b64decode(items[3]["params"]["chunk_b64"]) == b"abcde"
+    assert single["method"] == "test_results"
+
+
+def test_size_threshold_flushes_immediately_and_binary_terminal_stays_binary():
+    async def scenario() -> list:
+        batcher, sent = _batcher(config=BatchConfig(max_delay_ms=250, max_bytes=1024), binary_terminal=True)
+        await batcher.add(method="agent_status", params={"job_id": "j"}, size_hint=10)
+        await batcher.add_terminal(job_id="j", end_offset=600, chunk=b"x" * 600)
+        await batcher.add_terminal(job_id="j", end_offset=1200, chunk=b"y" * 600)
+        await asyncio.sleep(0.01)
+        return list(sent)
+
+    sent = asyncio.run(scenario())
+    assert sent[0]["method"] == "agent_status"
+    frame = decode_frame(sent[1])
+    assert (frame.stream, frame.offset, frame.payload) == ("terminal", 0, b"x" * 600 + b"y" * 600)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+"""MCP user session outbound queue tests (merge while blocked, supersede, stall disconnect)."""
+
+import asyncio
+import base64
+import json
+import logging
+
+from backend.app.routers import _mcp_outbound
+from backend.app.routers._mcp_outbound import OutboundQueue, outbound_stats
+from backend.app.routers.mcp import progress_key
+
+
+def _queue(*, gate: asyncio.Event, sent: list, stalls: list) -> OutboundQueue:
+    async def send_text(data: str) -> None:
+        await gate.wait()
+        sent.append(json.loads(data))
+
+    async def send_bytes(data: bytes) -> None:
+        await gate.wait()
+        sent.append(data)
+
+    return OutboundQueue(
+        send_text=send_text,
+        send_bytes=send_bytes,
+        on_stall=lambda: stalls.append(True),
+        logger=logging.getLogger(__name__),
+        label="u1",
+    )
+
+
+def _progress(job_id: str, progress: int) -> dict:
+    item = {"stage": "coding", "summary": f"{progress}%", "progress": progress}
+    return {"jsonrpc": "2.0", "method": "agent_status", "params": {"job_id": job_id, "item": item}}
+
+
+def test_slow_client_gets_merged_terminal_and_latest_progress_only():
+    async def scenario() -> tuple[list, dict]:
+        gate, sent, stalls = asyncio.Event(), [], []
+        queue = _queue(gate=gate, sent=sent, stalls=stalls)
+        await queue.put_frame(json.dumps({"jsonrpc": "2.0", "id": 1, "result": {}}))
+        await asyncio.sleep(0)  # writer is now blocked sending the response
+        for i in range(1, 4):
+            await queue.put_terminal(job_id="j", end_offset=i * 2, chunk=b"%02d" % i)
+        key = progress_key(method="agent_status", job_id="j", item=_progress("j", 0)["params"]["item"])
+        for progress in (10, 20, 30):
+            await queue.put_notification(payload=_progress("j", progress), size=40, key=key)
+        await queue.put_frame(json.dumps({"jsonrpc": "2.0", "id": 2, "result": {}}))
+        stats = queue.stats()
+        gate.set()
+        await asyncio.sleep(0.01)
+        await queue.close()
+        return sent, stats
+
+    sent, stats = asyncio.run(scenario())
+    assert (stats["depth"], stats["merged"], stats["dropped"]) == (3, 2, 2)
+    assert [msg.get("id") or msg["method"] for msg in sent] == [1, "terminal", "agent_status", 2]
+    assert base64.b64decode(sent[1]["params"]["chunk_b64"]) == b"010203"
+    assert sent[1]["params"]["offset"] == 6
+    assert sent[2]["params"]["item"]["progress"] == 30
+
+
+def test_progress_key_only_matches_progress_updates():
+    assert progress_key(method="agent_status", job_id="j", item={"stage": "done", "progress": None}) is None
+    assert progress_key(method="agent_status", job_id="j", item={"kind": "x", "delta": "d", "progress": 1}) is None
+    assert progress_key(method="test_results", job_id="j", item={"progress": 1}) is None
+    assert progress_key(method="agent_status", job_id="j", item={"progress": 1}) == ("agent_status_progress", "j")
+
+
+def test_queue_over_watermark_past_stall_timeout_disconnects(monkeypatch):
+    monkeypatch.setattr(_mcp_outbound.SETTINGS, "mcp_outbound_max_bytes", 16)
+    monkeypatch.setattr(_mcp_outbound.SETTINGS, "mcp_outbound_stall_seconds", 0.05)
+
+    async def scenario() -> tuple[bool, list, dict]:
+        gate, sent, stalls = asyncio.Event(), [], []
+        queue = _queue(gate=gate, sent=sent, stalls=stalls)
+        await queue.put_terminal(job_id="j", end_offset=32, chunk=b"x" * 32)
+        stats = outbound_stats()
+        try:
+            await queue.put_terminal(job_id="j", end_offset=33, chunk=b"y")
+        except ConnectionResetError:
+            reset = True
+        else:
+            reset = False
+        await queue.close()
+        return reset, stalls, stats
+
+    reset, stalls, stats = asyncio.run(scenario())
+    assert reset and stalls == [True]
+    session = next(item for item in stats["sessions"] if item["label"] == "u1")
+    assert session["bytes"] == 32 and stats["max_bytes"] == 16
+
+
+def test_admin_mcp_sessions_endpoint(client):
+    resp = client.post("/api/auth/login", json={"username": "admin", "password": "admin-password-123"})
+    headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+    resp = client.get("/api/admin/mcp/sessions", headers=headers)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["max_bytes"] > 0 and isinstance(body["sessions"], list)
+    assert client.get("/api/admin/mcp/sessions").status_code == 401
+
+
+def test_writer_send_failure_closes_queue_and_tears_down_session(monkeypatch):
+    monkeypatch.setattr(_mcp_outbound.SETTINGS, "mcp_outbound_max_bytes", 16)
+
+    async def scenario() -> tuple[list, list, list, int, dict]:
+        calls, broken, stalls = [], [], []
+
+        async def send_text(data: str) -> None:
+            calls.append(data)
+            raise ConnectionResetError("socket gone")
+
+        queue = OutboundQueue(
+            send_text=send_text,
+            send_bytes=send_text,
+            on_stall=lambda: stalls.append(True),
+            logger=logging.getLogger(__name__),
+            label="u1",
+            on_broken=lambda: broken.append(True),
+        )
+        await queue.put_frame(json.dumps({"jsonrpc": "2.0", "id": 1, "result": {}}))
+        await asyncio.sleep(0.01)
+        broken_now = list(broken)
+        # Over the watermark: a dead writer would make this wait for the stall timeout.
+        await asyncio.wait_for(queue.put_terminal(job_id="j", end_offset=32, chunk=b"x" * 32), timeout=0.5)
+        await queue.put_frame(json.dumps({"jsonrpc": "2.0", "id": 2, "result": {}}))
+        await asyncio.sleep(0.01)
+        stats = outbound_stats()
+        await queue.close()
+        return calls, broken_now, stalls, queue.queued_bytes, stats
+
+    calls, broken, stalls, queued, stats = asyncio.run(scenario())
+    assert broken == [True]
+    assert stalls == []
+    assert len(calls) == 1
+    assert queued == 0
+    assert stats["sessions"] == []
@@ -2,13 +2,22 @@ from __future__ import annotations
 
 """MCP WebSocket integration tests (judge role)."""
 
+import asyncio
+import json
 import os
+import threading
+import time
 
 from sqlalchemy import select
 
+from backend.app.services import job_queue, singletons
+
 from .mcp_ws_common import (
+    HTTP_JOB_CREATE_FORM_BASE,
     build_minimal_tests_zip_bytes,
     ensure_model,
+    jobs_root_from_env,
+    set_job_status,
     signup_token,
     structured_content,
     ws_call_tool,
@@ -90,3 +99,95 @@ def test_mcp_judge_ws_claim_and_release(client):
         assert rec.model == "test-model-judge-mcp"
         assert rec.input_tokens == 10
 
+
+
+def test_mcp_judge_claim_next_long_poll_wakes_on_start(client, monkeypatch):
+    ensure_model(client, "test-model-judge-wait")
+    token = signup_token(client, "judge-wait-user")
+    resp = client.post(
+        "/api/jobs",
+        headers={"Authorization": f"Bearer {token}"},
+        data={**HTTP_JOB_CREATE_FORM_BASE, "model": "test-model-judge-wait"},
+        files={"tests_zip": ("tests.zip", build_minimal_tests_zip_bytes(), "application/zip")},
+    )
+    assert resp.status_code == 200
+    job_id = str(resp.json()["job_id"])
+    state_path = jobs_root_from_env() / job_id / "state.json"
+
+    jm = singletons.JOB_MANAGER
+    monkeypatch.setattr(jm, "_judge_mode", "independent")
+    while job_queue.pop() is not None:
+        pass
+
+    judge_token = str(os.environ["REALMOI_JUDGE_MCP_TOKEN"])
+    with client.websocket_connect(f"/api/mcp/ws?token={judge_token}") as ws:
+        ws_initialize_and_list_tools(ws, expected_role="judge")
+
+        # Empty queue: the call waits out wait_ms and reports claimed=false.
+        started = time.monotonic()
+        idle = ws_call_tool(ws, request_id=3, name="judge.claim_next", arguments={"machine_id": "judge-wait", "wait_ms": 200})
+        assert structured_content(idle).get("claimed") is False
+        assert time.monotonic() - started >= 0.2
+
+        # start_job from another thread wakes the waiting claim well before wait_ms.
+        owner_user_id = str(json.loads(state_path.read_text(encoding="utf-8")).get("owner_user_id") or "")
+        timer = threading.Timer(0.2, lambda: jm.start_job(job_id=job_id, owner_user_id=owner_user_id))
+        started = time.monotonic()
+        timer.start()
+        try:
+            woke = ws_call_tool(ws, request_id=4, name="judge.claim_next", arguments={"machine_id": "judge-wait", "wait_ms": 10_000})
+        finally:
+            timer.join()
+        elapsed = time.monotonic() - started
+        payload = structured_content(woke)
+        assert payload.get("claimed") is True
+        assert payload.get("job_id") == job_id
+        assert elapsed < 5.0
+
+        set_job_status(state_path, "cancelled")
+        ws_call_tool(
+            ws,
+            request_id=5,
+            name="judge.release_claim",
+            arguments={"job_id": job_id, "claim_id": str(payload.get("claim_id") or "")},
+        )
+
+
+def test_mcp_judge_blocking_tools_run_off_the_event_loop(client, monkeypatch):  # noqa: ARG001
+    from backend.app.services import mcp_judge  # noqa: WPS433
+
+    job_id = "judge-off-loop"
+    state_path = jobs_root_from_env() / job_id / "state.json"
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    state = {"job_id": job_id, "owner_user_id": "u", "status": "running", "judge": {"claim_id": "c1"}}
+    state_path.write_text(json.dumps(state), encoding="utf-8")
+
+    release = threading.Event()
+    real_save_state = mcp_judge.save_state
+
+    def slow_save_state(path, obj):
+        # 模拟 state.json 写入 + jobs 索引 upsert 卡住：应在线程池里等，而不是卡住事件循环。
+        release.wait(timeout=5)
+        real_save_state(path, obj)
+
+    monkeypatch.setattr(mcp_judge, "save_state", slow_save_state)
+    sent: list[dict] = []
+
+    class _FakeWebSocket:
+        async def send_text(self, data: str) -> None:
+            sent.append(json.loads(data))
+
+    async def scenario() -> None:
+        session = mcp_judge.McpJudgeWebSocketSession(ws=_FakeWebSocket())
+        args = {"job_id": job_id, "claim_id": "c1", "patch": {"stage": "testing"}}
+        call = asyncio.create_task(session.tool_call(msg_id=1, name="judge.job.patch_state", arguments=args))
+        await asyncio.sleep(0.05)
+        assert not call.done()
+        assert sent == []
+        release.set()
+        await asyncio.wait_for(call, timeout=5)
+
+    asyncio.run(scenario())
+    assert sent[0]["id"] == 1
+    assert sent[0]["result"]["structuredContent"] == {"ok": True}
+    assert json.loads(state_path.read_text(encoding="utf-8"))["stage"] == "testing"
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 """MCP WebSocket integration tests (user role)."""
 
+import base64
+import threading
 import time
 
+from backend.app.services.mcp_binary import decode_frame
+
 from .mcp_ws_common import (
     MCP_JOB_CREATE_ARGS_BASE,
     append_jsonl,
@@ -66,6 +70,46 @@ def assert_job_state(*, ws, job_id: str) -> None:
     assert state_job_id == job_id
 
 
+def assert_job_list_contains(*, ws, job_id: str) -> None:
+    list_resp = ws_call_tool(ws, request_id=43, name="job.list", arguments={"limit": 1, "status": "created"})
+    list_payload = structured_content(list_resp)
+    items = list_payload.get("items") or []
+    assert [x.get("job_id") for x in items] == [job_id]
+    assert list_payload.get("total") == 1
+
+
+def assert_report_outputs_range(*, client, ws, token: str, jobs_root: Any, job_id: str) -> None:
+    # report.v2 sidecar：MCP 与 HTTP 都按区间读取，不返回整个文件。
+    output_dir = jobs_root / job_id / "output"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "report.outputs.bin").write_bytes(b"stdout-0stderr-0stdout-1")
+
+    range_resp = ws_call_tool(
+        ws,
+        request_id=44,
+        name="job.read_artifact_range",
+        arguments={"job_id": job_id, "name": "report.outputs.bin", "offset": 8, "length": 8},
+    )
+    payload = structured_content(range_resp)
+    assert base64.b64decode(payload["data_b64"]) == b"stderr-0"
+    assert (payload["offset"], payload["length"], payload["size"], payload["eof"]) == (8, 8, 24, False)
+
+    resp = client.get(
+        f"/api/jobs/{job_id}/artifacts/report.outputs.bin/range",
+        params={"offset": 16, "length": 100},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 200
+    assert resp.content == b"stdout-1"
+    assert resp.headers["x-artifact-size"] == "24"
+
+    denied = client.get(
+        f"/api/jobs/{job_id}/artifacts/state.json/range",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert denied.status_code == 404
+
+
 def subscribe_agent_status_stream(*, ws, job_id: str) -> None:
     ws_call_tool(
         ws,
@@ -100,6 +144,30 @@ def append_agent_status_line_and_receive(*, ws, jobs_root: Any, job_id: str) ->
     assert (params.get("item") or {}).get("summary") == "测试中"
 
 
+def subscribe_test_results_and_receive(*, ws, jobs_root: Any, job_id: str) -> None:
+    # runner_test 每结束一个 case 追加一行；订阅从 offset 续读并逐行推送。
+    log_path = jobs_root / job_id / "output" / "test_results.jsonl"
+    first = {"attempt": 1, "done": 1, "total": 2, "name": "1", "group": "default", "verdict": "AC"}
+    append_jsonl(log_path, first)
+    offset = log_path.stat().st_size
+
+    resp = ws_call_tool(
+        ws,
+        request_id=6,
+        name="job.subscribe",
+        arguments={"job_id": job_id, "streams": ["test_results"], "test_results_offset": offset},
+    )
+    assert structured_content(resp).get("streams") == ["agent_status", "test_results"]
+    append_jsonl(log_path, {**first, "done": 2, "name": "2", "verdict": "WA"})
+    time.sleep(0.3)
+
+    notif = ws.receive_json()
+    assert notif.get("method") == "test_results"
+    params = notif.get("params") or {}
+    assert params.get("offset") == log_path.stat().st_size
+    assert (params.get("item") or {}).get("verdict") == "WA"
+
+
 def test_mcp_ws_job_create_and_subscribe_agent_status(client):
     ensure_model(client, "test-model-mcp")
     token = signup_token(client, "mcp-user")
@@ -113,6 +181,8 @@ def test_mcp_ws_job_create_and_subscribe_agent_status(client):
         assert "job.get_tests" in tool_names
         assert "job.get_test_preview" in tool_names
         assert "job.subscribe" in tool_names
+        assert "job.list" in tool_names
+        assert "job.read_artifact_range" in tool_names
 
         # 2) job.create：创建 job 并落盘 input/job.json + tests/
         job_id, jobs_root = create_job_and_assert_inputs(ws=ws, zip_b64=zip_b64)
@@ -125,9 +195,99 @@ def test_mcp_ws_job_create_and_subscribe_agent_status(client):
 
         # 5) job.get_state：检查 state 返回的 job_id 一致性
         assert_job_state(ws=ws, job_id=job_id)
+        assert_job_list_contains(ws=ws, job_id=job_id)
+        assert_report_outputs_range(client=client, ws=ws, token=token, jobs_root=jobs_root, job_id=job_id)
 
         # 6) job.subscribe：订阅 agent_status stream
         subscribe_agent_status_stream(ws=ws, job_id=job_id)
 
         # 7) 追加 agent_status.jsonl 并等待 tail 通知
         append_agent_status_line_and_receive(ws=ws, jobs_root=jobs_root, job_id=job_id)
+
+        # 8) job.subscribe(test_results)：逐 case 结果流
+        subscribe_test_results_and_receive(ws=ws, jobs_root=jobs_root, job_id=job_id)
+
+
+def test_mcp_ws_terminal_binary_frames_when_negotiated(client):
+    ensure_model(client, "test-model-mcp")
+    token = signup_token(client, "mcp-binary-user")
+
+    with client.websocket_connect(f"/api/mcp/ws?token={token}") as ws:
+        ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"capabilities": {"binary_frames": True}}})
+        capabilities = (ws.receive_json().get("result") or {}).get("capabilities") or {}
+        assert capabilities["binary_frames"]["streams"]["terminal"] == 1
+
+        job_id, jobs_root = create_job_and_assert_inputs(ws=ws, zip_b64=build_minimal_tests_zip_b64())
+        log_path = jobs_root / job_id / "logs" / "terminal.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_path.write_bytes(b"old\n")
+
+        resp = ws_call_tool(
+            ws,
+            request_id=4,
+            name="job.subscribe",
+            arguments={"job_id": job_id, "streams": ["terminal"], "terminal_offset": 2},
+        )
+        assert structured_content(resp).get("streams") == ["terminal"]
+
+        frame = decode_frame(ws.receive_bytes())
+        assert (frame.stream, frame.job_id, frame.offset, frame.payload) == ("terminal", job_id, 2, b"d\n")
+        with log_path.open("ab") as fp:
+            fp.write(b"\x1b[32mnew\x1b[0m\n")
+        frame = decode_frame(ws.receive_bytes())
+        assert (frame.offset, frame.payload) == (4, b"\x1b[32mnew\x1b[0m\n")
+
+
+def test_mcp_ws_agent_status_lines_arrive_as_one_batch(client):
+    ensure_model(client, "test-model-mcp")
+    token = signup_token(client, "mcp-batch-user")
+
+    with client.websocket_connect(f"/api/mcp/ws?token={token}") as ws:
+        params = {"capabilities": {"notification_batch": {"max_delay_ms": 50}}}
+        ws.send_json({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": params})
+        capabilities = (ws.receive_json().get("result") or {}).get("capabilities") or {}
+        assert capabilities["notification_batch"]["method"] == "notifications/batch"
+        assert capabilities["notification_batch"]["max_delay_ms"] == 50
+
+        job_id, jobs_root = create_job_and_assert_inputs(ws=ws, zip_b64=build_minimal_tests_zip_b64())
+        log_path = jobs_root / job_id / "logs" / "agent_status.jsonl"
+        for i in range(3):
+            append_jsonl(log_path, {"stage": "coding", "summary": f"step {i}"})
+
+        resp = ws_call_tool(ws, request_id=4, name="job.subscribe", arguments={"job_id": job_id, "streams": ["agent_status"]})
+        assert structured_content(resp).get("streams") == ["agent_status"]
+
+        batch = ws.receive_json()
+        assert batch.get("method") == "notifications/batch"
+        items = (batch.get("params") or {}).get("items") or []
+        assert [item["params"]["item"]["summary"] for item in items] == ["step 0", "step 1", "step 2"]
+        assert items[-1]["params"]["offset"] == log_path.stat().st_size
+
+
+def test_mcp_ws_slow_models_list_does_not_block_other_requests(client, monkeypatch):
+    from backend.app.routers import models as models_router
+
+    release = threading.Event()
+
+    def slow_list_live_models(user, *, db):  # noqa: ARG001
+        # 模拟上游模型列表卡住：在线程池中阻塞，不应影响同一会话的其它请求。
+        release.wait(timeout=5)
+        return [{"model": "slow-upstream-model"}]
+
+    monkeypatch.setattr(models_router, "list_live_models", slow_list_live_models)
+    token = signup_token(client, "mcp-concurrent-user")
+
+    with client.websocket_connect(f"/api/mcp/ws?token={token}") as ws:
+        ws_initialize_and_list_tools(ws)
+        call = {"jsonrpc": "2.0", "id": 10, "method": "tools/call", "params": {"name": "models.list", "arguments": {}}}
+        ws.send_json(call)
+        ws.send_json({"jsonrpc": "2.0", "id": 11, "method": "ping", "params": {}})
+        assert ws.receive_json()["id"] == 11
+        listed = ws_call_tool(ws, request_id=12, name="job.list", arguments={"limit": 1})
+        assert structured_content(listed).get("items") == []
+        assert not release.is_set()
+
+        release.set()
+        resp = ws.receive_json()
+        assert resp["id"] == 10
+        assert structured_content(resp)["items"] == [{"model": "slow-upstream-model"}]
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+"""runner compile toolchain tests (content-hash cache, LRU eviction, precompiled header)."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RUNNER_APP_DIR = Path(__file__).resolve().parents[2] / "runner" / "app"
+if str(RUNNER_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(RUNNER_APP_DIR))
+
+import runner_compile_cache  # noqa: E402
+import runner_pch  # noqa: E402
+import runner_test  # noqa: E402
+
+
+def test_compile_cpp_reuses_cached_binary_for_identical_source(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("REALMOI_COMPILE_CACHE_DIR", str(cache_dir))
+    src = tmp_path / "main.cpp"
+    src.write_text('#include <cstdio>\nint main(){int x; if(scanf("%d",&x)!=1) return 1; printf("%d\\n", x*2);}\n', encoding="utf-8")
+
+    first = runner_test.compile_cpp(src_cpp=src, exe_path=tmp_path / "prog")
+    assert first.returncode == 0 and first.cached is False
+    assert len([p for p in cache_dir.iterdir() if not p.name.startswith(".tmp-")]) == 1
+
+    second_exe = tmp_path / "b" / "prog"
+    second = runner_test.compile_cpp(src_cpp=src, exe_path=second_exe)
+    assert second.returncode == 0 and second.cached is True
+    out = subprocess.run([str(second_exe)], input=b"21\n", capture_output=True, check=True).stdout
+    assert out == b"42\n"
+
+    # Different source -> different key -> real compile.
+    src.write_text("int main(){return 0;}\n", encoding="utf-8")
+    third = runner_test.compile_cpp(src_cpp=src, exe_path=tmp_path / "prog-c")
+    assert third.cached is False
+
+
+def test_compile_cache_disabled_and_failed_compiles_not_stored(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setenv("REALMOI_COMPILE_CACHE_DIR", str(cache_dir))
+    src = tmp_path / "main.cpp"
+    src.write_text("int main( {\n", encoding="utf-8")
+    assert runner_test.compile_cpp(src_cpp=src, exe_path=tmp_path / "prog").returncode != 0
+    assert not cache_dir.exists() or not any(cache_dir.iterdir())
+
+    monkeypatch.setenv("REALMOI_COMPILE_CACHE_DIR", "off")
+    assert runner_compile_cache.resolve_cache_dir() is None
+
+
+def test_evict_drops_least_recently_used_entries(tmp_path):
+    for i, name in enumerate(["old", "mid", "new"]):
+        entry = tmp_path / name
+        entry.mkdir()
+        (entry / "prog").write_bytes(b"x" * 1000)
+        ts = time.time() - 100 + i * 10
+        os.utime(entry, (ts, ts))
+
+    runner_compile_cache.evict(cache_dir=tmp_path, max_bytes=2000)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["mid", "new"]
+
+
+def test_pch_used_only_when_built_for_current_flags(tmp_path, monkeypatch):
+    monkeypatch.setenv("REALMOI_COMPILE_CACHE_DIR", "off")
+    monkeypatch.setenv("REALMOI_PCH_DIR", str(tmp_path / "pch"))
+    assert runner_pch.pch_flags(compiler=runner_test.CXX, flags=runner_test.CXX_FLAGS) == []
+
+    built = runner_pch.build_pch(pch_dir=tmp_path / "pch", compiler=runner_test.CXX, flags=runner_test.CXX_FLAGS)
+    assert built.returncode == 0
+    assert runner_pch.pch_flags(compiler=runner_test.CXX, flags=runner_test.CXX_FLAGS) == ["-I", str(tmp_path / "pch")]
+    assert runner_pch.pch_flags(compiler=runner_test.CXX, flags=["-std=c++17", "-O2"]) == []
+
+    src = tmp_path / "main.cpp"
+    src.write_text("#include <bits/stdc++.h>\nint main(){std::vector<int> v{3,1,2}; std::sort(v.begin(), v.end()); std::cout << v[0];}\n", encoding="utf-8")
+    result = runner_test.compile_cpp(src_cpp=src, exe_path=tmp_path / "prog")
+    assert result.returncode == 0
+    assert str(tmp_path / "pch") in result.cmd
+    assert subprocess.run([str(tmp_path / "prog")], capture_output=True, check=True).stdout == b"1"
+
+
+def test_lookup_hits_on_read_only_cache_and_default_is_disabled(tmp_path, monkeypatch):
+    import errno
+
+    cache_dir = tmp_path / "cache"
+    prog = tmp_path / "built"
+    prog.write_bytes(b"#!/bin/sh\n")
+    runner_compile_cache.store(cache_dir=cache_dir, key="k", exe_path=prog, stdout=b"", stderr=b"warn")
+
+    def read_only_utime(*args, **kwargs):
+        raise OSError(errno.EROFS, "Read-only file system")
+
+    # docker test container: /job is mounted read-only, the LRU touch fails but the hit must stand.
+    monkeypatch.setattr(runner_compile_cache.os, "utime", read_only_utime)
+    hit = runner_compile_cache.lookup(cache_dir=cache_dir, key="k", exe_path=tmp_path / "out" / "prog")
+    assert hit is not None and hit.stderr == b"warn"
+    assert (tmp_path / "out" / "prog").read_bytes() == b"#!/bin/sh\n"
+
+    # No configured dir -> no cache: the (agent-writable) job dir is never trusted by default.
+    monkeypatch.delenv("REALMOI_COMPILE_CACHE_DIR", raising=False)
+    assert runner_compile_cache.resolve_cache_dir() is None
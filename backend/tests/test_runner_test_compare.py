@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+"""Streaming comparator must agree with the str-based `compare_output` (verdict, message, previews)."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+RUNNER_APP_DIR = Path(__file__).resolve().parents[2] / "runner" / "app"
+if str(RUNNER_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(RUNNER_APP_DIR))
+
+import runner_test_compare  # noqa: E402
+from runner_test_cases import compare_output  # noqa: E402
+
+
+LONG = "".join(f"{i} " for i in range(300)) + "\n"
+CASES = [
+    ("1 2 3\n", "1 2 3\n"),
+    ("1 2 3\n", "1  2\n3"),
+    ("1 2 3\n", "1 2 4\n"),
+    ("1 2 3\n", "1 2\n"),
+    ("1 2\n", "1 2 3 4\n"),
+    ("", ""),
+    ("", "\n\n"),
+    ("a\nb  \n\n", "a\r\nb\n"),
+    ("a\n\nb\n", "a\nb\n"),
+    ("x\ny\nz\n", "x\nq\nz\n"),
+    (LONG, LONG),
+    (LONG, LONG.replace("150 ", "151 ")),
+    (LONG, LONG[:-40]),
+    (LONG * 3, (LONG * 3).replace("\n", "\n\n")),
+]
+
+
+@pytest.mark.parametrize("mode", ["tokens", "trim_ws", "exact"])
+@pytest.mark.parametrize("chunk", [1, 7, 65536])
+@pytest.mark.parametrize(("expected", "actual"), CASES)
+def test_compare_stream_matches_compare_output(tmp_path, monkeypatch, mode, chunk, expected, actual):
+    monkeypatch.setattr(runner_test_compare, "CHUNK_BYTES", chunk)
+    expected_path = tmp_path / "case.out"
+    expected_path.write_text(expected, encoding="utf-8")
+    data = actual.encode("utf-8")
+    chunks = iter([data[i : i + chunk] for i in range(0, len(data), chunk)])
+
+    got = runner_test_compare.compare_stream(actual_chunks=chunks, expected_path=expected_path, mode=mode)
+    assert got == compare_output(actual, expected, mode)
+
+
+def test_matcher_reports_mismatch_before_output_ends():
+    matcher = runner_test_compare.new_matcher(mode="tokens", expected=b"1 2 3\n")
+    matcher.feed(b"1 9")
+    assert not matcher.mismatched  # "9" may still be a prefix of a longer token
+    matcher.feed(b" ")
+    assert matcher.mismatched
+    assert matcher.finish()[1] == "tokens mismatch at 1: expected=2 actual=9"
@@ -0,0 +1,474 @@
+from __future__ import annotations
+
+"""runner_test case execution tests (sequential vs parallel run_cases, fail-fast, repair ordering, large IO)."""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+RUNNER_APP_DIR = Path(__file__).resolve().parents[2] / "runner" / "app"
+if str(RUNNER_APP_DIR) not in sys.path:
+    # runner_test modules import each other by bare module name (as inside the runner image).
+    sys.path.insert(0, str(RUNNER_APP_DIR))
+
+import runner_test_cases  # noqa: E402
+import runner_program  # noqa: E402
+import runner_test_report  # noqa: E402
+import runner_test_run  # noqa: E402
+import runner_test_status  # noqa: E402
+from runner_test_models import Case, RunLimits  # noqa: E402
+
+
+def _write_cases(tests_dir: Path) -> list[Case]:
+    # Program echoes its input; expected files make some cases WA / RE.
+    cases = []
+    for i in range(8):
+        name = f"{i:02d}"
+        (tests_dir / f"{name}.in").write_text(f"{i}\n", encoding="utf-8")
+        expected = f"{i}\n" if i % 3 else f"{i + 100}\n"
+        (tests_dir / f"{name}.out").write_text(expected, encoding="utf-8")
+        cases.append(Case(name=name, group="default", input_rel=f"{name}.in", expected_rel=f"{name}.out", compare_mode="tokens"))
+    cases.append(Case(name="no-expected", group="default", input_rel="00.in", expected_rel=None, compare_mode="tokens"))
+    return cases
+
+
+def _write_program(path: Path) -> Path:
+    path.write_text('#!/bin/sh\nread x\nif [ "$x" = 7 ]; then exit 3; fi\nsleep 0.1\necho "$x"\n', encoding="utf-8")
+    path.chmod(0o755)
+    return path
+
+
+def _empty_report() -> dict:
+    return {
+        "tests": [],
+        "summary": {
+            "total": 0,
+            "judged": 0,
+            "run_only": 0,
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "not_run": 0,
+            "first_failure": None,
+            "first_failure_verdict": None,
+            "first_failure_message": None,
+        },
+    }
+
+
+def _run(
+    *,
+    tmp_path: Path,
+    monkeypatch,
+    cpus: int,
+    cores: list[int],
+    fail_fast: bool = False,
+    outputs: runner_test_report.OutputsBlob | None = None,
+    results: runner_test_status.CaseResultsLog | None = None,
+) -> tuple[dict, list[str]]:
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir(exist_ok=True)
+    cases = _write_cases(tests_dir)
+    exe = _write_program(tmp_path / "prog.sh")
+    updates: list[str] = []
+    monkeypatch.setattr(runner_test_run, "status_update", lambda **kw: updates.append(kw["summary"]))
+    monkeypatch.setattr(runner_test_run, "WORK_DIR", tmp_path / f"work-{cpus}")
+    monkeypatch.setattr(runner_test_run, "available_cpus", lambda: cores)
+    (tmp_path / f"work-{cpus}").mkdir(exist_ok=True)
+
+    report = _empty_report()
+    runner_test_run.run_cases(
+        report=report,
+        cases=cases,
+        tests_dir=tests_dir,
+        exe_path=exe,
+        limits=RunLimits(
+            time_limit_ms=2000,
+            memory_limit_mb=256,
+            cpus=cpus,
+            pids_limit=64,
+            max_output_bytes_per_test=4096,
+            max_terminal_log_bytes=4096,
+        ),
+        run_if_no_expected=False,
+        fail_fast=fail_fast,
+        outputs=outputs,
+        results=results,
+    )
+    return report, updates
+
+
+def _verdicts(report: dict) -> list[tuple[str, str]]:
+    return [(t["name"], t["verdict"]) for t in report["tests"]]
+
+
+def test_parallel_run_cases_matches_sequential_order_and_summary(tmp_path, monkeypatch):
+    sequential, seq_updates = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=1, cores=[0])
+    parallel, par_updates = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=4, cores=[0, 0, 0, 0])
+
+    assert _verdicts(parallel) == _verdicts(sequential)
+    assert _verdicts(sequential)[0] == ("00", "WA")
+    assert dict(_verdicts(sequential))["07"] == "RE"
+    assert dict(_verdicts(sequential))["no-expected"] == "SKIP"
+    assert parallel["summary"] == sequential["summary"]
+    assert sequential["summary"]["first_failure"] == "00"
+    assert par_updates[0] == seq_updates[0] == "开始执行测试（9 case）"
+    assert par_updates[-1] == seq_updates[-1] == "测试进度：9/9"
+
+
+def test_case_outputs_go_to_sidecar_blob_with_ranges(tmp_path, monkeypatch):
+    # report.v2: records only keep {offset, length}; the bytes live in report.outputs.bin.
+    blob = runner_test_report.OutputsBlob(tmp_path / runner_test_report.OUTPUTS_NAME)
+    report, _ = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=3, cores=[0, 0, 0], outputs=blob)
+    meta = blob.close()
+    data = (tmp_path / runner_test_report.OUTPUTS_NAME).read_bytes()
+    assert meta == {"name": runner_test_report.OUTPUTS_NAME, "bytes": len(data)}
+
+    for record in report["tests"]:
+        assert "stdout_b64" not in record
+        if record["verdict"] == "SKIP":
+            assert record["outputs"] is None
+            continue
+        stdout = record["outputs"]["stdout"]
+        expected = b"" if record["name"] == "07" else f"{int(record['name'])}\n".encode()
+        assert data[stdout["offset"] : stdout["offset"] + stdout["length"]] == expected
+        assert stdout["truncated"] is False
+
+
+def test_finished_cases_stream_to_test_results_jsonl(tmp_path, monkeypatch):
+    log_path = tmp_path / "output" / "test_results.jsonl"
+    results = runner_test_status.CaseResultsLog(log_path, attempt=2)
+    report, _ = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=3, cores=[0, 0, 0], results=results)
+    results.close()
+
+    lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [line["done"] for line in lines] == list(range(1, 10))
+    assert {line["total"] for line in lines} == {9} and {line["attempt"] for line in lines} == {2}
+    # Completion order may differ from case order; verdicts match the final report.
+    assert {line["name"]: line["verdict"] for line in lines} == dict(_verdicts(report))
+    wa = next(line for line in lines if line["name"] == "00")
+    assert wa["message"].startswith("tokens mismatch") and isinstance(wa["time_ms"], int)
+
+
+def test_resolve_case_workers_clamps_to_cores():
+    assert runner_test_run.resolve_case_workers(cpus=1, cores=[0, 1, 2]) == 1
+    assert runner_test_run.resolve_case_workers(cpus=2.0, cores=[0, 1, 2]) == 2
+    assert runner_test_run.resolve_case_workers(cpus=8, cores=[0, 1]) == 2
+    assert runner_test_run.resolve_case_workers(cpus="bad", cores=[0, 1]) == 1
+
+
+def test_pinned_cores_stay_inside_the_job_cpuset(monkeypatch):
+    monkeypatch.delenv("REALMOI_TEST_CPUSET", raising=False)
+    # Host-wide mask wider than the job: pinning would put every job on cores 0..N-1.
+    assert runner_test_run.pinned_cores(cores=[0, 1, 2, 3, 4, 5, 6, 7], workers=2) == [None, None]
+    # Container cpuset / taskset already narrowed to the job.
+    assert runner_test_run.pinned_cores(cores=[4, 5], workers=2) == [4, 5]
+
+    monkeypatch.setenv("REALMOI_TEST_CPUSET", "6,7")
+    assert runner_test_run.pinned_cores(cores=[0, 1, 2, 3, 4, 5, 6, 7], workers=2) == [6, 7]
+    monkeypatch.setenv("REALMOI_TEST_CPUSET", "none")
+    assert runner_test_run.pinned_cores(cores=[0, 1], workers=2) == [None, None]
+
+
+def test_parallel_case_error_cancels_remaining_cases(tmp_path, monkeypatch):
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir()
+    ran = tmp_path / "ran.log"
+    exe = tmp_path / "prog.sh"
+    exe.write_text(f'#!/bin/sh\necho x >> "{ran}"\nsleep 0.1\n', encoding="utf-8")
+    exe.chmod(0o755)
+    cases = []
+    for i in range(20):
+        if i != 1:
+            (tests_dir / f"{i:02d}.in").write_text("1\n", encoding="utf-8")
+        cases.append(Case(name=f"{i:02d}", group="default", input_rel=f"{i:02d}.in", expected_rel=None, compare_mode="tokens"))
+    monkeypatch.setattr(runner_test_run, "status_update", lambda **kw: None)
+    monkeypatch.setattr(runner_test_run, "WORK_DIR", tmp_path / "work")
+    monkeypatch.setattr(runner_test_run, "available_cpus", lambda: [0, 0])
+
+    limits = RunLimits(
+        time_limit_ms=2000,
+        memory_limit_mb=256,
+        cpus=2,
+        pids_limit=64,
+        max_output_bytes_per_test=4096,
+        max_terminal_log_bytes=4096,
+    )
+    with pytest.raises(RuntimeError, match="read_bytes_failed"):
+        runner_test_run.run_cases(
+            report=_empty_report(),
+            cases=cases,
+            tests_dir=tests_dir,
+            exe_path=exe,
+            limits=limits,
+            run_if_no_expected=True,
+        )
+    # Case 01 fails immediately; only the cases already running finish, the rest never start.
+    assert len(ran.read_text(encoding="utf-8").splitlines()) <= 3
+
+
+def test_fail_fast_stops_at_first_failure_in_case_order(tmp_path, monkeypatch):
+    # Case 00 is the first WA; everything after it is NOT_RUN in both modes.
+    sequential, _ = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=1, cores=[0], fail_fast=True)
+    parallel, _ = _run(tmp_path=tmp_path, monkeypatch=monkeypatch, cpus=3, cores=[0, 0, 0], fail_fast=True)
+
+    for report in (sequential, parallel):
+        verdicts = _verdicts(report)
+        assert verdicts[0] == ("00", "WA")
+        assert {v for _, v in verdicts[1:]} == {"NOT_RUN"}
+        assert len(verdicts) == 9
+        assert report["summary"]["failed"] == 1
+        assert report["summary"]["not_run"] == 8
+        assert report["summary"]["first_failure"] == "00"
+
+
+def test_parallel_fail_fast_streams_nothing_past_the_first_failure(tmp_path, monkeypatch):
+    # Cases 01/02 run alongside the failing 00 but end up NOT_RUN: no jsonl line, no sidecar bytes.
+    log_path = tmp_path / "output" / "test_results.jsonl"
+    results = runner_test_status.CaseResultsLog(log_path, attempt=1)
+    blob = runner_test_report.OutputsBlob(tmp_path / runner_test_report.OUTPUTS_NAME)
+    report, _ = _run(
+        tmp_path=tmp_path,
+        monkeypatch=monkeypatch,
+        cpus=3,
+        cores=[0, 0, 0],
+        fail_fast=True,
+        outputs=blob,
+        results=results,
+    )
+    results.close()
+    meta = blob.close()
+
+    lines = [json.loads(line) for line in log_path.read_text(encoding="utf-8").splitlines()]
+    assert [(line["name"], line["verdict"]) for line in lines] == [("00", "WA")]
+    stdout = report["tests"][0]["outputs"]["stdout"]
+    assert meta["bytes"] == stdout["length"] + report["tests"][0]["outputs"]["stderr"]["length"] == 2
+
+
+def test_prioritize_cases_runs_previous_failures_then_slowest_first(monkeypatch):
+    cases = [
+        Case(name=f"{i:02d}", group="default", input_rel=f"{i:02d}.in", expected_rel=f"{i:02d}.out", compare_mode="tokens")
+        for i in range(6)
+    ]
+    previous = {
+        "tests": [
+            {"input_rel": "tests/00.in", "verdict": "AC", "time_ms": 5},
+            {"input_rel": "tests/01.in", "verdict": "AC", "time_ms": 900},
+            {"input_rel": "tests/02.in", "verdict": "AC", "time_ms": 400},
+            {"input_rel": "tests/04.in", "verdict": "TLE", "time_ms": 2000},
+            {"input_rel": "tests/05.in", "verdict": "NOT_RUN", "time_ms": 0},
+            {"input_rel": "tests/gone.in", "verdict": "WA", "time_ms": 1},
+        ]
+    }
+    monkeypatch.setattr(runner_test_cases, "PRIORITY_SLOWEST_CASES", 2)
+
+    ordered, info = runner_test_cases.prioritize_cases(cases, previous)
+    assert [c.name for c in ordered] == ["04", "01", "02", "00", "03", "05"]
+    assert info == {"failed_first": 1, "slowest_first": 2}
+
+    unchanged, info = runner_test_cases.prioritize_cases(cases, None)
+    assert unchanged == cases
+    assert info == {"failed_first": 0, "slowest_first": 0}
+
+
+def test_run_program_streams_large_input_and_spills_large_output(tmp_path, monkeypatch):
+    # `cat` writes while we are still feeding stdin: far beyond the pipe buffer in both directions.
+    monkeypatch.setattr(runner_program, "STDOUT_SPILL_BYTES", 1 << 20)
+    payload = b"".join(f"{i}\n".encode() for i in range(800_000))
+    input_path = tmp_path / "big.in"
+    input_path.write_bytes(payload)
+    exe = tmp_path / "cat.sh"
+    exe.write_text("#!/bin/sh\nexec cat\n", encoding="utf-8")
+    exe.chmod(0o755)
+
+    result = runner_program.run_program(
+        exe_path=exe,
+        input_path=input_path,
+        time_limit_ms=10_000,
+        output_limit_bytes=len(payload) * 2,
+        work_dir=tmp_path,
+    )
+    assert result["timeout"] is False and result["exit_code"] == 0
+    assert result["stdout_size"] == len(payload)
+    assert len(result["stdout"]) == 1 << 20
+    assert result["stdout_path"] is not None and result["stdout_path"].read_bytes() == payload
+
+
+def test_early_wa_kills_program_on_first_wrong_token(tmp_path):
+    # Prints a wrong answer, then keeps running: without early_wa this burns the whole time limit.
+    tests_dir = tmp_path / "tests"
+    tests_dir.mkdir()
+    (tests_dir / "1.in").write_text("\n", encoding="utf-8")
+    (tests_dir / "1.out").write_text("1 2 3\n", encoding="utf-8")
+    exe = tmp_path / "prog.sh"
+    exe.write_text("#!/bin/sh\necho 1 5\nexec sleep 5\n", encoding="utf-8")
+    exe.chmod(0o755)
+    case = Case(name="1", group="default", input_rel="1.in", expected_rel="1.out", compare_mode="tokens")
+    limits = RunLimits(
+        time_limit_ms=1500,
+        memory_limit_mb=256,
+        cpus=1,
+        pids_limit=64,
+        max_output_bytes_per_test=4096,
+        max_terminal_log_bytes=4096,
+    )
+
+    def run(early_wa: bool):
+        ctx = runner_test_run.CaseRunContext(tests_dir=tests_dir, exe_path=exe, limits=limits, run_if_no_expected=False, early_wa=early_wa)
+        return runner_test_run.run_one_case(ctx=ctx, case=case, work_dir=tmp_path)
+
+    early = run(True)
+    assert early.evaluation.verdict == "WA"
+    assert early.evaluation.diff["message"] == "tokens mismatch at 1: expected=2 actual=5"
+    assert early.record["time_ms"] < 1000
+    assert run(False).evaluation.verdict == "TLE"
+
+
+def test_memory_limit_is_enforced_and_reported_as_mle(tmp_path):
+    src = tmp_path / "main.cpp"
+    src.write_text(
+        "#include <vector>\n#include <cstdio>\n#include <cstdlib>\n"
+        "int main(int, char**){ size_t mb = std::atoi(std::getenv(\"MB\")); std::vector<char> v(mb << 20, 1); std::printf(\"%d\\n\", v[mb]); }\n",
+        encoding="utf-8",
+    )
+    exe = tmp_path / "prog"
+    subprocess.run(["g++", "-O2", str(src), "-o", str(exe)], check=True)
+
+    def run(mb: int) -> dict:
+        wrapper = tmp_path / f"run{mb}.sh"
+        wrapper.write_text(f"#!/bin/sh\nMB={mb} exec {exe}\n", encoding="utf-8")
+        wrapper.chmod(0o755)
+        return runner_program.run_program(
+            exe_path=wrapper,
+            time_limit_ms=5000,
+            output_limit_bytes=4096,
+            work_dir=tmp_path,
+            memory_limit_mb=64,
+        )
+
+    over = run(256)
+    assert over["exit_code"] != 0
+    assert over["memory_limit_exceeded"] is True
+    within = run(8)
+    assert within["exit_code"] == 0 and within["stdout"] == b"1\n"
+    assert within["memory_limit_exceeded"] is False
+
+
+def test_static_array_over_limit_is_mle_but_plain_segfault_is_not(tmp_path, monkeypatch):
+    # RLIMIT_DATA path (no delegated cgroup): an oversized global array dies with SIGSEGV at load time.
+    monkeypatch.delenv("REALMOI_CGROUP_DIR", raising=False)
+    sources = {
+        "static": "#include <cstring>\n#include <cstdio>\nstatic char a[300 << 20];\n"
+        "int main(){ std::memset(a, 1, sizeof a); std::printf(\"%d\\n\", a[12345]); }\n",
+        "segv": "#include <cstdio>\nint main(){ volatile int* p = nullptr; *p = 1; std::printf(\"%d\\n\", *p); }\n",
+    }
+    results = {}
+    for name, code in sources.items():
+        src = tmp_path / f"{name}.cpp"
+        src.write_text(code, encoding="utf-8")
+        exe = tmp_path / name
+        subprocess.run(["g++", "-O2", str(src), "-o", str(exe)], check=True)
+        results[name] = runner_program.run_program(
+            exe_path=exe,
+            time_limit_ms=5000,
+            output_limit_bytes=4096,
+            work_dir=tmp_path,
+            memory_limit_mb=256,
+        )
+
+    assert runner_program.static_memory_kb(tmp_path / "static") >= 300 * 1024
+    assert results["static"]["exit_code"] != 0
+    assert results["static"]["memory_limit_exceeded"] is True
+    assert results["segv"]["exit_code"] == -11
+    assert results["segv"]["memory_limit_exceeded"] is False
+
+
+def test_mle_needs_bad_alloc_abort_or_confirmed_oom_kill(tmp_path, monkeypatch):
+    monkeypatch.delenv("REALMOI_CGROUP_DIR", raising=False)
+    events = tmp_path / "memory.events"
+    events.write_text("oom 0\noom_kill 0\n", encoding="ascii")
+    monkeypatch.setattr(runner_program, "CONTAINER_MEMORY_EVENTS", events)
+    scripts = {
+        # Prints the libstdc++ text but exits normally with 1: RE, not MLE.
+        "spoof": "echo \"terminate called after throwing an instance of 'std::bad_alloc'\" >&2\nexit 1",
+        # SIGKILL from someone else, no OOM event.
+        "killed": "kill -9 $$",
+        # SIGKILL while the container's oom_kill counter goes up.
+        "oom": f'printf "oom 1\\noom_kill 1\\n" > "{events}"\nkill -9 $$',
+    }
+    results = {}
+    for name, body in scripts.items():
+        exe = tmp_path / f"{name}.sh"
+        exe.write_text(f"#!/bin/sh\n{body}\n", encoding="utf-8")
+        exe.chmod(0o755)
+        results[name] = runner_program.run_program(
+            exe_path=exe,
+            time_limit_ms=5000,
+            output_limit_bytes=4096,
+            work_dir=tmp_path,
+            memory_limit_mb=256,
+        )
+    assert results["spoof"]["exit_code"] == 1 and results["spoof"]["memory_limit_exceeded"] is False
+    assert results["killed"]["exit_code"] == -9 and results["killed"]["memory_limit_exceeded"] is False
+    assert results["oom"]["exit_code"] == -9 and results["oom"]["memory_limit_exceeded"] is True
+
+    src = tmp_path / "throw.cpp"
+    src.write_text("#include <new>\nint main(){ throw std::bad_alloc(); }\n", encoding="utf-8")
+    exe = tmp_path / "throw"
+    subprocess.run(["g++", "-O2", str(src), "-o", str(exe)], check=True)
+    thrown = runner_program.run_program(exe_path=exe, time_limit_ms=5000, output_limit_bytes=4096, work_dir=tmp_path, memory_limit_mb=256)
+    assert thrown["exit_code"] == -6 and thrown["memory_limit_exceeded"] is True
+
+
+def test_cpu_time_mode_ignores_sleeping_but_catches_busy_loops(tmp_path):
+    sleeper = tmp_path / "sleep.sh"
+    sleeper.write_text("#!/bin/sh\nsleep 0.8\necho done\n", encoding="utf-8")
+    busy = tmp_path / "busy.sh"
+    busy.write_text("#!/bin/sh\nwhile :; do :; done\n", encoding="utf-8")
+    for exe in (sleeper, busy):
+        exe.chmod(0o755)
+
+    def run(exe: Path, mode: str) -> dict:
+        return runner_program.run_program(exe_path=exe, time_limit_ms=400, output_limit_bytes=4096, work_dir=tmp_path, time_mode=mode)
+
+    cpu_sleep = run(sleeper, "cpu")
+    assert cpu_sleep["timeout"] is False and cpu_sleep["stdout"] == b"done\n"
+    assert cpu_sleep["time_ms"] >= 800 and cpu_sleep["cpu_time_ms"] < 400
+    assert set(cpu_sleep["context_switches"]) == {"voluntary", "involuntary"}
+    assert run(sleeper, "wall")["timeout"] is True
+
+    cpu_busy = run(busy, "cpu")
+    assert cpu_busy["timeout"] is True
+    assert cpu_busy["time_ms"] < 800  # killed on CPU budget, not on the 1.4s wall cap
+
+
+def test_forked_child_holding_stdout_is_killed_at_the_deadline(tmp_path):
+    # The main process exits at once; its background child keeps stdout open well past the limit.
+    exe = tmp_path / "fork.sh"
+    exe.write_text("#!/bin/sh\n(sleep 3; echo late) &\necho hi\n", encoding="utf-8")
+    exe.chmod(0o755)
+    cpu_before = time.process_time()
+    started = time.monotonic()
+    result = runner_program.run_program(exe_path=exe, time_limit_ms=200, output_limit_bytes=4096, work_dir=tmp_path)
+    elapsed = time.monotonic() - started
+    assert result["timeout"] is True
+    assert result["stdout"] == b"hi\n"
+    assert elapsed < 1.5
+    # No select(0) spin while waiting for the child.
+    assert time.process_time() - cpu_before < 0.3
+
+
+def test_run_program_notices_exit_without_polling_delay(tmp_path):
+    # pidfd wake-up: a trivial program costs a few ms, not the old ~20 ms reap poll.
+    exe = tmp_path / "true.sh"
+    exe.write_text("#!/bin/sh\nexit 0\n", encoding="utf-8")
+    exe.chmod(0o755)
+    times = sorted(
+        runner_program.run_program(exe_path=exe, time_limit_ms=1000, output_limit_bytes=1024, work_dir=tmp_path)["time_ms"]
+        for _ in range(9)
+    )
+    assert times[4] < 15
@@ -3,7 +3,7 @@
 import React from "react";
 import { GlassPanel } from "./GlassPanel";
 import { JobTestsPanel } from "./JobTestsPanel";
-import type { JobTestMeta, Message, ReportArtifact } from "./types";
+import type { JobTestMeta, Message, ReportArtifact, TestResultLine } from "./types";
 import { DiffView } from "./cockpit/DiffView";
 import { resolveJobStatusMeta } from "./cockpit/jobStatus";
 import { cleanTokenText, splitTokenStreamContent } from "./cockpit/tokenStream";
@@ -25,6 +25,7 @@ export type CockpitViewModel = {
   diffText: string;
   hasDiff: boolean;
   report: ReportArtifact | null;
+  liveResults: TestResultLine[];
 
   jobTests: JobTestMeta[] | null;
   jobTestsError: string | null;
@@ -340,6 +341,7 @@ export function CockpitView({ vm }: { vm: CockpitViewModel }) {
               jobId={vm.activeJobId}
               tests={vm.jobTests}
               report={vm.report}
+              liveResults={vm.liveResults}
               loading={vm.jobTests === null}
               errorText={vm.jobTestsError}
             />
@@ -1,9 +1,9 @@
 "use client";
 
-import React, { useMemo, useState } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import { getErrorMessage } from "@/lib/api";
 import { getMcpClient } from "@/lib/mcp";
-import type { JobTestMeta, JobTestPreview, ReportArtifact } from "./types";
+import type { ArtifactRange, JobTestMeta, JobTestPreview, ReportArtifact, ReportOutputRange, TestResultLine } from "./types";
 
 type PreviewState =
   | { status: "idle" }
@@ -11,6 +11,34 @@ type PreviewState =
   | { status: "loaded"; data: JobTestPreview }
   | { status: "error"; message: string };
 
+type OutputsState =
+  | { status: "idle" }
+  | { status: "loading" }
+  | { status: "loaded"; stdout: string; stderr: string }
+  | { status: "error"; message: string };
+
+type ReportTestRecord = NonNullable<ReportArtifact["tests"]>[number];
+
+const REPORT_OUTPUTS_NAME = "report.outputs.bin";
+
+const FAILED_VERDICTS = new Set(["WA", "RE", "TLE", "MLE", "OLE"]);
+
+// report.json 未就绪时，用 test_results 流（当前 attempt）临时拼出 case 结果。
+function liveResultsAsRecords(lines: TestResultLine[]): ReportTestRecord[] {
+  const attempt = lines.reduce((max, line) => Math.max(max, Number(line.attempt ?? 0)), 0);
+  return lines
+    .filter((line) => Number(line.attempt ?? 0) === attempt)
+    .map((line) => ({
+      name: line.name,
+      group: line.group,
+      verdict: line.verdict,
+      time_ms: line.time_ms,
+      cpu_time_ms: line.cpu_time_ms,
+      memory_kb: line.memory_kb,
+      diff: { message: line.message },
+    }));
+}
+
 function caseKey(group: string, name: string): string {
   return `${group}/${name}`;
 }
@@ -40,6 +68,18 @@ function decodeB64Text(b64: string | undefined): string {
   }
 }
 
+async function readOutputRange(jobId: string, range: ReportOutputRange | undefined): Promise<string> {
+  const length = Number(range?.length ?? 0);
+  if (!range || !Number.isFinite(length) || length <= 0) return "";
+  const payload = await getMcpClient().callTool<ArtifactRange>("job.read_artifact_range", {
+    job_id: jobId,
+    name: REPORT_OUTPUTS_NAME,
+    offset: Number(range.offset ?? 0),
+    length,
+  });
+  return decodeB64Text(payload?.data_b64);
+}
+
 function formatTimeMs(ms: number): string {
   if (!Number.isFinite(ms)) return "—";
   if (ms < 1000) return `${Math.max(0, Math.round(ms))}ms`;
@@ -62,8 +102,10 @@ function badgeForVerdict(verdict: string): { text: string; className: string } {
   if (v === "WA") return { text: "WA", className: "bg-rose-50 text-rose-700 border border-rose-200" };
   if (v === "RE") return { text: "RE", className: "bg-orange-50 text-orange-700 border border-orange-200" };
   if (v === "TLE") return { text: "TLE", className: "bg-fuchsia-50 text-fuchsia-700 border border-fuchsia-200" };
+  if (v === "MLE") return { text: "MLE", className: "bg-violet-50 text-violet-700 border border-violet-200" };
   if (v === "OLE") return { text: "OLE", className: "bg-amber-50 text-amber-800 border border-amber-200" };
   if (v === "SKIP") return { text: "SKIP", className: "bg-slate-100 text-slate-600 border border-slate-200" };
+  if (v === "NOT_RUN") return { text: "NOT RUN", className: "bg-slate-50 text-slate-500 border border-dashed border-slate-200" };
   if (v === "RUN") return { text: "RUN", className: "bg-indigo-50 text-indigo-700 border border-indigo-200" };
   return { text: v || "—", className: "bg-slate-100 text-slate-600 border border-slate-200" };
 }
@@ -102,6 +144,14 @@ function frameForVerdict(verdict: string): { frame: string; chevron: string; blo
       blockBg: "bg-fuchsia-50/55",
     };
   }
+  if (v === "MLE") {
+    return {
+      frame: "border-violet-200 bg-violet-50/75 shadow-violet-500/5",
+      chevron: "text-violet-400",
+      blockBorder: "border-violet-200/60",
+      blockBg: "bg-violet-50/55",
+    };
+  }
   if (v === "OLE") {
     return {
       frame: "border-amber-200 bg-amber-50/75 shadow-amber-500/5",
@@ -188,25 +238,28 @@ export function JobTestsPanel({
   jobId,
   tests,
   report,
+  liveResults,
   loading,
   errorText,
 }: {
   jobId: string | null;
   tests: JobTestMeta[] | null;
   report: ReportArtifact | null;
+  liveResults?: TestResultLine[];
   loading?: boolean;
   errorText?: string | null;
 }) {
   const resultByKey = useMemo(() => {
-    const m = new Map<string, NonNullable<ReportArtifact["tests"]>[number]>();
-    for (const t of report?.tests ?? []) {
+    const m = new Map<string, ReportTestRecord>();
+    const records = report ? report.tests ?? [] : liveResultsAsRecords(liveResults ?? []);
+    for (const t of records) {
       const name = String(t?.name ?? "").trim();
       if (!name) continue;
       const group = String(t?.group ?? "default").trim() || "default";
       m.set(caseKey(group, name), t);
     }
     return m;
-  }, [report]);
+  }, [report, liveResults]);
 
   const rows = useMemo(() => {
     if (tests && tests.length > 0) return tests;
@@ -235,8 +288,15 @@ export function JobTestsPanel({
       if (failed > 0) bits.push(`failed=${failed}`);
       return bits.join(" · ");
     }
+    const last = liveResults?.[liveResults.length - 1];
+    if (!report && last && typeof last.done === "number" && typeof last.total === "number") {
+      const failed = liveResultsAsRecords(liveResults ?? []).filter((r) => FAILED_VERDICTS.has(String(r.verdict))).length;
+      const bits = [`测试中 ${last.done}/${last.total}`];
+      if (failed > 0) bits.push(`failed=${failed}`);
+      return bits.join(" · ");
+    }
     return "";
-  }, [report]);
+  }, [report, liveResults]);
 
   const actualMetrics = useMemo(() => {
     let totalTimeMs: number | null = null;
@@ -262,6 +322,30 @@ export function JobTestsPanel({
 
   const [previewMap, setPreviewMap] = useState<Record<string, PreviewState>>({});
 
+  // report.v2：case 的 stdout/stderr 在展开时才从 report.outputs.bin 按区间读取。
+  const [outputsMap, setOutputsMap] = useState<Record<string, OutputsState>>({});
+  useEffect(() => {
+    setOutputsMap({});
+  }, [report]);
+
+  const ensureOutputsLoaded = async (key: string, record: ReportTestRecord | undefined) => {
+    const outputs = record?.outputs;
+    if (!jobId || !outputs) return;
+    const st = outputsMap[key];
+    if (st?.status === "loading" || st?.status === "loaded") return;
+
+    setOutputsMap((prev) => ({ ...prev, [key]: { status: "loading" } }));
+    try {
+      const [stdout, stderr] = await Promise.all([
+        readOutputRange(jobId, outputs.stdout),
+        readOutputRange(jobId, outputs.stderr),
+      ]);
+      setOutputsMap((prev) => ({ ...prev, [key]: { status: "loaded", stdout, stderr } }));
+    } catch (e: unknown) {
+      setOutputsMap((prev) => ({ ...prev, [key]: { status: "error", message: getErrorMessage(e) } }));
+    }
+  };
+
   const ensurePreviewLoaded = async (meta: JobTestMeta) => {
     if (!jobId) return;
     const key = caseKey(meta.group, meta.name);
@@ -345,8 +429,14 @@ export function JobTestsPanel({
                 previewState.status === "loaded"
                   ? previewState.data.expected?.text ?? ""
                   : "";
-              const actualText = decodeB64Text(r?.stdout_b64);
-              const stderrText = decodeB64Text(r?.stderr_b64);
+              const outputsState = outputsMap[key] ?? { status: "idle" };
+              const actualText = r?.outputs
+                ? outputsState.status === "loaded" ? outputsState.stdout : ""
+                : decodeB64Text(r?.stdout_b64);
+              const stderrText = r?.outputs
+                ? outputsState.status === "loaded" ? outputsState.stderr : ""
+                : decodeB64Text(r?.stderr_b64);
+              const stdoutTruncated = r?.outputs ? Boolean(r.outputs.stdout?.truncated) : Boolean(r?.stdout_truncated);
 
               const inputMeta =
                 previewState.status === "loaded" && previewState.data.input.truncated ? (
@@ -362,7 +452,7 @@ export function JobTestsPanel({
                     {previewState.data.expected.missing ? "缺失" : "已截断"}
                   </span>
                 ) : null;
-              const actualMeta = r?.stdout_truncated ? (
+              const actualMeta = stdoutTruncated ? (
                 <span className="inline-flex items-center rounded-full px-2 py-0.5 text-[10px] font-semibold bg-white/70 border border-black/5 text-slate-600">
                   已截断
                 </span>
@@ -380,7 +470,9 @@ export function JobTestsPanel({
                   ].join(" ")}
                   onToggle={(e) => {
                     const el = e.currentTarget;
-                    if (el.open) ensurePreviewLoaded(tc);
+                    if (!el.open) return;
+                    ensurePreviewLoaded(tc);
+                    ensureOutputsLoaded(key, r);
                   }}
                 >
                   <summary className="list-none cursor-pointer px-3 py-2.5 flex items-center justify-between gap-2">
@@ -414,6 +506,13 @@ export function JobTestsPanel({
                     ) : previewState.status === "loading" ? (
                       <div className="text-[11px] text-slate-500">正在读取样例…</div>
                     ) : null}
+                    {outputsState.status === "error" ? (
+                      <div className="text-[11px] text-rose-700 bg-rose-50 border border-rose-200 rounded-md px-2 py-1">
+                        读取程序输出失败：{outputsState.message}
+                      </div>
+                    ) : outputsState.status === "loading" ? (
+                      <div className="text-[11px] text-slate-500">正在读取程序输出…</div>
+                    ) : null}
 
                     <Block title="Input" text={inputText} meta={inputMeta} className={[frame.blockBg, frame.blockBorder].join(" ")} />
 
@@ -6,7 +6,16 @@
 import React, { useCallback, useEffect, useMemo, useRef, useState } from "react";
 import { getErrorMessage } from "@/lib/api";
 import { getMcpClient } from "@/lib/mcp";
-import type { JobRun, JobState, JobTestMeta, Message, PromptData, ReportArtifact, SolutionArtifact } from "../types";
+import type {
+  JobRun,
+  JobState,
+  JobTestMeta,
+  Message,
+  PromptData,
+  ReportArtifact,
+  SolutionArtifact,
+  TestResultLine,
+} from "../types";
 import type { CockpitControllerArgs } from "./controllerTypes";
 import { resetStreamsForJob } from "./streamReset";
 import { syncHomeUrl, syncJobUrl } from "./urlSync";
@@ -25,6 +34,7 @@ export function useCockpitController(args: CockpitControllerArgs) {
   const [job, setJob] = useState<JobState | null>(null);
   const [mainCpp, setMainCpp] = useState<string | null>(null);
   const [report, setReport] = useState<ReportArtifact | null>(null);
+  const [liveResults, setLiveResults] = useState<TestResultLine[]>([]);
   const [jobTests, setJobTests] = useState<JobTestMeta[] | null>(null);
   const [jobTestsError, setJobTestsError] = useState<string | null>(null);
   const [solution, setSolution] = useState<SolutionArtifact | null>(null);
@@ -104,6 +114,7 @@ export function useCockpitController(args: CockpitControllerArgs) {
     if (!activeJobId) return;
     setMainCpp(null);
     setReport(null);
+    setLiveResults([]);
     setSolution(null);
     setJob(null);
     setCodeView("final");
@@ -118,7 +129,15 @@ export function useCockpitController(args: CockpitControllerArgs) {
     setJobTestsError: (v) => setJobTestsError(v),
   });
 
-  useMcpSubscription({ activeJobId, pushAgentStatusStream, pushTerminalTokenStream, streamRefs });
+  const pushTestResult = useCallback(
+    (jobId: string, line: TestResultLine) => {
+      if (jobId !== activeJobId) return;
+      setLiveResults((prev) => [...prev, line]);
+    },
+    [activeJobId]
+  );
+
+  useMcpSubscription({ activeJobId, pushAgentStatusStream, pushTerminalTokenStream, pushTestResult, streamRefs });
 
   useJobPolling({
     activeJobId,
@@ -170,6 +189,7 @@ export function useCockpitController(args: CockpitControllerArgs) {
       diffText,
       hasDiff,
       report,
+      liveResults,
 
       jobTests,
       jobTestsError,
@@ -202,6 +222,7 @@ export function useCockpitController(args: CockpitControllerArgs) {
       job?.reasoning_effort,
       jobTests,
       jobTestsError,
+      liveResults,
       mainCpp,
       report,
       sendMessage,
@@ -1,10 +1,11 @@
 // AUTO_COMMENT_HEADER_V1: useMcpSubscription.ts
-// 说明：Cockpit MCP 订阅（job.subscribe → agent_status / terminal 通知）。
+// 说明：Cockpit MCP 订阅（job.subscribe → agent_status / terminal / test_results 通知）。
 
 "use client";
 
 import { useEffect } from "react";
 import { getMcpClient } from "@/lib/mcp";
+import type { TestResultLine } from "../types";
 import type { AgentStatusLine } from "./agentLive";
 import { b64ToBytes } from "./encoding";
 import type { StreamRefs } from "./controllerTypes";
@@ -13,9 +14,10 @@ export function useMcpSubscription(args: {
   activeJobId: string | null;
   pushAgentStatusStream: (jobId: string, line: AgentStatusLine) => void;
   pushTerminalTokenStream: (jobId: string, chunkText: string) => void;
+  pushTestResult: (jobId: string, line: TestResultLine) => void;
   streamRefs: StreamRefs;
 }) {
-  const { activeJobId, pushAgentStatusStream, pushTerminalTokenStream, streamRefs } = args;
+  const { activeJobId, pushAgentStatusStream, pushTerminalTokenStream, pushTestResult, streamRefs } = args;
 
   useEffect(() => {
     if (!activeJobId) return;
@@ -23,6 +25,7 @@ export function useMcpSubscription(args: {
     const decoder = new TextDecoder();
     let agentOffset = 0;
     let terminalOffset = 0;
+    let testResultsOffset = 0;
 
     const client = getMcpClient();
     const unsubscribe = client.onNotification((method, params) => {
@@ -49,6 +52,16 @@ export function useMcpSubscription(args: {
         return;
       }
 
+      if (method === "test_results") {
+        const nextOffset = Number(payload["offset"]);
+        // offset 是该行结束位置：重连后从 testResultsOffset 续读，重复的行直接丢弃。
+        if (!Number.isFinite(nextOffset) || nextOffset <= testResultsOffset) return;
+        testResultsOffset = nextOffset;
+        const item = payload["item"];
+        if (item && typeof item === "object") pushTestResult(activeJobId, item as TestResultLine);
+        return;
+      }
+
       if (method === "terminal") {
         try {
           const nextOffset = Number(payload["offset"]);
@@ -56,7 +69,9 @@ export function useMcpSubscription(args: {
             terminalOffset = nextOffset;
           }
           if (streamRefs.hasAgentStatusEventRef.current[activeJobId]) return;
-          const bytes = b64ToBytes(String(payload["chunk_b64"] ?? ""));
+          // 协商了二进制帧时 lib/mcp 直接给出原始字节，否则为 chunk_b64。
+          const raw = payload["chunk"];
+          const bytes = raw instanceof Uint8Array ? raw : b64ToBytes(String(payload["chunk_b64"] ?? ""));
           const chunkText = decoder.decode(bytes);
           pushTerminalTokenStream(activeJobId, chunkText);
         } catch {
@@ -70,9 +85,10 @@ export function useMcpSubscription(args: {
         try {
           await client.callTool("job.subscribe", {
             job_id: activeJobId,
-            streams: ["agent_status", "terminal"],
+            streams: ["agent_status", "terminal", "test_results"],
             agent_status_offset: agentOffset,
             terminal_offset: terminalOffset,
+            test_results_offset: testResultsOffset,
           });
           await client.waitForDisconnect();
         } catch {
@@ -87,6 +103,6 @@ export function useMcpSubscription(args: {
       unsubscribe();
       client.callTool("job.unsubscribe", { job_id: activeJobId }).catch(() => null);
     };
-  }, [activeJobId, pushAgentStatusStream, pushTerminalTokenStream, streamRefs]);
+  }, [activeJobId, pushAgentStatusStream, pushTerminalTokenStream, pushTestResult, streamRefs]);
 }
 
@@ -90,6 +90,36 @@ export type SolutionArtifact = {
   complexity?: string;
 };
 
+// output/test_results.jsonl 的一行（MCP `test_results` 通知），每个 case 结束时推送。
+export type TestResultLine = {
+  ts?: string;
+  attempt?: number;
+  done?: number;
+  total?: number;
+  name?: string;
+  group?: string;
+  verdict?: string;
+  time_ms?: number;
+  cpu_time_ms?: number | null;
+  memory_kb?: number | null;
+  message?: string;
+};
+
+export type ReportOutputRange = {
+  offset?: number;
+  length?: number;
+  truncated?: boolean;
+};
+
+export type ArtifactRange = {
+  name?: string;
+  offset?: number;
+  length?: number;
+  size?: number;
+  eof?: boolean;
+  data_b64?: string;
+};
+
 export type ReportArtifact = {
   schema_version?: string;
   job_id?: string;
@@ -124,7 +154,13 @@ export type ReportArtifact = {
 	    timeout?: boolean;
 	    output_limit_exceeded?: boolean;
 	    time_ms?: number;
+	    cpu_time_ms?: number | null;
 	    memory_kb?: number | null;
+	    context_switches?: { voluntary?: number | null; involuntary?: number | null } | null;
+	    major_faults?: number | null;
+	    // report.v2: byte ranges in report.outputs.bin (fetched on demand via job.read_artifact_range).
+	    outputs?: { stdout?: ReportOutputRange; stderr?: ReportOutputRange } | null;
+	    // report.v1: outputs inlined as base64.
 	    stdout_b64?: string;
 	    stderr_b64?: string;
 	    stdout_truncated?: boolean;
@@ -144,9 +180,11 @@ export type ReportArtifact = {
     passed?: number;
     failed?: number;
     skipped?: number;
+    not_run?: number;
     first_failure?: string | null;
     first_failure_verdict?: string | null;
     first_failure_message?: string | null;
   };
+  outputs?: { name?: string; bytes?: number } | null;
   error?: unknown;
 };
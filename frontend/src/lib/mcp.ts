@@ -21,6 +21,28 @@ type PendingRequest = {
 
 type NotificationHandler = (method: string, params: unknown) => void;
 
+// 二进制帧（initialize 协商 capabilities.binary_frames）：
+// version u8 | stream u8 | job_id_len u16 | claim_id_len u16 | request_id u32 | offset u64 | job_id | claim_id | payload
+const BINARY_FRAME_HEADER_BYTES = 18;
+const BINARY_STREAMS: Record<number, string> = { 1: "terminal", 2: "agent_status", 3: "test_results" };
+
+// 转成与 JSON 通知相同的 (method, params)：offset 为结束位置，原始字节放在 `chunk`（替代 chunk_b64）。
+function decodeBinaryFrame(buf: ArrayBuffer): { method: string; params: Record<string, unknown> } | null {
+  if (buf.byteLength < BINARY_FRAME_HEADER_BYTES) return null;
+  const view = new DataView(buf);
+  const method = BINARY_STREAMS[view.getUint8(1)];
+  if (view.getUint8(0) !== 1 || !method) return null;
+  const jobLen = view.getUint16(2);
+  const claimLen = view.getUint16(4);
+  const start = Number(view.getBigUint64(10));
+  const jobStart = BINARY_FRAME_HEADER_BYTES;
+  const payloadStart = jobStart + jobLen + claimLen;
+  if (buf.byteLength < payloadStart) return null;
+  const jobId = new TextDecoder().decode(new Uint8Array(buf, jobStart, jobLen));
+  const chunk = new Uint8Array(buf, payloadStart);
+  return { method, params: { job_id: jobId, offset: start + chunk.byteLength, chunk } };
+}
+
 function buildMcpWsUrl(): string {
   const httpUrl = new URL(API_BASE);
   httpUrl.pathname = `${httpUrl.pathname.replace(/\/$/, "")}/mcp/ws`;
@@ -72,8 +94,25 @@ export class McpWsClient {
     }
   }
 
+  private dispatchNotification(method: string, params: unknown): void {
+    for (const handler of Array.from(this.notificationHandlers)) {
+      try {
+        handler(method, params);
+      } catch {
+        // ignore
+      }
+    }
+  }
+
   private attachWs(ws: WebSocket, onClose?: () => void): void {
+    ws.binaryType = "arraybuffer";
     ws.onmessage = (ev) => {
+      if (ev.data instanceof ArrayBuffer) {
+        const frame = decodeBinaryFrame(ev.data);
+        if (frame) this.dispatchNotification(frame.method, frame.params);
+        return;
+      }
+
       let msg: unknown;
       try {
         msg = JSON.parse(String(ev.data));
@@ -90,15 +129,17 @@ export class McpWsClient {
         return;
       }
 
-      if (isRecord(msg) && typeof msg.method === "string") {
-        const params = msg.params;
-        for (const handler of Array.from(this.notificationHandlers)) {
-          try {
-            handler(msg.method, params);
-          } catch {
-            // ignore
-          }
+      // notifications/batch（initialize 协商）：按原顺序拆成单条通知，订阅方无需感知批量。
+      if (isRecord(msg) && msg.method === "notifications/batch") {
+        const items = isRecord(msg.params) && Array.isArray(msg.params.items) ? msg.params.items : [];
+        for (const item of items) {
+          if (isRecord(item) && typeof item.method === "string") this.dispatchNotification(item.method, item.params);
         }
+        return;
+      }
+
+      if (isRecord(msg) && typeof msg.method === "string") {
+        this.dispatchNotification(msg.method, msg.params);
       }
     };
 
@@ -152,7 +193,7 @@ export class McpWsClient {
 
       ws.onopen = async () => {
         try {
-          await this.requestRaw("initialize", {});
+          await this.requestRaw("initialize", { capabilities: { binary_frames: true, notification_batch: true } });
           settled = true;
           resolve();
         } catch (e) {
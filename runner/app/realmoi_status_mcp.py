@@ -292,6 +292,10 @@ def run_self_test_process(*, temp_root: Path, work_dir: Path, timeout_seconds: i
             "REALMOI_WORK_DIR": str(work_dir.resolve()),
         }
     )
+    # 编译缓存放在真实 job 目录下（临时目录会被删除），只供后续 self-test 复用。
+    # job 目录 agent 可写，最终 test 不读取它（见 runner_compile_cache）；`off` 时整体关闭。
+    if str(os.environ.get("REALMOI_COMPILE_CACHE_DIR") or "").strip().lower() != "off":
+        environment["REALMOI_COMPILE_CACHE_DIR"] = str(job_path(".compile_cache").resolve())
     return subprocess.run(  # noqa: S603
         command,
         capture_output=True,
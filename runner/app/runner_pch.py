@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+# Precompiled `<bits/stdc++.h>` for runner_test.compile_cpp.
+#
+# - layout: `<pch_dir>/bits/stdc++.h.gch` + `<pch_dir>/pch.json` (compiler version + flags it was built with)
+# - compile_cpp adds `-I <pch_dir>` only when `pch.json` matches the current compiler and flags;
+#   g++ then picks up the `.gch` when it resolves `#include <bits/stdc++.h>`
+# - fallback is g++'s own: if the PCH is unusable for a source (other includes/macros first, ABI
+#   mismatch), g++ skips it and keeps searching the normal include path, so results never change
+# - built into the runner image (`python3 /app/runner_pch.py`); `REALMOI_PCH_DIR=off` disables
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from runner_compile_cache import compiler_version
+
+
+DEFAULT_PCH_DIR = "/opt/realmoi/pch"
+PCH_HEADER = "bits/stdc++.h"
+STAMP_NAME = "pch.json"
+
+
+def resolve_pch_dir() -> Path | None:
+    raw = str(os.environ.get("REALMOI_PCH_DIR") or "").strip()
+    if raw.lower() in ("off", "0", "false", "none"):
+        return None
+    return Path(raw or DEFAULT_PCH_DIR)
+
+
+def build_stamp(*, compiler: str, flags: list[str]) -> dict[str, object]:
+    return {"header": PCH_HEADER, "compiler": compiler_version(compiler), "flags": list(flags)}
+
+
+def pch_flags(*, compiler: str, flags: list[str]) -> list[str]:
+    """Extra g++ args to use the PCH, or [] when it is missing / built for other flags."""
+
+    pch_dir = resolve_pch_dir()
+    if pch_dir is None or not (pch_dir / f"{PCH_HEADER}.gch").is_file():
+        return []
+    try:
+        stamp = json.loads((pch_dir / STAMP_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    if stamp != build_stamp(compiler=compiler, flags=flags):
+        return []
+    return ["-I", str(pch_dir)]
+
+
+def build_pch(*, pch_dir: Path, compiler: str, flags: list[str]) -> subprocess.CompletedProcess[bytes]:
+    # g++ only uses a .gch compiled with the same options, so build with exactly `flags`.
+    gch_path = pch_dir / f"{PCH_HEADER}.gch"
+    gch_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="realmoi-pch-") as tmp:
+        header = Path(tmp) / "stdc++.h"
+        header.write_text(f"#include <{PCH_HEADER}>\n", encoding="utf-8")
+        tmp_gch = Path(tmp) / "stdc++.h.gch"
+        cp = subprocess.run([compiler, *flags, "-x", "c++-header", str(header), "-o", str(tmp_gch)], capture_output=True)
+        if cp.returncode != 0:
+            return cp
+        shutil.move(str(tmp_gch), str(gch_path))
+    stamp = build_stamp(compiler=compiler, flags=flags)
+    (pch_dir / STAMP_NAME).write_text(json.dumps(stamp, ensure_ascii=False) + "\n", encoding="utf-8")
+    return cp
+
+
+def main() -> int:
+    from runner_test import CXX, CXX_FLAGS  # noqa: WPS433
+
+    pch_dir = resolve_pch_dir()
+    if pch_dir is None:
+        print("[pch] disabled (REALMOI_PCH_DIR=off)")
+        return 0
+    cp = build_pch(pch_dir=pch_dir, compiler=CXX, flags=CXX_FLAGS)
+    if cp.returncode != 0:
+        sys.stderr.write(cp.stderr.decode("utf-8", errors="replace"))
+        return int(cp.returncode)
+    print(f"[pch] built {pch_dir / PCH_HEADER}.gch for {' '.join(CXX_FLAGS)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
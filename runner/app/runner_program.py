@@ -6,18 +6,42 @@ from __future__ import annotations
 # runner entrypoints (test/generate/etc.) without creating a single mega-file.
 
 import os
+import secrets
 import selectors
 import signal
+import struct
 import subprocess
+import tempfile
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Protocol
 
 
-def setsid_preexec() -> None:
-    # Start program in a dedicated process group so we can SIGKILL the group on timeout/OLE.
-    os.setsid()
+STDIN_CHUNK_BYTES = 65536
+READ_CHUNK_BYTES = 65536
+# stdout beyond this many bytes is spilled to a temp file under the case work_dir.
+STDOUT_SPILL_BYTES = 4 * 1024 * 1024
+
+# Memory limit: the program is started through `sh`, which joins a per-case cgroup v2 (when
+# REALMOI_CGROUP_DIR points to a delegated cgroup with the memory controller enabled for children)
+# or else applies RLIMIT_DATA, then execs the program — both take effect before the program runs
+# and without a preexec_fn (cases run on worker threads).
+SHELL = "/bin/sh"
+MEMORY_WRAPPER = 'if [ -z "$1" ] || ! echo $$ > "$1" 2>/dev/null; then ulimit -d "$2" 2>/dev/null; fi; exec "$0"'
+# libstdc++ terminate message for an uncaught allocation failure (the program then aborts).
+BAD_ALLOC_TERMINATE = b"terminate called after throwing an instance of 'std::bad_alloc'"
+# memory.events of the cgroup the runner itself lives in (the test container under docker):
+# an `oom_kill` increase during a case confirms that a SIGKILL came from the OOM killer.
+CONTAINER_MEMORY_EVENTS = Path("/sys/fs/cgroup/memory.events")
+
+# Longest selector wait: bounds how late CPU-time polling and the wall deadline are noticed.
+POLL_INTERVAL_S = 0.05
+# Without pidfd (non-Linux / old kernels) exit is detected by polling at this interval.
+REAP_POLL_S = 0.002
+
+# TLE rule: "cpu" judges user+sys CPU time (wall clock only as a hard cap), "wall" judges wall time.
+TIME_MODES = ("cpu", "wall")
 
 
 @dataclass
@@ -27,30 +51,137 @@ class RunProgramState:
     exit_code: int | None = None
     signal_no: int | None = None
     peak_rss_kb: int | None = None
+    cpu_time_ms: int | None = None
+    voluntary_ctx_switches: int | None = None
+    involuntary_ctx_switches: int | None = None
+    major_faults: int | None = None
     timeout: bool = False
     output_limit_exceeded: bool = False
+    wrong_answer: bool = False
+    memory_limit_exceeded: bool = False
     reap_error: str | None = None
 
 
+class StreamMatcher(Protocol):
+    # Incremental stdout checker (see runner_test_compare): `mismatched` once WA is proven.
+    @property
+    def mismatched(self) -> bool: ...
+
+    @property
+    def needs_more(self) -> bool: ...
+
+    def feed(self, chunk: bytes) -> None: ...
+
+
+class OutputSink:
+    """Captured stream: in memory up to `spill_bytes`, then appended to a temp file in `spill_dir`.
+
+    `head` always holds the first `spill_bytes` bytes (enough for report previews); the full
+    content is `head` alone, or the spill file when `path` is set.
+    """
+
+    def __init__(self, *, spill_bytes: int | None = None, spill_dir: Path | None = None):
+        self.head = bytearray()
+        self.size = 0
+        self.path: Path | None = None
+        self._spill_bytes = spill_bytes
+        self._spill_dir = spill_dir
+        self._file: BinaryIO | None = None
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self._file is not None:
+            self._file.write(data)
+            return
+        self.head.extend(data)
+        if self._spill_bytes is None or self._spill_dir is None or len(self.head) <= self._spill_bytes:
+            return
+        fd, name = tempfile.mkstemp(prefix="stdout-", dir=str(self._spill_dir))
+        self._file = os.fdopen(fd, "wb")
+        self.path = Path(name)
+        self._file.write(self.head)
+        del self.head[self._spill_bytes :]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StdinPump:
+    """Feed the child's stdin incrementally from the selector loop (non-blocking writes).
+
+    The source is either in-memory bytes or a file streamed in chunks, so large inputs are
+    never loaded whole and a child that writes before it finishes reading cannot deadlock us.
+    """
+
+    def __init__(self, proc: subprocess.Popen[bytes], *, input_bytes: bytes = b"", input_path: Path | None = None):
+        assert proc.stdin
+        self.stdin = proc.stdin
+        self.fd = proc.stdin.fileno()
+        os.set_blocking(self.fd, False)
+        self._file: BinaryIO | None = input_path.open("rb") if input_path is not None else None
+        self._pending = memoryview(b"") if self._file is not None else memoryview(input_bytes)
+        self.closed = False
+
+    def _refill(self) -> bool:
+        if self._pending:
+            return True
+        if self._file is None:
+            return False
+        chunk = self._file.read(STDIN_CHUNK_BYTES)
+        self._pending = memoryview(chunk)
+        return bool(chunk)
+
+    def on_writable(self) -> bool:
+        """Write what the pipe accepts; returns False once stdin is closed (EOF or child gone)."""
+
+        while self._refill():
+            try:
+                n = os.write(self.fd, self._pending[:STDIN_CHUNK_BYTES])
+            except BlockingIOError:
+                return True
+            except (BrokenPipeError, OSError):
+                break
+            self._pending = self._pending[n:]
+        self.close()
+        return False
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        if self._file is not None:
+            self._file.close()
+        try:
+            self.stdin.close()
+        except OSError:
+            pass
+
+
 @dataclass(frozen=True)
 class DrainReadyStreamsArgs:
     sel: selectors.BaseSelector
     proc: subprocess.Popen[bytes]
-    stdout: bytearray
-    stderr: bytearray
+    stdin: StdinPump
+    stdout: OutputSink
+    stderr: OutputSink
     output_limit_bytes: int
     state: RunProgramState
+    matcher: StreamMatcher | None = None
 
 
-def kill_process_group(proc: subprocess.Popen[bytes]) -> None:
+def kill_process_group(proc: subprocess.Popen[bytes]) -> bool:
     # Best-effort: prefer killing the process group; fall back to proc.kill().
+    # Returns False when nothing was left to kill.
     try:
         os.killpg(proc.pid, signal.SIGKILL)
     except ProcessLookupError:
         # Process already exited.
-        return
+        return False
     except PermissionError:
         proc.kill()
+    return True
 
 
 def extract_peak_rss_kb(ru: Any) -> int:
@@ -68,6 +199,41 @@ def extract_peak_rss_kb(ru: Any) -> int:
     return max(0, maxrss)
 
 
+def record_rusage(state: RunProgramState, ru: Any) -> None:
+    state.peak_rss_kb = extract_peak_rss_kb(ru)
+    state.cpu_time_ms = int((float(getattr(ru, "ru_utime", 0) or 0) + float(getattr(ru, "ru_stime", 0) or 0)) * 1000)
+    state.voluntary_ctx_switches = int(getattr(ru, "ru_nvcsw", 0) or 0)
+    state.involuntary_ctx_switches = int(getattr(ru, "ru_nivcsw", 0) or 0)
+    state.major_faults = int(getattr(ru, "ru_majflt", 0) or 0)
+
+
+def resolve_wall_limit_ms(*, time_limit_ms: int, time_mode: str, wall_limit_ms: int | None) -> int:
+    # cpu mode: wall clock is only a hard cap (default 2x the limit, at least +1s) against
+    # programs that sleep or block.
+    if time_mode != "cpu":
+        return int(time_limit_ms)
+    if wall_limit_ms:
+        return max(int(wall_limit_ms), int(time_limit_ms))
+    return max(2 * int(time_limit_ms), int(time_limit_ms) + 1000)
+
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def read_proc_cpu_ms(pid: int) -> int | None:
+    # utime + stime of a running process from /proc/<pid>/stat (Linux only; None elsewhere).
+    try:
+        raw = Path(f"/proc/{pid}/stat").read_bytes()
+    except OSError:
+        return None
+    fields = raw[raw.rfind(b")") + 2 :].split()
+    try:
+        ticks = int(fields[11]) + int(fields[12])
+    except (IndexError, ValueError):
+        return None
+    return ticks * 1000 // _CLK_TCK
+
+
 def try_reap_nohang(proc: subprocess.Popen[bytes], state: RunProgramState) -> None:
     # Read exit status and ru_maxrss (Linux) without blocking.
     if state.reaped:
@@ -96,7 +262,7 @@ def try_reap_nohang(proc: subprocess.Popen[bytes], state: RunProgramState) -> No
         state.exit_code = -int(state.signal_no)
     else:
         state.exit_code = 0
-    state.peak_rss_kb = extract_peak_rss_kb(ru)
+    record_rusage(state, ru)
 
 
 def reap_blocking(proc: subprocess.Popen[bytes], state: RunProgramState) -> None:
@@ -112,7 +278,7 @@ def reap_blocking(proc: subprocess.Popen[bytes], state: RunProgramState) -> None
             state.exit_code = -int(state.signal_no)
         else:
             state.exit_code = 0
-        state.peak_rss_kb = extract_peak_rss_kb(ru)
+        record_rusage(state, ru)
     except (ChildProcessError, OSError) as e:
         state.reap_error = str(e)
         try:
@@ -124,128 +290,416 @@ def reap_blocking(proc: subprocess.Popen[bytes], state: RunProgramState) -> None
         state.reaped = True
 
 
-def spawn_program(exe_path: Path, *, work_dir: Path) -> subprocess.Popen[bytes]:
+def pin_to_cpu(pid: int, cpu: int | None) -> None:
+    # Best-effort: pin the program to one core so parallel cases do not disturb each other's timing.
+    if cpu is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(pid, {int(cpu)})
+    except (OSError, ValueError):
+        return
+
+
+def read_oom_kills(path: Path) -> int | None:
+    # `oom_kill` counter of a cgroup v2 memory.events file; None when unavailable.
+    try:
+        lines = path.read_text(encoding="ascii").splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        key, _, value = line.partition(" ")
+        if key == "oom_kill":
+            try:
+                return int(value.strip() or 0)
+            except ValueError:
+                return None
+    return None
+
+
+class CaseCgroup:
+    """Per-case cgroup v2 child with `memory.max` (swap disabled); removed after the run."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def create(cls, *, limit_bytes: int) -> "CaseCgroup | None":
+        base = str(os.environ.get("REALMOI_CGROUP_DIR") or "").strip()
+        if not base:
+            return None
+        path = Path(base) / f"case-{secrets.token_hex(6)}"
+        try:
+            path.mkdir()
+        except OSError:
+            return None
+        try:
+            (path / "memory.max").write_text(str(limit_bytes), encoding="ascii")
+        except OSError:
+            cls(path).remove()
+            return None
+        try:
+            (path / "memory.swap.max").write_text("0", encoding="ascii")
+        except OSError:
+            pass
+        return cls(path)
+
+    @property
+    def procs_path(self) -> Path:
+        return self.path / "cgroup.procs"
+
+    def peak_kb(self) -> int | None:
+        # memory.peak (kernel >= 5.19) is exact; older kernels fall back to ru_maxrss.
+        try:
+            return int((self.path / "memory.peak").read_text(encoding="ascii").strip()) // 1024
+        except (OSError, ValueError):
+            return None
+
+    def oom_killed(self) -> bool:
+        return bool(read_oom_kills(self.path / "memory.events"))
+
+    def remove(self) -> None:
+        try:
+            self.path.rmdir()
+        except OSError:
+            pass
+
+
+def build_command(exe_path: Path, *, memory_limit_kb: int | None, cgroup: CaseCgroup | None) -> list[str]:
+    if memory_limit_kb is None or not os.path.exists(SHELL):
+        return [str(exe_path)]
+    procs = str(cgroup.procs_path) if cgroup is not None else ""
+    return [SHELL, "-c", MEMORY_WRAPPER, str(exe_path), procs, str(memory_limit_kb)]
+
+
+def spawn_program(
+    exe_path: Path,
+    *,
+    work_dir: Path,
+    cpu: int | None = None,
+    memory_limit_kb: int | None = None,
+    cgroup: CaseCgroup | None = None,
+) -> subprocess.Popen[bytes]:
+    # start_new_session: dedicated process group so we can SIGKILL the group on timeout/OLE.
+    # (setsid runs inside the C fork/exec path, so this is safe when cases run on worker threads.)
     proc = subprocess.Popen(
-        [str(exe_path)],
+        build_command(exe_path, memory_limit_kb=memory_limit_kb, cgroup=cgroup),
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         cwd=str(work_dir),
-        preexec_fn=setsid_preexec,
+        start_new_session=True,
     )
     assert proc.stdin and proc.stdout and proc.stderr
+    pin_to_cpu(proc.pid, cpu)
     return proc
 
 
-def feed_stdin(proc: subprocess.Popen[bytes], input_bytes: bytes) -> None:
-    assert proc.stdin
-    written = proc.stdin.write(input_bytes)
-    if written is None:
-        raise RuntimeError("stdin_write_failed")
-    if written != len(input_bytes):
-        remaining = memoryview(input_bytes)[written:]
-        while remaining:
-            n = proc.stdin.write(remaining)
-            if not isinstance(n, int) or n <= 0:
-                break
-            remaining = remaining[n:]
-    proc.stdin.flush()
-    close_result = proc.stdin.close()
-    if close_result is not None:
-        _ = close_result
+def open_exit_fd(pid: int) -> int | None:
+    # pidfd becomes readable when the process exits, so the selector wakes up right away instead
+    # of noticing the exit on the next poll (this used to add ~20 ms to every case).
+    if not hasattr(os, "pidfd_open"):
+        return None
+    try:
+        return os.pidfd_open(pid)
+    except OSError:
+        return None
 
 
-def init_selector(proc: subprocess.Popen[bytes]) -> selectors.BaseSelector:
+def init_selector(proc: subprocess.Popen[bytes], pump: StdinPump, exit_fd: int | None = None) -> selectors.BaseSelector:
     assert proc.stdout and proc.stderr
     sel = selectors.DefaultSelector()
     _ = sel.register(proc.stdout, selectors.EVENT_READ, data="stdout")
     _ = sel.register(proc.stderr, selectors.EVENT_READ, data="stderr")
+    if pump.on_writable():
+        _ = sel.register(pump.fd, selectors.EVENT_WRITE, data="stdin")
+    if exit_fd is not None:
+        _ = sel.register(exit_fd, selectors.EVENT_READ, data="exit")
     return sel
 
 
-def enforce_deadline(proc: subprocess.Popen[bytes], state: RunProgramState, *, now: float, deadline: float) -> None:
-    if now < deadline:
+def enforce_deadline(
+    proc: subprocess.Popen[bytes],
+    state: RunProgramState,
+    *,
+    now: float,
+    deadline: float,
+    cpu_limit_ms: int | None = None,
+) -> None:
+    if state.wrong_answer or state.output_limit_exceeded:
         return
     if state.reaped:
+        # 主进程已退出，但 fork 出的子进程仍持有 stdout/stderr：过了 deadline 就杀整个进程组
+        # （组在 leader 退出后仍存在），否则只能等子进程自己退出。
+        if now >= deadline and kill_process_group(proc):
+            state.timeout = True
         return
+    if now < deadline:
+        if cpu_limit_ms is None:
+            return
+        cpu_ms = read_proc_cpu_ms(proc.pid)
+        if cpu_ms is None or cpu_ms <= cpu_limit_ms:
+            return
     state.timeout = True
     kill_process_group(proc)
     try_reap_nohang(proc, state)
 
 
-def drain_ready_streams(args: DrainReadyStreamsArgs) -> None:
+def drain_ready_streams(args: DrainReadyStreamsArgs, *, timeout: float = POLL_INTERVAL_S) -> None:
     if not args.sel.get_map():
         return
-    events = args.sel.select(timeout=0.05)
+    events = args.sel.select(timeout=timeout)
     for key, _mask in events:
         stream_name = key.data
-        data = key.fileobj.read1(4096)  # type: ignore[attr-defined]
+        if stream_name == "exit":
+            args.sel.unregister(key.fileobj)
+            try_reap_nohang(args.proc, args.state)
+            continue
+        if stream_name == "stdin":
+            if not args.stdin.on_writable():
+                args.sel.unregister(key.fileobj)
+            continue
+        data = key.fileobj.read1(READ_CHUNK_BYTES)  # type: ignore[attr-defined]
         if not data:
             args.sel.unregister(key.fileobj)
             continue
         if stream_name == "stdout":
-            args.stdout.extend(data)
+            args.stdout.write(data)
+            if feed_matcher(args, data):
+                return
         else:
-            args.stderr.extend(data)
+            args.stderr.write(data)
 
-        if len(args.stdout) + len(args.stderr) > args.output_limit_bytes and not args.state.reaped:
+        if args.stdout.size + args.stderr.size > args.output_limit_bytes and not args.state.reaped:
             args.state.output_limit_exceeded = True
             kill_process_group(args.proc)
             try_reap_nohang(args.proc, args.state)
             return
 
 
+def feed_matcher(args: DrainReadyStreamsArgs, data: bytes) -> bool:
+    # Early WA: kill the program as soon as its output is proven wrong (returns True when killed).
+    matcher = args.matcher
+    if matcher is None or not matcher.needs_more:
+        return False
+    matcher.feed(data)
+    if not matcher.mismatched or args.state.reaped or args.state.wrong_answer:
+        return False
+    args.state.wrong_answer = True
+    kill_process_group(args.proc)
+    try_reap_nohang(args.proc, args.state)
+    return True
+
+
+def static_memory_kb(exe_path: Path) -> int | None:
+    """Size of the writable PT_LOAD segments (data + bss) of an ELF executable; None if not ELF."""
+    try:
+        with exe_path.open("rb") as f:
+            header = f.read(64)
+            if header[:4] != b"\x7fELF" or len(header) < 52:
+                return None
+            is64 = header[4] == 2
+            endian = "<" if header[5] == 1 else ">"
+            if is64:
+                (phoff,) = struct.unpack_from(endian + "Q", header, 0x20)
+                phentsize, phnum = struct.unpack_from(endian + "HH", header, 0x36)
+            else:
+                (phoff,) = struct.unpack_from(endian + "I", header, 0x1C)
+                phentsize, phnum = struct.unpack_from(endian + "HH", header, 0x2A)
+            f.seek(phoff)
+            table = f.read(phentsize * phnum)
+        total = 0
+        for i in range(phnum):
+            off = i * phentsize
+            if is64:
+                p_type, p_flags = struct.unpack_from(endian + "II", table, off)
+                (p_memsz,) = struct.unpack_from(endian + "Q", table, off + 0x28)
+            else:
+                (p_type,) = struct.unpack_from(endian + "I", table, off)
+                p_memsz, p_flags = struct.unpack_from(endian + "II", table, off + 0x14)
+            if p_type == 1 and p_flags & 0x2:  # PT_LOAD, PF_W
+                total += p_memsz
+    except (OSError, struct.error):
+        return None
+    return total // 1024
+
+
+def memory_exceeded(
+    state: RunProgramState,
+    *,
+    memory_limit_kb: int | None,
+    cgroup: CaseCgroup | None,
+    stderr: bytes,
+    exe_path: Path | None = None,
+    container_oom: bool = False,
+) -> bool:
+    # MLE: cgroup OOM kill / memory.peak over the limit, or a crash caused by a refused allocation.
+    # Kills we sent ourselves (TLE/OLE/early WA) never count. ru_maxrss is not used here: after
+    # fork+exec it can include the parent's RSS, so only the cgroup peak is trusted.
+    # Refused allocation = libstdc++ bad_alloc terminate message + SIGABRT (printing the text and
+    # exiting is RE). SIGKILL counts only when an OOM event confirms it (case cgroup above, or the
+    # runner's own container cgroup: `container_oom`).
+    # RLIMIT_DATA mode: a static/global array over the limit cannot be mapped and the program dies
+    # with SIGSEGV before main(); that is MLE when the binary's data + bss alone exceed the limit.
+    if memory_limit_kb is None or state.timeout or state.output_limit_exceeded or state.wrong_answer:
+        return False
+    if cgroup is not None:
+        peak_kb = cgroup.peak_kb()
+        if cgroup.oom_killed() or (peak_kb is not None and peak_kb > memory_limit_kb):
+            return True
+    if state.exit_code in (None, 0):
+        return False
+    if state.signal_no == signal.SIGABRT and BAD_ALLOC_TERMINATE in stderr:
+        return True
+    if state.signal_no == signal.SIGKILL and container_oom:
+        return True
+    if cgroup is None and exe_path is not None and state.signal_no == signal.SIGSEGV:
+        static_kb = static_memory_kb(exe_path)
+        return static_kb is not None and static_kb > memory_limit_kb
+    return False
+
+
 def run_program(
     *,
     exe_path: Path,
-    input_bytes: bytes,
     time_limit_ms: int,
     output_limit_bytes: int,
     work_dir: Path,
+    input_bytes: bytes = b"",
+    input_path: Path | None = None,
+    cpu: int | None = None,
+    matcher: StreamMatcher | None = None,
+    memory_limit_mb: int | None = None,
+    time_mode: str = "wall",
+    wall_limit_ms: int | None = None,
 ) -> dict[str, Any]:
-    # Run compiled program once with limits and capture output.
-
+    # Run compiled program once with limits and capture output (optionally pinned to `cpu`).
+    # stdin (`input_path` streamed from disk, else `input_bytes`) is written from the same selector
+    # loop that drains stdout/stderr, so large inputs and outputs can flow at the same time.
+    # `stdout` holds at most STDOUT_SPILL_BYTES; beyond that the full output is in `stdout_path`
+    # (a temp file under work_dir that the caller removes).
+    # With `matcher`, stdout is also checked as it arrives and the process group is killed once a
+    # mismatch is proven (`wrong_answer=True`).
+    # `memory_limit_mb` is enforced (cgroup memory.max or RLIMIT_DATA) and reported as
+    # `memory_limit_exceeded`.
+    # time_mode="cpu": TLE when user+sys CPU time exceeds `time_limit_ms` (polled while running and
+    # checked from rusage after exit), with `wall_limit_ms` as a wall-clock hard cap.
+
+    memory_limit_kb = int(memory_limit_mb) * 1024 if memory_limit_mb else None
+    cgroup = CaseCgroup.create(limit_bytes=memory_limit_kb * 1024) if memory_limit_kb else None
+    try:
+        return run_spawned(
+            exe_path=exe_path,
+            time_limit_ms=time_limit_ms,
+            output_limit_bytes=output_limit_bytes,
+            work_dir=work_dir,
+            input_bytes=input_bytes,
+            input_path=input_path,
+            cpu=cpu,
+            matcher=matcher,
+            memory_limit_kb=memory_limit_kb,
+            cgroup=cgroup,
+            time_mode=time_mode if time_mode in TIME_MODES else "wall",
+            wall_limit_ms=wall_limit_ms,
+        )
+    finally:
+        if cgroup is not None:
+            cgroup.remove()
+
+
+def run_spawned(
+    *,
+    exe_path: Path,
+    time_limit_ms: int,
+    output_limit_bytes: int,
+    work_dir: Path,
+    input_bytes: bytes,
+    input_path: Path | None,
+    cpu: int | None,
+    matcher: StreamMatcher | None,
+    memory_limit_kb: int | None,
+    cgroup: CaseCgroup | None,
+    time_mode: str,
+    wall_limit_ms: int | None,
+) -> dict[str, Any]:
+    oom_before = read_oom_kills(CONTAINER_MEMORY_EVENTS) if memory_limit_kb is not None else None
     start = time.monotonic()
-    proc = spawn_program(exe_path, work_dir=work_dir)
-    feed_stdin(proc, input_bytes)
+    proc = spawn_program(exe_path, work_dir=work_dir, cpu=cpu, memory_limit_kb=memory_limit_kb, cgroup=cgroup)
+    pump = StdinPump(proc, input_bytes=input_bytes, input_path=input_path)
+    exit_fd = open_exit_fd(proc.pid)
 
-    sel = init_selector(proc)
+    sel = init_selector(proc, pump, exit_fd)
 
-    stdout = bytearray()
-    stderr = bytearray()
+    stdout = OutputSink(spill_bytes=STDOUT_SPILL_BYTES, spill_dir=work_dir)
+    stderr = OutputSink()
     state = RunProgramState()
     drain_args = DrainReadyStreamsArgs(
         sel=sel,
         proc=proc,
+        stdin=pump,
         stdout=stdout,
         stderr=stderr,
         output_limit_bytes=output_limit_bytes,
         state=state,
+        matcher=matcher,
     )
 
-    deadline = start + (time_limit_ms / 1000.0)
+    cpu_limit_ms = int(time_limit_ms) if time_mode == "cpu" else None
+    wall_ms = resolve_wall_limit_ms(time_limit_ms=time_limit_ms, time_mode=time_mode, wall_limit_ms=wall_limit_ms)
+    deadline = start + (wall_ms / 1000.0)
     while True:
         now = time.monotonic()
         try_reap_nohang(proc, state)
-        enforce_deadline(proc, state, now=now, deadline=deadline)
-        drain_ready_streams(drain_args)
+        enforce_deadline(proc, state, now=now, deadline=deadline, cpu_limit_ms=cpu_limit_ms)
+        # 过了 deadline 也至少等 REAP_POLL_S，不做 select(0) 空转（并行模式下还会抢 GIL）。
+        wait_s = min(POLL_INTERVAL_S, max(REAP_POLL_S, deadline - now))
+        drain_ready_streams(drain_args, timeout=wait_s)
 
         if state.reaped and not sel.get_map():
             break
 
         if not sel.get_map() and not state.reaped:
-            time.sleep(0.02)
+            time.sleep(min(REAP_POLL_S, wait_s))
 
     end = time.monotonic()
+    pump.close()
+    stdout.close()
+    sel.close()
+    if exit_fd is not None:
+        os.close(exit_fd)
     reap_blocking(proc, state)
     if state.exit_code is None:
         state.exit_code = 0
+    over_cpu = cpu_limit_ms is not None and (state.cpu_time_ms or 0) > cpu_limit_ms
+    if over_cpu and not state.wrong_answer and not state.output_limit_exceeded:
+        # Finished between two polls but still over the CPU budget.
+        state.timeout = True
+    if cgroup is not None:
+        state.peak_rss_kb = cgroup.peak_kb() or state.peak_rss_kb
+    state.memory_limit_exceeded = memory_exceeded(
+        state,
+        memory_limit_kb=memory_limit_kb,
+        cgroup=cgroup,
+        stderr=bytes(stderr.head),
+        exe_path=exe_path,
+        container_oom=oom_before is not None and (read_oom_kills(CONTAINER_MEMORY_EVENTS) or 0) > oom_before,
+    )
     return {
         "exit_code": int(state.exit_code),
         "timeout": state.timeout,
         "output_limit_exceeded": state.output_limit_exceeded,
+        "wrong_answer": state.wrong_answer,
+        "memory_limit_exceeded": state.memory_limit_exceeded,
         "time_ms": int((end - start) * 1000),
+        "cpu_time_ms": state.cpu_time_ms,
+        "time_mode": time_mode,
         "memory_kb": state.peak_rss_kb,
-        "stdout": bytes(stdout),
-        "stderr": bytes(stderr),
+        "context_switches": {
+            "voluntary": state.voluntary_ctx_switches,
+            "involuntary": state.involuntary_ctx_switches,
+        },
+        "major_faults": state.major_faults,
+        "stdout": bytes(stdout.head),
+        "stdout_size": stdout.size,
+        "stdout_path": stdout.path,
+        "stderr": bytes(stderr.head),
     }
@@ -4,20 +4,24 @@ from __future__ import annotations
 #
 # Responsibilities:
 # - compile `output/main.cpp`
-# - run against cases under `input/tests/`
-# - write `output/artifacts/attempt_{ATTEMPT}/test_output/report.json`
+# - run against cases under `input/tests/` (repair attempts: previous failures/slowest first)
+# - write `output/artifacts/attempt_{ATTEMPT}/test_output/report.json` (+ `report.outputs.bin` sidecar)
+# - stream one line per finished case to `output/test_results.jsonl` (the only writable
+#   place in the test container)
 
 import os
 import subprocess
 from pathlib import Path
 from typing import Any
 
-from runner_test_cases import load_cases, normalize_compare_mode
+import runner_compile_cache
+import runner_pch
+from runner_test_cases import load_cases, load_previous_report, normalize_compare_mode, prioritize_cases
 from runner_test_fs import job_path, prepare_dirs, read_text, write_json
 from runner_test_models import CompileResult, RunLimits
-from runner_test_report import init_report
+from runner_test_report import OUTPUTS_NAME, OutputsBlob, init_report
 from runner_test_run import run_cases
-from runner_test_status import status_update
+from runner_test_status import CaseResultsLog, status_update
 
 
 def ensure_runner_test_import_path() -> None:
@@ -42,6 +46,17 @@ def parse_attempt_env() -> int:
     return attempt
 
 
+def resolve_fail_fast(job: dict[str, Any]) -> bool:
+    # job.json 开启 fail_fast 时，只有非最终 attempt 才提前停止；
+    # 最终 attempt（backend 传 REALMOI_TEST_FINAL_ATTEMPT=1）或显式 REALMOI_TEST_FULL_RUN=1 始终跑全量。
+    tests = job.get("tests") or {}
+    if not bool(tests.get("fail_fast", False)):
+        return False
+    if os.environ.get("REALMOI_TEST_FINAL_ATTEMPT") == "1":
+        return False
+    return os.environ.get("REALMOI_TEST_FULL_RUN") != "1"
+
+
 def read_job() -> dict[str, Any]:
     raw = read_text(job_path("input", "job.json"))
     try:
@@ -61,21 +76,45 @@ def load_limits(job: dict[str, Any]) -> RunLimits:
         pids_limit=limits.get("pids_limit") or 256,
         max_output_bytes_per_test=int(limits.get("max_output_bytes_per_test") or 1_048_576),
         max_terminal_log_bytes=int(limits.get("max_terminal_log_bytes") or 5_242_880),
+        time_mode="wall" if str(limits.get("time_mode") or "cpu") == "wall" else "cpu",
+        wall_time_limit_ms=int(limits["wall_time_limit_ms"]) if limits.get("wall_time_limit_ms") else None,
     )
 
 
+CXX = "g++"
+CXX_FLAGS = ["-std=c++20", "-O2", "-pipe"]
+
+
 def compile_cpp(*, src_cpp: Path, exe_path: Path) -> CompileResult:
-    compile_cmd = ["g++", "-std=c++20", "-O2", "-pipe", str(src_cpp), "-o", str(exe_path)]
+    # 预编译的 bits/stdc++.h 仅在与当前编译器/参数匹配时加入 include 路径；不改变编译结果，故不计入缓存 key。
+    pch_args = runner_pch.pch_flags(compiler=CXX, flags=CXX_FLAGS)
+    compile_cmd = [CXX, *CXX_FLAGS, *pch_args, str(src_cpp), "-o", str(exe_path)]
+
+    # 相同源码 + 参数 + 编译器版本直接复用缓存的二进制（目录见 runner_compile_cache.resolve_cache_dir）。
+    cache_dir = runner_compile_cache.resolve_cache_dir()
+    key = ""
+    if cache_dir is not None:
+        try:
+            key = runner_compile_cache.cache_key(source=src_cpp.read_bytes(), flags=CXX_FLAGS, compiler=CXX)
+        except OSError:
+            key = ""
+        hit = runner_compile_cache.lookup(cache_dir=cache_dir, key=key, exe_path=exe_path) if key else None
+        if hit is not None:
+            return CompileResult(cmd=compile_cmd, returncode=0, stdout=hit.stdout, stderr=hit.stderr, cached=True)
+
     try:
         cp = subprocess.run(compile_cmd, capture_output=True)
     except Exception as exc:
         raise RuntimeError(f"compile_cpp_failed:{type(exc).__name__}:{exc}") from exc
-    return CompileResult(
+    result = CompileResult(
         cmd=compile_cmd,
         returncode=int(cp.returncode),
         stdout=bytes(cp.stdout or b""),
         stderr=bytes(cp.stderr or b""),
     )
+    if cache_dir is not None and key and result.returncode == 0:
+        runner_compile_cache.store(cache_dir=cache_dir, key=key, exe_path=exe_path, stdout=result.stdout, stderr=result.stderr)
+    return result
 
 
 def get_tests_config(job: dict[str, Any]) -> tuple[bool, str, bool, Path]:
@@ -125,6 +164,9 @@ def finish_tests_done(*, out_root: Path, report: dict[str, Any]) -> int:
         detail = " ".join(bits)
         if detail:
             detail = "：" + detail
+        not_run = int(summary.get("not_run") or 0)
+        if not_run:
+            detail += f"（fail-fast，{not_run} 个 case 未执行）"
         status_update(
             stage="repair",
             summary=f"测试未通过（failed={summary['failed']}）{detail}",
@@ -168,14 +210,28 @@ def main() -> int:
         return finish_no_tests(out_root=out_root, report=report)
 
     cases = load_cases(job)
-    run_cases(
-        report=report,
-        cases=cases,
-        tests_dir=tests_dir,
-        exe_path=exe_path,
-        limits=limits,
-        run_if_no_expected=run_if_no_expected,
-    )
+    if attempt > 1:
+        # repair attempt：上一轮失败/最慢的 case 先跑，配合 fail-fast 更快拿到结论。
+        cases, order_info = prioritize_cases(cases, load_previous_report(attempt=attempt))
+        report["case_order"] = {"previous_attempt": attempt - 1, **order_info}
+    outputs = OutputsBlob(out_root / OUTPUTS_NAME)
+    results = CaseResultsLog(job_path("output", "test_results.jsonl"), attempt=attempt)
+    try:
+        run_cases(
+            report=report,
+            cases=cases,
+            tests_dir=tests_dir,
+            exe_path=exe_path,
+            limits=limits,
+            run_if_no_expected=run_if_no_expected,
+            fail_fast=resolve_fail_fast(job),
+            early_wa=bool((job.get("tests") or {}).get("early_wa", False)),
+            outputs=outputs,
+            results=results,
+        )
+    finally:
+        report["outputs"] = outputs.close()
+        results.close()
     return finish_tests_done(out_root=out_root, report=report)
 
 
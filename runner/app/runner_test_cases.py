@@ -6,7 +6,11 @@ from pathlib import Path
 from typing import Any, cast
 
 from runner_test_fs import job_path, read_text
-from runner_test_models import Case, CompareMode
+from runner_test_models import FAILED_VERDICTS, Case, CompareMode
+
+
+# Repair attempts run the previous attempt's failed cases first, then its slowest ones.
+PRIORITY_SLOWEST_CASES = 10
 
 
 def normalize_compare_mode(value: str, *, default: CompareMode) -> CompareMode:
@@ -130,3 +134,61 @@ def load_cases(job: dict[str, Any]) -> list[Case]:
         return []
 
     return load_cases_from_pairs(tests_dir=tests_dir, default_mode=default_mode)
+
+
+def load_previous_report(*, attempt: int) -> dict[str, Any] | None:
+    # Previous attempt's report (best-effort; missing/invalid means "no hint").
+    if attempt <= 1:
+        return None
+    path = job_path("output", "artifacts", f"attempt_{attempt - 1}", "test_output", "report.json")
+    try:
+        report = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return report if isinstance(report, dict) else None
+
+
+def prioritize_cases(cases: list[Case], previous_report: dict[str, Any] | None) -> tuple[list[Case], dict[str, Any]]:
+    """Reorder cases so the previous attempt's failures and slowest cases run first.
+
+    Returns `(ordered_cases, info)`; unmatched cases keep their `(group, name)` order.
+    """
+
+    info: dict[str, Any] = {"failed_first": 0, "slowest_first": 0}
+    records = previous_report.get("tests") if isinstance(previous_report, dict) else None
+    if not isinstance(records, list) or not cases:
+        return cases, info
+
+    # report.json records use `tests/<input_rel>`; match on that rather than names (names may repeat across groups).
+    by_input = {f"tests/{case.input_rel}": case for case in cases}
+    seen: set[int] = set()
+    failed: list[Case] = []
+    timed: list[tuple[int, Case]] = []
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        case = by_input.get(str(record.get("input_rel") or ""))
+        if case is None or id(case) in seen:
+            continue
+        if str(record.get("verdict") or "") in FAILED_VERDICTS:
+            seen.add(id(case))
+            failed.append(case)
+            continue
+        try:
+            time_ms = int(record.get("time_ms") or 0)
+        except (TypeError, ValueError):
+            time_ms = 0
+        if time_ms > 0:
+            timed.append((time_ms, case))
+
+    slowest: list[Case] = []
+    for _time_ms, case in sorted(timed, key=lambda item: item[0], reverse=True):
+        if len(slowest) >= PRIORITY_SLOWEST_CASES:
+            break
+        if id(case) not in seen:
+            seen.add(id(case))
+            slowest.append(case)
+
+    info = {"failed_first": len(failed), "slowest_first": len(slowest)}
+    rest = [case for case in cases if id(case) not in seen]
+    return failed + slowest + rest, info
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+# Streaming output comparator (tokens / trim_ws / exact).
+#
+# Same verdicts, messages and preview windows as `runner_test_cases.compare_output`, but works on
+# byte chunks: actual stdout is fed incrementally, expected output is read through mmap, and the
+# comparison stops at the first mismatch. Memory is bounded by the chunk size plus the longest
+# single token/line, never by the total output size.
+#
+# Differences from the str-based comparator (only visible with non-ASCII whitespace or invalid
+# UTF-8): tokens/lines are split and right-stripped on ASCII whitespace, and bytes are compared
+# before decoding (invalid sequences no longer all collapse to U+FFFD).
+
+import mmap
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from runner_test_models import CompareMode
+
+
+CHUNK_BYTES = 65536
+TOKENS_HEAD = 50
+TOKENS_WINDOW = 10
+# First 200 chars of the (normalized) text; 4 bytes per char covers any UTF-8 input.
+TEXT_PREVIEW_CHARS = 200
+TEXT_PREVIEW_BYTES = TEXT_PREVIEW_CHARS * 4
+
+CompareResult = tuple[bool, str, str, str]
+
+
+def decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+@contextmanager
+def open_expected(path: Path) -> Iterator[bytes | mmap.mmap]:
+    """Map the expected file read-only (empty files cannot be mmapped)."""
+
+    with path.open("rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield b""
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+class TokenSplitter:
+    # Incremental `bytes.split()`: a token cut at the chunk end is carried into the next chunk.
+    def __init__(self) -> None:
+        self._carry = b""
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        data = self._carry + chunk if self._carry else chunk
+        units = data.split()
+        self._carry = b""
+        if units and data and not data[-1:].isspace():
+            self._carry = units.pop()
+        return units
+
+    def finish(self) -> list[bytes]:
+        carry, self._carry = self._carry, b""
+        return [carry] if carry else []
+
+
+class LineSplitter:
+    # trim_ws units: lines with trailing whitespace stripped; trailing empty lines are dropped.
+    def __init__(self) -> None:
+        self._carry = b""
+        self._empty = 0
+
+    def _emit(self, lines: list[bytes]) -> list[bytes]:
+        units: list[bytes] = []
+        for line in lines:
+            line = line.rstrip()
+            if not line:
+                self._empty += 1
+                continue
+            if self._empty:
+                units.extend([b""] * self._empty)
+                self._empty = 0
+            units.append(line)
+        return units
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        data = self._carry + chunk if self._carry else chunk
+        lines = data.split(b"\n")
+        self._carry = lines.pop()
+        return self._emit(lines)
+
+    def finish(self) -> list[bytes]:
+        carry, self._carry = self._carry, b""
+        return self._emit([carry])
+
+
+class ExpectedUnits:
+    """Pull-based units (tokens/lines) over the mmapped expected output."""
+
+    def __init__(self, data: bytes | mmap.mmap, splitter: TokenSplitter | LineSplitter):
+        self._data = data
+        self._pos = 0
+        self._splitter = splitter
+        self._buf: deque[bytes] = deque()
+        self._eof = False
+
+    def take(self, n: int) -> list[bytes]:
+        while len(self._buf) < n and not self._eof:
+            if self._pos >= len(self._data):
+                self._buf.extend(self._splitter.finish())
+                self._eof = True
+                break
+            chunk = bytes(self._data[self._pos : self._pos + CHUNK_BYTES])
+            self._pos += len(chunk)
+            self._buf.extend(self._splitter.feed(chunk))
+        return [self._buf.popleft() for _ in range(min(n, len(self._buf)))]
+
+
+class UnitMatcher:
+    """Compare actual units against expected units as chunks arrive (tokens / trim_ws)."""
+
+    def __init__(self, *, mode: CompareMode, expected: bytes | mmap.mmap):
+        self.mode = mode
+        splitter_cls = TokenSplitter if mode == "tokens" else LineSplitter
+        self._actual = splitter_cls()
+        self._expected = ExpectedUnits(expected, splitter_cls())
+        self._matched = 0
+        self._recent: deque[bytes] = deque(maxlen=TOKENS_WINDOW)
+        self._head_tokens: list[bytes] = []
+        self._head_text = bytearray()
+        self._finished = False
+        # Set once a mismatch is proven: (index, expected window after idx, actual window after idx).
+        self._mismatch: tuple[int, list[bytes], list[bytes]] | None = None
+
+    @property
+    def mismatched(self) -> bool:
+        return self._mismatch is not None
+
+    @property
+    def needs_more(self) -> bool:
+        # After a mismatch only the actual preview window still wants data.
+        return self._mismatch is None or not self._window_full(self._mismatch[2])
+
+    def _window_full(self, after: list[bytes]) -> bool:
+        # tokens: 10 units from the mismatch on; trim_ws: enough normalized text for the preview.
+        if self.mode == "tokens":
+            return len(after) >= TOKENS_WINDOW
+        return len(self._head_text) + sum(len(unit) + 1 for unit in after) >= TEXT_PREVIEW_BYTES
+
+    def _fill_window(self, after: list[bytes], units: list[bytes]) -> None:
+        for unit in units:
+            if self._window_full(after):
+                return
+            after.append(unit)
+
+    def feed(self, chunk: bytes) -> None:
+        self._consume(self._actual.feed(chunk))
+
+    def _consume(self, units: list[bytes]) -> None:
+        if not units:
+            return
+        if self._mismatch is not None:
+            self._fill_window(self._mismatch[2], units)
+            return
+        expected = self._expected.take(len(units))
+        if units == expected:
+            self._accept(units)
+            return
+        i = next((k for k in range(len(expected)) if units[k] != expected[k]), len(expected))
+        self._accept(units[:i])
+        a_after: list[bytes] = []
+        self._fill_window(a_after, units[i:])
+        self._mismatch = (self._matched, self._expected_window(expected[i:]), a_after)
+
+    def _expected_window(self, pending: list[bytes]) -> list[bytes]:
+        after: list[bytes] = []
+        self._fill_window(after, pending)
+        while not self._window_full(after):
+            more = self._expected.take(1)
+            if not more:
+                break
+            after.extend(more)
+        return after
+
+    def _accept(self, units: list[bytes]) -> None:
+        self._matched += len(units)
+        self._recent.extend(units[-TOKENS_WINDOW:])
+        if len(self._head_tokens) < TOKENS_HEAD:
+            self._head_tokens.extend(units[: TOKENS_HEAD - len(self._head_tokens)])
+        for unit in units:
+            room = TEXT_PREVIEW_BYTES - len(self._head_text)
+            if room <= 0:
+                break
+            self._head_text += (unit + b"\n")[:room]
+
+    def finish(self) -> CompareResult:
+        if not self._finished:
+            self._finished = True
+            self._consume(self._actual.finish())
+            if self._mismatch is None:
+                extra = self._expected_window([])
+                if extra:
+                    self._mismatch = (self._matched, extra, [])
+        if self.mode == "tokens":
+            return self._tokens_result()
+        return self._trim_ws_result()
+
+    def _tokens_result(self) -> CompareResult:
+        if self._mismatch is None:
+            head = decode(b" ".join(self._head_tokens))
+            return True, "", head, head
+        idx, e_after, a_after = self._mismatch
+        before = list(self._recent)
+        e_tok = decode(e_after[0]) if e_after else "<eof>"
+        a_tok = decode(a_after[0]) if a_after else "<eof>"
+        return (
+            False,
+            f"tokens mismatch at {idx}: expected={e_tok} actual={a_tok}",
+            decode(b" ".join(before + e_after)),
+            decode(b" ".join(before + a_after)),
+        )
+
+    def _trim_ws_result(self) -> CompareResult:
+        if self._mismatch is None:
+            head = decode(bytes(self._head_text) or b"\n")[:TEXT_PREVIEW_CHARS]
+            return True, "", head, head
+        # Matched normalized prefix, then each side's lines from the mismatch on.
+        _idx, e_after, a_after = self._mismatch
+        prefix = bytes(self._head_text)
+        e_text = prefix + b"".join(unit + b"\n" for unit in e_after)
+        a_text = prefix + b"".join(unit + b"\n" for unit in a_after)
+        return (
+            False,
+            "trim_ws mismatch",
+            decode(e_text or b"\n")[:TEXT_PREVIEW_CHARS],
+            decode(a_text or b"\n")[:TEXT_PREVIEW_CHARS],
+        )
+
+
+class ExactMatcher:
+    """Byte-for-byte comparison against the mmapped expected output."""
+
+    mode: CompareMode = "exact"
+
+    def __init__(self, *, expected: bytes | mmap.mmap):
+        self._expected = expected
+        self._pos = 0
+        self._head = bytearray()
+        self._mismatch = False
+
+    @property
+    def mismatched(self) -> bool:
+        return self._mismatch
+
+    @property
+    def needs_more(self) -> bool:
+        return not self._mismatch or len(self._head) < TEXT_PREVIEW_BYTES
+
+    def feed(self, chunk: bytes) -> None:
+        if len(self._head) < TEXT_PREVIEW_BYTES:
+            self._head += chunk[: TEXT_PREVIEW_BYTES - len(self._head)]
+        if self._mismatch:
+            return
+        end = self._pos + len(chunk)
+        if end > len(self._expected) or self._expected[self._pos : end] != chunk:
+            self._mismatch = True
+        self._pos = end
+
+    def finish(self) -> CompareResult:
+        ok = not self._mismatch and self._pos == len(self._expected)
+        expected_preview = decode(bytes(self._expected[:TEXT_PREVIEW_BYTES]))[:TEXT_PREVIEW_CHARS]
+        actual_preview = decode(bytes(self._head))[:TEXT_PREVIEW_CHARS]
+        return ok, ("" if ok else "exact mismatch"), expected_preview, actual_preview
+
+
+def new_matcher(*, mode: CompareMode, expected: bytes | mmap.mmap) -> UnitMatcher | ExactMatcher:
+    if mode == "exact":
+        return ExactMatcher(expected=expected)
+    return UnitMatcher(mode=mode, expected=expected)
+
+
+def iter_chunks(*, head: bytes, path: Path | None) -> Iterator[bytes]:
+    # Actual stdout: the spilled file when present (it starts with `head`), else the in-memory bytes.
+    if path is None:
+        for start in range(0, len(head), CHUNK_BYTES):
+            yield head[start : start + CHUNK_BYTES]
+        return
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_BYTES):
+            yield chunk
+
+
+def compare_stream(*, actual_chunks: Iterator[bytes], expected_path: Path, mode: CompareMode) -> CompareResult:
+    """Streaming equivalent of `compare_output(actual, expected, mode)`."""
+
+    with open_expected(expected_path) as expected:
+        matcher = new_matcher(mode=mode, expected=expected)
+        for chunk in actual_chunks:
+            matcher.feed(chunk)
+            if not matcher.needs_more:
+                break
+        return matcher.finish()
@@ -6,6 +6,9 @@ from typing import Any, Literal
 
 CompareMode = Literal["tokens", "trim_ws", "exact"]
 
+# Verdicts that count as a failed case (AC passes; RUN/SKIP/NOT_RUN are not judged failures).
+FAILED_VERDICTS = ("WA", "RE", "TLE", "MLE", "OLE")
+
 
 @dataclass(frozen=True)
 class Case:
@@ -24,6 +27,9 @@ class RunLimits:
     pids_limit: Any
     max_output_bytes_per_test: int
     max_terminal_log_bytes: int
+    # TLE rule ("cpu" | "wall"); wall_time_limit_ms caps wall clock in cpu mode (None = auto).
+    time_mode: str = "cpu"
+    wall_time_limit_ms: int | None = None
 
 
 @dataclass(frozen=True)
@@ -32,6 +38,7 @@ class CompileResult:
     returncode: int
     stdout: bytes
     stderr: bytes
+    cached: bool = False
 
 
 @dataclass(frozen=True)
@@ -46,8 +53,6 @@ class CaseEvaluation:
 class TestRecordData:
     evaluation: CaseEvaluation
     run_result: dict[str, Any]
-    stdout_b64: str
-    stderr_b64: str
-    stdout_truncated: bool
-    stderr_truncated: bool
+    # `{stdout, stderr}` ranges in report.outputs.bin (None when no sidecar is written).
+    outputs: dict[str, Any] | None
 
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 # Test report builders (runner_test).
+#
+# report.v2: `report.json` keeps the summary + one compact record per case; per-case stdout/stderr
+# heads live in the `report.outputs.bin` sidecar next to it, and each record points at its bytes
+# with `outputs.{stdout,stderr} = {offset, length, truncated}` (fetched on demand by the UI).
 
 import base64
+import threading
+from pathlib import Path
 from typing import Any
 
-from runner_test_cases import compare_output
-from runner_test_models import Case, CaseEvaluation, CompareMode, CompileResult, RunLimits, TestRecordData
+from runner_test_compare import CompareResult
+from runner_test_models import FAILED_VERDICTS, Case, CaseEvaluation, CompareMode, CompileResult, RunLimits, TestRecordData
 
 
 MAX_STREAM_BYTES = 65536
+SCHEMA_VERSION = "report.v2"
+OUTPUTS_NAME = "report.outputs.bin"
 
 
 def b64encode_ascii(data: bytes) -> str:
@@ -23,6 +31,32 @@ def b64_trunc(data: bytes, max_bytes: int = MAX_STREAM_BYTES) -> tuple[str, bool
     return b64encode_ascii(data), False
 
 
+class OutputsBlob:
+    """Append-only sidecar holding per-case stdout/stderr heads (thread-safe, any case order)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open("wb")
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, data: bytes, max_bytes: int = MAX_STREAM_BYTES) -> dict[str, Any]:
+        head = data[:max_bytes]
+        with self._lock:
+            offset = self._size
+            self._file.write(head)
+            self._size += len(head)
+        return {"offset": offset, "length": len(head), "truncated": len(data) > max_bytes}
+
+    def add_case(self, *, stdout: bytes, stderr: bytes) -> dict[str, Any]:
+        return {"stdout": self.append(stdout), "stderr": self.append(stderr)}
+
+    def close(self) -> dict[str, Any]:
+        with self._lock:
+            self._file.close()
+        return {"name": OUTPUTS_NAME, "bytes": self._size}
+
+
 def init_report(
     *,
     job: dict[str, Any],
@@ -38,7 +72,7 @@ def init_report(
 
     job_get = job.get
     return {
-        "schema_version": "report.v1",
+        "schema_version": SCHEMA_VERSION,
         "job_id": str(job_get("job_id") or ""),
         "owner_user_id": str(job_get("owner_user_id") or ""),
         "status": "failed",
@@ -47,6 +81,8 @@ def init_report(
             "cpp_std": "c++20",
             "compare_mode": compare_mode,
             "time_limit_ms": limits.time_limit_ms,
+            "time_mode": limits.time_mode,
+            "wall_time_limit_ms": limits.wall_time_limit_ms,
             "memory_limit_mb": limits.memory_limit_mb,
             "cpus": limits.cpus,
             "pids_limit": limits.pids_limit,
@@ -55,12 +91,14 @@ def init_report(
         "compile": {
             "cmd": " ".join(compile_result.cmd),
             "ok": compile_ok,
+            "cached": bool(compile_result.cached),
             "exit_code": int(compile_result.returncode),
             "stdout_b64": c_stdout_b64,
             "stderr_b64": c_stderr_b64,
             "stdout_truncated": c_stdout_tr,
             "stderr_truncated": c_stderr_tr,
         },
+        "outputs": None,
         "tests": [],
         "summary": {
             "total": 0,
@@ -69,6 +107,7 @@ def init_report(
             "passed": 0,
             "failed": 0,
             "skipped": 0,
+            "not_run": 0,
             "first_failure": None,
             "first_failure_verdict": None,
             "first_failure_message": None,
@@ -78,32 +117,39 @@ def init_report(
     }
 
 
+def placeholder_test_record(*, case: Case, verdict: str) -> dict[str, Any]:
+    # Record for a case whose program never ran (SKIP: no expected output; NOT_RUN: fail-fast stop).
+    return {
+        "name": case.name,
+        "group": case.group,
+        "input_rel": f"tests/{case.input_rel}",
+        "expected_rel": f"tests/{case.expected_rel}" if case.expected_rel else None,
+        "expected_present": False,
+        "verdict": verdict,
+        "exit_code": 0,
+        "timeout": False,
+        "output_limit_exceeded": False,
+        "signal": None,
+        "time_ms": 0,
+        "cpu_time_ms": None,
+        "memory_kb": None,
+        "context_switches": None,
+        "major_faults": None,
+        "outputs": None,
+        "diff": {"ok": True, "mode": case.compare_mode, "message": "", "expected_preview_b64": "", "actual_preview_b64": ""},
+    }
+
+
 def add_skip_test_record(*, report: dict[str, Any], case: Case) -> None:
-    report["tests"].append(
-        {
-            "name": case.name,
-            "group": case.group,
-            "input_rel": f"tests/{case.input_rel}",
-            "expected_rel": f"tests/{case.expected_rel}" if case.expected_rel else None,
-            "expected_present": False,
-            "verdict": "SKIP",
-            "exit_code": 0,
-            "timeout": False,
-            "output_limit_exceeded": False,
-            "signal": None,
-            "time_ms": 0,
-            "memory_kb": None,
-            "stdout_b64": "",
-            "stderr_b64": "",
-            "stdout_truncated": False,
-            "stderr_truncated": False,
-            "diff": {"ok": True, "mode": case.compare_mode, "message": "", "expected_preview_b64": "", "actual_preview_b64": ""},
-        }
-    )
-
-
-def build_diff_payload(*, expected_text: str, actual_text: str, compare_mode: CompareMode) -> tuple[str, dict[str, Any]]:
-    ok, msg, expected_preview, actual_preview = compare_output(actual_text, expected_text, compare_mode)
+    report["tests"].append(placeholder_test_record(case=case, verdict="SKIP"))
+
+
+def add_not_run_test_record(*, report: dict[str, Any], case: Case) -> None:
+    report["tests"].append(placeholder_test_record(case=case, verdict="NOT_RUN"))
+
+
+def build_diff_payload(*, compared: CompareResult, compare_mode: CompareMode) -> tuple[str, dict[str, Any]]:
+    ok, msg, expected_preview, actual_preview = compared
     expected_preview_b64 = b64encode_ascii(expected_preview.encode("utf-8"))
     actual_preview_b64 = b64encode_ascii(actual_preview.encode("utf-8"))
     diff = {
@@ -118,7 +164,7 @@ def build_diff_payload(*, expected_text: str, actual_text: str, compare_mode: Co
 
 def update_summary_for_verdict(*, summary: dict[str, Any], evaluation: CaseEvaluation) -> None:
     verdict = evaluation.verdict
-    if verdict not in ("AC", "WA", "RE", "TLE", "OLE"):
+    if verdict not in ("AC", *FAILED_VERDICTS):
         summary["run_only"] += 1
         return
 
@@ -151,10 +197,10 @@ def build_test_record(data: TestRecordData) -> dict[str, Any]:
         "output_limit_exceeded": data.run_result["output_limit_exceeded"],
         "signal": None,
         "time_ms": data.run_result["time_ms"],
+        "cpu_time_ms": run_result_get("cpu_time_ms"),
         "memory_kb": run_result_get("memory_kb"),
-        "stdout_b64": data.stdout_b64,
-        "stderr_b64": data.stderr_b64,
-        "stdout_truncated": data.stdout_truncated,
-        "stderr_truncated": data.stderr_truncated,
+        "context_switches": run_result_get("context_switches"),
+        "major_faults": run_result_get("major_faults"),
+        "outputs": data.outputs,
         "diff": data.evaluation.diff,
     }
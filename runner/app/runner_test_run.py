@@ -1,16 +1,50 @@
 from __future__ import annotations
 
+import os
+import queue
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 try:
     from runner_program import run_program
 except ModuleNotFoundError:  # pragma: no cover
     from runner.app.runner_program import run_program
-from runner_test_fs import WORK_DIR, read_bytes, read_text
-from runner_test_models import Case, CaseEvaluation, RunLimits, TestRecordData
-from runner_test_report import add_skip_test_record, b64_trunc, build_diff_payload, build_test_record, update_summary_for_verdict
-from runner_test_status import status_update
+from runner_test_compare import CompareResult, compare_stream, iter_chunks, new_matcher, open_expected
+from runner_test_fs import WORK_DIR
+from runner_test_models import FAILED_VERDICTS, Case, CaseEvaluation, RunLimits, TestRecordData
+from runner_test_report import (
+    OutputsBlob,
+    add_not_run_test_record,
+    add_skip_test_record,
+    build_diff_payload,
+    build_test_record,
+    placeholder_test_record,
+    update_summary_for_verdict,
+)
+from runner_test_status import CaseResultsLog, status_update
+
+
+@dataclass(frozen=True)
+class CaseRunContext:
+    tests_dir: Path
+    exe_path: Path
+    limits: RunLimits
+    run_if_no_expected: bool
+    early_wa: bool = False
+    outputs: OutputsBlob | None = None
+
+
+@dataclass(frozen=True)
+class CaseOutcome:
+    # evaluation/record 为 None 表示该 case 被跳过（无 expected 且不允许 run-only）。
+    case: Case
+    evaluation: CaseEvaluation | None = None
+    record: dict[str, Any] | None = None
+    # (stdout, stderr) heads, written to the outputs sidecar when the outcome is published.
+    streams: tuple[bytes, bytes] | None = None
 
 
 def should_emit_progress(*, idx: int, total: int, update_every: int) -> bool:
@@ -21,13 +55,292 @@ def should_emit_progress(*, idx: int, total: int, update_every: int) -> bool:
     return idx % max(1, update_every) == 0
 
 
-def resolve_expected(*, tests_dir: Path, case: Case) -> tuple[bool, str]:
+def resolve_expected(*, tests_dir: Path, case: Case) -> Path | None:
+    # Expected output is compared as a stream (mmap), never read whole.
     if case.expected_rel is None:
-        return False, ""
+        return None
     expected_path = tests_dir / case.expected_rel
-    if not expected_path.exists():
-        return False, ""
-    return True, read_text(expected_path, errors="replace")
+    return expected_path if expected_path.exists() else None
+
+
+def available_cpus() -> list[int]:
+    # Cores this runner may use (container cpuset / taskset aware when supported).
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return sorted(os.sched_getaffinity(0))
+        except OSError:
+            pass
+    return list(range(os.cpu_count() or 1))
+
+
+def job_cpuset(cores: list[int]) -> list[int] | None:
+    # REALMOI_TEST_CPUSET：后端为本 job 租到的核心（"2,3"，见 backend cpu_leases）；"none" 表示没有独占核心。
+    # 未设置（单独运行 runner）时返回 None，由调用方按亲和性掩码判断。
+    raw = str(os.environ.get("REALMOI_TEST_CPUSET") or "").strip()
+    if not raw:
+        return None
+    if raw == "none":
+        return []
+    try:
+        leased = {int(x) for x in raw.split(",") if x.strip()}
+    except ValueError:
+        return []
+    return [c for c in cores if c in leased]
+
+
+def pinned_cores(*, cores: list[int], workers: int) -> list[int | None]:
+    # 每个 worker 绑定的核心；None = 不绑核。
+    # 只在属于本 job 的核心内绑核：租到的 cpuset，或本身就不比 workers 宽的亲和性掩码（容器 cpuset / taskset）。
+    # 掩码比 limits.cpus 宽时是整机核心，多个 job 都绑 0..N-1 会互相超订，此时交给调度器。
+    own = job_cpuset(cores)
+    if own is None:
+        own = cores if len(cores) <= workers else []
+    if len(own) < workers:
+        return [None] * workers
+    return list(own[:workers])
+
+
+def resolve_case_workers(*, cpus: Any, cores: list[int]) -> int:
+    # 并行度 = floor(limits.cpus)，且不超过可用核心数；<=1 时退回串行。
+    try:
+        want = int(float(cpus or 1))
+    except (TypeError, ValueError):
+        want = 1
+    return max(1, min(want, len(cores)))
+
+
+def run_one_case(*, ctx: CaseRunContext, case: Case, work_dir: Path, cpu: int | None = None) -> CaseOutcome:
+    # Run one case and build its report record; summary is updated later in case order.
+
+    expected_path = resolve_expected(tests_dir=ctx.tests_dir, case=case)
+    if expected_path is None and not ctx.run_if_no_expected:
+        return CaseOutcome(case=case)
+
+    # 输入直接从磁盘流式写入 stdin，不整体读入内存。
+    input_path = ctx.tests_dir / case.input_rel
+    if not input_path.is_file():
+        raise RuntimeError(f"read_bytes_failed:{input_path}:missing")
+    with ExitStack() as stack:
+        # early_wa：运行中逐块比对 stdout，确定不一致即结束进程；同一个 matcher 直接给出最终比较结果。
+        matcher = None
+        if ctx.early_wa and expected_path is not None:
+            matcher = new_matcher(mode=case.compare_mode, expected=stack.enter_context(open_expected(expected_path)))
+        run_result = run_program(
+            exe_path=ctx.exe_path,
+            input_path=input_path,
+            time_limit_ms=ctx.limits.time_limit_ms,
+            output_limit_bytes=ctx.limits.max_output_bytes_per_test,
+            work_dir=work_dir,
+            cpu=cpu,
+            matcher=matcher,
+            memory_limit_mb=ctx.limits.memory_limit_mb,
+            time_mode=ctx.limits.time_mode,
+            wall_limit_ms=ctx.limits.wall_time_limit_ms,
+        )
+        try:
+            compare = matcher.finish if matcher is not None else None
+            return evaluate_run(
+                case=case,
+                run_result=run_result,
+                expected_path=expected_path,
+                compare=compare,
+            )
+        finally:
+            spilled = run_result.get("stdout_path")
+            if spilled is not None:
+                Path(spilled).unlink(missing_ok=True)
+
+
+def evaluate_run(
+    *,
+    case: Case,
+    run_result: dict[str, Any],
+    expected_path: Path | None,
+    compare: Callable[[], CompareResult] | None = None,
+) -> CaseOutcome:
+    # `compare` overrides the post-run streaming comparison (early-WA matcher already fed with stdout).
+    # stdout/stderr heads ride on the outcome; `publish_outcome` moves them to the sidecar.
+    verdict = "RUN"
+    diff: dict[str, Any] = {"ok": True, "mode": case.compare_mode, "message": "", "expected_preview_b64": "", "actual_preview_b64": ""}
+    if run_result["timeout"]:
+        verdict = "TLE"
+    elif run_result["output_limit_exceeded"]:
+        verdict = "OLE"
+    elif run_result.get("wrong_answer") and compare is not None:
+        # Killed on the first proven mismatch: WA with the usual message/previews.
+        verdict, diff = build_diff_payload(compared=compare(), compare_mode=case.compare_mode)
+    elif run_result.get("memory_limit_exceeded"):
+        verdict = "MLE"
+    elif run_result["exit_code"] != 0:
+        verdict = "RE"
+    elif expected_path is not None:
+        if compare is None:
+            compared = compare_stream(
+                actual_chunks=iter_chunks(head=run_result["stdout"], path=run_result.get("stdout_path")),
+                expected_path=expected_path,
+                mode=case.compare_mode,
+            )
+        else:
+            compared = compare()
+        verdict, diff = build_diff_payload(compared=compared, compare_mode=case.compare_mode)
+
+    evaluation = CaseEvaluation(case=case, expected_present=expected_path is not None, verdict=verdict, diff=diff)
+    record = build_test_record(TestRecordData(evaluation=evaluation, run_result=run_result, outputs=None))
+    return CaseOutcome(case=case, evaluation=evaluation, record=record, streams=(run_result["stdout"], run_result["stderr"]))
+
+
+def publish_outcome(*, outcome: CaseOutcome, ctx: CaseRunContext, progress: "ProgressReporter") -> None:
+    # Outcome is final for the report: stdout/stderr go to the report.outputs.bin sidecar (the record
+    # only keeps their ranges), then the case is streamed to test_results.jsonl.
+    if ctx.outputs is not None and outcome.record is not None and outcome.streams is not None:
+        stdout, stderr = outcome.streams
+        outcome.record["outputs"] = ctx.outputs.add_case(stdout=stdout, stderr=stderr)
+    progress.case_done(outcome)
+
+
+def apply_outcome(*, report: dict[str, Any], outcome: CaseOutcome) -> None:
+    summary = report["summary"]
+    if outcome.evaluation is None or outcome.record is None:
+        add_skip_test_record(report=report, case=outcome.case)
+        summary["skipped"] += 1
+        return
+    update_summary_for_verdict(summary=summary, evaluation=outcome.evaluation)
+    report["tests"].append(outcome.record)
+
+
+def is_failure(outcome: CaseOutcome | None) -> bool:
+    return outcome is not None and outcome.evaluation is not None and outcome.evaluation.verdict in FAILED_VERDICTS
+
+
+def mark_not_run(*, report: dict[str, Any], cases: list[Case]) -> None:
+    # fail-fast：首个失败之后的 case 不再执行。
+    for case in cases:
+        add_not_run_test_record(report=report, case=case)
+    report["summary"]["not_run"] += len(cases)
+
+
+class ProgressReporter:
+    # Emit roughly 10 `status_update` calls over the run (first/last case always), and one
+    # `test_results.jsonl` line per published case when a results log is set (completion order;
+    # case order in parallel fail-fast mode, see `run_cases_parallel`).
+    def __init__(self, total: int, results: CaseResultsLog | None = None):
+        self.total = total
+        self.update_every = max(1, total // 10) if total else 1
+        self.last_progress: int | None = None
+        self.results = results
+        self.done = 0
+
+    def case_done(self, outcome: CaseOutcome) -> None:
+        self.done += 1
+        if self.results is None:
+            return
+        record = outcome.record or placeholder_test_record(case=outcome.case, verdict="SKIP")
+        self.results.append(record=record, done=self.done, total=self.total)
+
+    def report(self, idx: int) -> None:
+        if not should_emit_progress(idx=idx, total=self.total, update_every=self.update_every):
+            return
+        progress = 10 + int((80 * idx) / self.total)
+        if progress != self.last_progress:
+            status_update(stage="test", summary=f"测试进度：{idx}/{self.total}", progress=progress)
+            self.last_progress = progress
+
+
+def run_cases_sequential(
+    *,
+    report: dict[str, Any],
+    cases: list[Case],
+    ctx: CaseRunContext,
+    progress: ProgressReporter,
+    fail_fast: bool,
+) -> None:
+    for idx, case in enumerate(cases, start=1):
+        progress.report(idx)
+        outcome = run_one_case(ctx=ctx, case=case, work_dir=WORK_DIR)
+        publish_outcome(outcome=outcome, ctx=ctx, progress=progress)
+        apply_outcome(report=report, outcome=outcome)
+        if fail_fast and is_failure(outcome):
+            mark_not_run(report=report, cases=cases[idx:])
+            return
+
+
+def run_cases_parallel(
+    *,
+    report: dict[str, Any],
+    cases: list[Case],
+    ctx: CaseRunContext,
+    progress: ProgressReporter,
+    cores: list[int | None],
+    fail_fast: bool,
+) -> None:
+    # Each worker borrows a free slot for one case: the program is pinned to its core (when the
+    # slot has one, see `pinned_cores`) and runs in the slot's own cwd. Outcomes are applied in
+    # case order so summary/first_failure match sequential mode.
+    # With fail_fast, cases after the earliest known failure are cancelled (or discarded if already
+    # running); cases before it still finish because one of them could fail first. Outcomes are then
+    # published (sidecar + test_results.jsonl) in case order, only once every earlier case is done, so
+    # nothing past the first failure is streamed; without fail_fast they publish in completion order.
+    free_slots: queue.Queue[tuple[int, int | None]] = queue.Queue()
+    for slot, cpu in enumerate(cores):
+        (WORK_DIR / f"slot{slot}").mkdir(parents=True, exist_ok=True)
+        free_slots.put((slot, cpu))
+
+    def run_pinned(case: Case) -> CaseOutcome:
+        slot, cpu = free_slots.get()
+        try:
+            return run_one_case(ctx=ctx, case=case, work_dir=WORK_DIR / f"slot{slot}", cpu=cpu)
+        finally:
+            free_slots.put((slot, cpu))
+
+    outcomes: list[CaseOutcome | None] = [None] * len(cases)
+    first_failure_idx = len(cases)
+    published = 0
+
+    def publish_ready(idx: int) -> None:
+        nonlocal published
+        if not fail_fast:
+            ready = [idx]
+        else:
+            ready = []
+            while published < len(cases) and published <= first_failure_idx and outcomes[published] is not None:
+                ready.append(published)
+                published += 1
+        for ready_idx in ready:
+            outcome = outcomes[ready_idx]
+            assert outcome is not None
+            publish_outcome(outcome=outcome, ctx=ctx, progress=progress)
+
+    with ThreadPoolExecutor(max_workers=len(cores), thread_name_prefix="case") as pool:
+        pending = {pool.submit(run_pinned, case): idx for idx, case in enumerate(cases)}
+        done_count = 0
+        # status_update 只在主线程调用（MCP stdio client 非线程安全），按完成数汇报进度。
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = pending.pop(fut)
+                if fut.cancelled():
+                    continue
+                try:
+                    outcomes[idx] = fut.result()
+                except BaseException:
+                    # 与串行一致立即失败：取消尚未开始的 case，只等正在运行的（最多 len(cores) 个）。
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    raise
+                done_count += 1
+                progress.report(done_count)
+                if fail_fast and idx < first_failure_idx and is_failure(outcomes[idx]):
+                    first_failure_idx = idx
+                    for other, other_idx in pending.items():
+                        if other_idx > idx:
+                            other.cancel()
+                publish_ready(idx)
+
+    for idx, outcome in enumerate(outcomes):
+        if fail_fast and idx > first_failure_idx:
+            mark_not_run(report=report, cases=cases[idx:])
+            return
+        assert outcome is not None
+        apply_outcome(report=report, outcome=outcome)
 
 
 def run_cases(
@@ -38,64 +351,36 @@ def run_cases(
     exe_path: Path,
     limits: RunLimits,
     run_if_no_expected: bool,
+    fail_fast: bool = False,
+    early_wa: bool = False,
+    outputs: OutputsBlob | None = None,
+    results: CaseResultsLog | None = None,
 ) -> None:
-    # Run all test cases and mutate report in-place.
+    # Run all test cases and mutate report in-place (parallel when limits.cpus >= 2).
+    # fail_fast: stop at the first failing case (in case order) and mark the rest NOT_RUN.
+    # early_wa: kill a case as soon as its stdout is proven wrong (see runner_program.run_program).
+    # outputs: sidecar for per-case stdout/stderr (report.v2); None keeps records output-free.
+    # results: live `test_results.jsonl` log, one line per finished case.
 
     summary = report["summary"]
     summary["total"] = len(cases)
 
     total = len(cases)
     status_update(stage="test", summary=f"开始执行测试（{total} case）", progress=10)
-    update_every = max(1, total // 10) if total else 1
-    last_progress: int | None = None
-
-    for idx, case in enumerate(cases, start=1):
-        if should_emit_progress(idx=idx, total=total, update_every=update_every):
-            progress = 10 + int((80 * idx) / total)
-            if progress != last_progress:
-                status_update(stage="test", summary=f"测试进度：{idx}/{total}", progress=progress)
-                last_progress = progress
-
-        input_bytes = read_bytes(tests_dir / case.input_rel)
-        expected_present, expected_text = resolve_expected(tests_dir=tests_dir, case=case)
-        if not expected_present and not run_if_no_expected:
-            add_skip_test_record(report=report, case=case)
-            summary["skipped"] += 1
-            continue
+    ctx = CaseRunContext(
+        tests_dir=tests_dir,
+        exe_path=exe_path,
+        limits=limits,
+        run_if_no_expected=run_if_no_expected,
+        early_wa=early_wa,
+        outputs=outputs,
+    )
+    progress = ProgressReporter(total, results)
 
-        run_result = run_program(
-            exe_path=exe_path,
-            input_bytes=input_bytes,
-            time_limit_ms=limits.time_limit_ms,
-            output_limit_bytes=limits.max_output_bytes_per_test,
-            work_dir=WORK_DIR,
-        )
-        stdout_b64, stdout_truncated = b64_trunc(run_result["stdout"])
-        stderr_b64, stderr_truncated = b64_trunc(run_result["stderr"])
-
-        verdict = "RUN"
-        diff: dict[str, Any] = {"ok": True, "mode": case.compare_mode, "message": "", "expected_preview_b64": "", "actual_preview_b64": ""}
-        if run_result["timeout"]:
-            verdict = "TLE"
-        elif run_result["output_limit_exceeded"]:
-            verdict = "OLE"
-        elif run_result["exit_code"] != 0:
-            verdict = "RE"
-        elif expected_present:
-            actual_text = run_result["stdout"].decode("utf-8", errors="replace")
-            verdict, diff = build_diff_payload(expected_text=expected_text, actual_text=actual_text, compare_mode=case.compare_mode)
-
-        evaluation = CaseEvaluation(case=case, expected_present=expected_present, verdict=verdict, diff=diff)
-        update_summary_for_verdict(summary=summary, evaluation=evaluation)
-        report["tests"].append(
-            build_test_record(
-                TestRecordData(
-                    evaluation=evaluation,
-                    run_result=run_result,
-                    stdout_b64=stdout_b64,
-                    stderr_b64=stderr_b64,
-                    stdout_truncated=stdout_truncated,
-                    stderr_truncated=stderr_truncated,
-                )
-            )
-        )
+    cores = available_cpus()
+    workers = resolve_case_workers(cpus=limits.cpus, cores=cores)
+    if workers <= 1 or total <= 1:
+        run_cases_sequential(report=report, cases=cases, ctx=ctx, progress=progress, fail_fast=fail_fast)
+        return
+    slots = pinned_cores(cores=cores, workers=workers)
+    run_cases_parallel(report=report, cases=cases, ctx=ctx, progress=progress, cores=slots, fail_fast=fail_fast)
@@ -5,10 +5,15 @@ from __future__ import annotations
 # runner_test 在编译/测试过程中会把进度写回后端 UI。该能力不应影响实际测试结果：
 # - 失败时禁用 MCP，避免反复抛错/阻塞
 # - 相同摘要在短时间内去抖，减少噪声
+#
+# 另外每个 case 结束时向 `output/test_results.jsonl` 追加一行紧凑结果（CaseResultsLog），
+# 后端以 `test_results` 流推送给 UI，无需等待/读取完整 report.json。
 
 import atexit
+import json
 import os
 import time
+from pathlib import Path
 from typing import Any
 
 try:
@@ -93,3 +98,53 @@ def status_update(*, stage: str, summary: str, level: str = "info", progress: in
             print(f"[test] warn: MCP status.update failed ({exc}); disabling MCP", flush=True)
         MCP_DISABLED = True
         close_mcp_client()
+
+
+RESULT_MESSAGE_CHARS = 200
+
+
+class CaseResultsLog:
+    """Append-only `test_results.jsonl`: one compact line per finished case (best-effort)."""
+
+    def __init__(self, path: Path, *, attempt: int):
+        self.path = path
+        self.attempt = attempt
+        self._fd: int | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as exc:
+            print(f"[test] warn: open {path.name} failed ({exc}); live results disabled", flush=True)
+
+    def append(self, *, record: dict[str, Any], done: int, total: int) -> None:
+        if self._fd is None:
+            return
+        diff = record.get("diff") or {}
+        line = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "attempt": self.attempt,
+            "done": done,
+            "total": total,
+            "name": record.get("name"),
+            "group": record.get("group"),
+            "verdict": record.get("verdict"),
+            "time_ms": record.get("time_ms"),
+            "cpu_time_ms": record.get("cpu_time_ms"),
+            "memory_kb": record.get("memory_kb"),
+            "message": str(diff.get("message") or "")[:RESULT_MESSAGE_CHARS],
+        }
+        try:
+            # 单次 write + O_APPEND：一行不会与其它写入交错。
+            os.write(self._fd, (json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+        except OSError as exc:
+            print(f"[test] warn: append {self.path.name} failed ({exc}); live results disabled", flush=True)
+            self.close()
+
+    def close(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+        self._fd = None
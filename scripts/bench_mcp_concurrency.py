@@ -0,0 +1,182 @@
+# AUTO_COMMENT_HEADER_V1: bench_mcp_concurrency.py
+# 说明：MCP 网关事件循环阻塞基准；一个会话订阅 agent_status 测通知延迟 p50/p99，同时 N 个会话并发调用 models.list（上游列表用 sleep 模拟同步 HTTP），对比线程池执行与旧的事件循环内联执行。
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def _init_env(root: Path) -> None:
+    # backend settings/db 在 import 时读取环境变量，必须先设置。
+    os.environ["REALMOI_DB_PATH"] = str(root / "bench.db")
+    os.environ["REALMOI_JOBS_ROOT"] = str(root / "jobs")
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class _FakeWebSocket:
+    # 只实现 run_mcp_ws_loop / McpWebSocketSession 用到的接口。
+    def __init__(self, on_text):
+        self.inbox: asyncio.Queue[dict] = asyncio.Queue()
+        self._on_text = on_text
+
+    async def receive(self) -> dict:
+        return await self.inbox.get()
+
+    async def send_text(self, data: str) -> None:
+        self._on_text(json.loads(data))
+
+    async def send_bytes(self, data: bytes) -> None:  # noqa: ARG002
+        return None
+
+    async def close(self, code: int = 1000) -> None:  # noqa: ARG002
+        await self.inbox.put({"type": "websocket.disconnect", "code": code})
+
+    def request(self, msg_id: int, method: str, params: dict) -> None:
+        text = json.dumps({"jsonrpc": "2.0", "id": msg_id, "method": method, "params": params})
+        self.inbox.put_nowait({"type": "websocket.receive", "text": text})
+
+
+def _seed_job(jobs_root: Path) -> Path:
+    from backend.app.services.job_paths import get_job_paths  # noqa: WPS433
+    from backend.app.services.job_state import now_iso, save_state  # noqa: WPS433
+
+    paths = get_job_paths(jobs_root=jobs_root, job_id="bench-job")
+    paths.logs_dir.mkdir(parents=True, exist_ok=True)
+    save_state(paths.state_json, {"job_id": "bench-job", "owner_user_id": "bench", "status": "running", "created_at": now_iso()})
+    paths.agent_status_jsonl.write_bytes(b"")
+    return paths.agent_status_jsonl
+
+
+def _write_status_lines(*, path: Path, interval_s: float, stop: threading.Event) -> None:
+    # 写入在独立线程中进行：事件循环被阻塞时写入时间不受影响，延迟全部体现在通知侧。
+    seq = 0
+    while not stop.is_set():
+        line = {"stage": "coding", "summary": f"line {seq}", "meta": {"t": time.perf_counter()}}
+        with path.open("ab") as f:
+            f.write((json.dumps(line) + "\n").encode("utf-8"))
+        seq += 1
+        time.sleep(interval_s)
+
+
+async def _run_scenario(*, mode: str, sessions: int, duration_s: float, interval_s: float, log_path: Path):
+    from backend.app.routers import mcp  # noqa: WPS433
+
+    original_run_blocking = mcp.run_blocking
+
+    async def run_inline(fn, /, *args, lane="io", **kwargs):  # noqa: ARG001
+        # 旧行为：阻塞的 handler 直接在事件循环上执行。
+        return fn(*args, **kwargs)
+
+    mcp.run_blocking = run_inline if mode == "inline" else original_run_blocking
+    user = SimpleNamespace(id="bench", role="admin")
+    latencies: list[float] = []
+    calls = 0
+    tasks = []
+
+    def on_subscriber_text(msg: dict) -> None:
+        if msg.get("method") != "agent_status":
+            return
+        sent_at = (((msg.get("params") or {}).get("item") or {}).get("meta") or {}).get("t")
+        if isinstance(sent_at, float):
+            latencies.append((time.perf_counter() - sent_at) * 1000.0)
+
+    subscriber = _FakeWebSocket(on_subscriber_text)
+    session = mcp.McpWebSocketSession(ws=subscriber, user=user)
+    tasks.append(asyncio.create_task(mcp.run_mcp_ws_loop(ws=subscriber, session=session, is_judge=False)))
+    offset = log_path.stat().st_size
+    args = {"job_id": "bench-job", "streams": ["agent_status"], "agent_status_offset": offset}
+    subscriber.request(1, "tools/call", {"name": "job.subscribe", "arguments": args})
+
+    async def caller() -> None:
+        nonlocal calls
+        done = asyncio.Event()
+        ws = _FakeWebSocket(lambda msg: done.set() if msg.get("id") is not None else None)
+        load_session = mcp.McpWebSocketSession(ws=ws, user=user)
+        loop_task = asyncio.create_task(mcp.run_mcp_ws_loop(ws=ws, session=load_session, is_judge=False))
+        deadline = time.perf_counter() + duration_s
+        msg_id = 0
+        while time.perf_counter() < deadline:
+            msg_id += 1
+            done.clear()
+            ws.request(msg_id, "tools/call", {"name": "models.list", "arguments": {"live": True}})
+            await done.wait()
+            calls += 1
+        await ws.close()
+        await loop_task
+        await load_session.close()
+
+    stop = threading.Event()
+    writer = threading.Thread(target=_write_status_lines, kwargs={"path": log_path, "interval_s": interval_s, "stop": stop})
+    writer.start()
+    try:
+        await asyncio.gather(*(caller() for _ in range(sessions)))
+    finally:
+        stop.set()
+        writer.join()
+        await subscriber.close()
+        await asyncio.gather(*tasks)
+        await session.close()
+        mcp.run_blocking = original_run_blocking
+    return latencies, calls
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, int(len(ordered) * q) - 1)] if ordered else float("nan")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MCP notification latency under concurrent models.list.")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions calling models.list")
+    parser.add_argument("--upstream-delay-ms", type=float, default=200.0, help="Simulated upstream listing latency")
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per mode")
+    parser.add_argument("--interval-ms", type=float, default=10.0, help="agent_status write interval")
+    parser.add_argument("--modes", default="inline,pool", help="Comma-separated: inline (old), pool (thread pool)")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="realmoi-bench-mcp-"))
+    _init_env(root)
+
+    from backend.app.db import init_db  # noqa: WPS433
+    from backend.app.routers import models as models_router  # noqa: WPS433
+
+    init_db()
+    log_path = _seed_job(root / "jobs")
+
+    def slow_list_live_models(_user, *, db):  # noqa: ARG001
+        time.sleep(args.upstream_delay_ms / 1000.0)
+        return []
+
+    models_router.list_live_models = slow_list_live_models
+
+    print(f"{'mode':>8} {'calls':>7} {'notifs':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        latencies, calls = asyncio.run(
+            _run_scenario(
+                mode=mode,
+                sessions=args.sessions,
+                duration_s=args.duration,
+                interval_s=args.interval_ms / 1000.0,
+                log_path=log_path,
+            )
+        )
+        p50 = statistics.median(latencies) if latencies else float("nan")
+        print(
+            f"{mode:>8} {calls:>7} {len(latencies):>7} {p50:>9.2f} {_percentile(latencies, 0.99):>9.2f} "
+            f"{max(latencies, default=float('nan')):>9.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+# AUTO_COMMENT_HEADER_V1: bench_runner_spawn.py
+# 说明：runner 单 case 固定开销基准；用一个空 C++ 程序测 `run_program` 每次调用的耗时（pidfd 退出通知 vs 旧的轮询等待），并给出裸 Popen 作为下限。
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _compile_noop(root: Path) -> Path:
+    src = root / "noop.cpp"
+    src.write_text("int main() { return 0; }\n", encoding="utf-8")
+    exe = root / "noop"
+    subprocess.run(["g++", "-O2", str(src), "-o", str(exe)], check=True)
+    return exe
+
+
+def _measure(fn, *, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:<28} p50={p50:7.2f} ms  p99={p99:7.2f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-case process overhead of runner_program.run_program.")
+    parser.add_argument("--runs", type=int, default=300, help="Cases per variant")
+    parser.add_argument("--memory-limit-mb", type=int, default=256, help="Memory limit passed to run_program (0 = none)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "runner" / "app"))
+    import runner_program  # noqa: WPS433
+
+    root = Path(tempfile.mkdtemp(prefix="realmoi-bench-spawn-"))
+    exe = _compile_noop(root)
+    memory_limit_mb = args.memory_limit_mb or None
+
+    def run_case() -> None:
+        runner_program.run_program(
+            exe_path=exe,
+            time_limit_ms=2000,
+            output_limit_bytes=1024,
+            work_dir=root,
+            memory_limit_mb=memory_limit_mb,
+        )
+
+    def popen_only() -> None:
+        subprocess.run([str(exe)], stdin=subprocess.DEVNULL, capture_output=True, start_new_session=True)
+
+    _report("Popen (baseline)", _measure(popen_only, runs=args.runs))
+    _report("run_program (pidfd)", _measure(run_case, runs=args.runs))
+
+    # 旧实现：没有退出通知，管道关闭后每 20 ms 轮询一次 wait4。
+    open_exit_fd, reap_poll_s = runner_program.open_exit_fd, runner_program.REAP_POLL_S
+    runner_program.open_exit_fd = lambda pid: None
+    runner_program.REAP_POLL_S = 0.02
+    try:
+        _report("run_program (legacy poll)", _measure(run_case, runs=args.runs))
+    finally:
+        runner_program.open_exit_fd, runner_program.REAP_POLL_S = open_exit_fd, reap_poll_s
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,7 +5,9 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import shutil
+import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
@@ -63,11 +65,26 @@ def _cleanup_container(container: object, *, dry_run: bool) -> None:
         return
 
 
+def _drop_index_row(*, jobs_root: Path, job_id: str) -> None:
+    # jobs 索引表（SQLite）只在 backend 数据库存在时同步；state.json 已删除时 refresh 会删掉该行。
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from backend.app.services import job_index  # noqa: WPS433
+    from backend.app.settings import SETTINGS  # noqa: WPS433
+
+    if not Path(SETTINGS.db_path).exists():
+        return
+    try:
+        job_index.refresh_job_from_disk(jobs_root=jobs_root, job_id=job_id)
+    except Exception as exc:
+        print(f"[cleanup] job index update failed for {job_id}: {exc}")
+
+
 def _cleanup_job_dir(job_dir: Path, *, dry_run: bool) -> None:
     if dry_run:
         print(f"[dry-run] would remove job dir {job_dir}")
         return
     shutil.rmtree(job_dir, ignore_errors=True)
+    _drop_index_row(jobs_root=job_dir.parent, job_id=job_dir.name)
     print(f"[cleanup] removed job dir {job_dir}")
 
 
@@ -76,7 +93,12 @@ def main() -> int:
     ap.add_argument("--jobs-root", default="jobs")
     ap.add_argument("--ttl-days", type=int, default=7)
     ap.add_argument("--dry-run", action="store_true")
+    ap.add_argument("--db-path", default="", help="backend SQLite path (default: REALMOI_DB_PATH / data/realmoi.db)")
     args = ap.parse_args()
+    # backend settings 在 import 时读取环境变量：删除 job 后要同步 jobs 索引表。
+    if args.db_path:
+        os.environ["REALMOI_DB_PATH"] = args.db_path
+    os.environ.setdefault("REALMOI_JOBS_ROOT", args.jobs_root)
 
     jobs_root = Path(args.jobs_root)
     ttl = timedelta(days=args.ttl_days)